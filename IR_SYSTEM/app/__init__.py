@@ -1,3 +1,5 @@
+import os
+import threading
 from flask import Flask
 
 def create_app():
@@ -7,4 +9,25 @@ def create_app():
     from .routes import main
     app.register_blueprint(main)
 
+    # Los índices de MongoDB se crean en la primera petición de cada proceso y no aquí:
+    # con 'gunicorn --preload' create_app se ejecuta en el proceso padre antes del fork,
+    # y una operación en ese momento abriría el cliente de MongoDB en el padre. Si la base
+    # de datos no está disponible, la aplicación atiende igualmente y se avisa por consola.
+    from db.indexes import crear_indices
+    estado = {"pid": None}
+    cerrojo = threading.Lock()
+
+    @app.before_request
+    def preparar_indices():
+        if estado["pid"] == os.getpid():
+            return
+        with cerrojo:
+            if estado["pid"] == os.getpid():
+                return
+            try:
+                crear_indices()
+            except Exception as e:
+                print(f"No se pudieron crear los índices de MongoDB: {e}")
+            estado["pid"] = os.getpid()
+
     return app
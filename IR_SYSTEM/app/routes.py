@@ -4,18 +4,23 @@ import os
 from bson import ObjectId
 from collections import defaultdict
 from controllers.pipeline_executor import PipelineExecutor
-from controllers.searcher import Searcher
+from controllers.searcher_registry import SearcherRegistry
 from db.pipeline_config_model import PipelineConfigModel
 from db.method_definition_model import MethodDefinitionModel
 from db.processed_collection_model import ProcessedCollectionModel
 from db.document_representation_model import DocumentRepresentationModel
-from db.collection_representation_model import CollectionRepresentationModel
+from db.collection_representation_model import CollectionRepresentationModel, COMPLETA, MAS_RECIENTE
 from db.representation_type_model import RepresentationTypeModel
 from db.collection_model import CollectionModel
 from db.document_model import DocumentModel
+from factories.document_representator_factory import get_representator
 
 main = Blueprint('main', __name__)
 executor = PipelineExecutor("")
+buscadores = SearcherRegistry()
+
+# Número máximo de consultas por petición de /buscar_lote
+MAX_CONSULTAS_LOTE = int(os.environ.get("IR_MAX_CONSULTAS_LOTE", 1000))
 
 # ------------------- PÁGINA PRINCIPAL -------------------
 @main.route('/')
@@ -53,10 +58,15 @@ def registrar_coleccion():
 def extraer_texto():
     """
     Ejecuta la extracción de texto para la colección indicada.
+    El número de procesos puede indicarse con el campo opcional 'workers'.
     """
     collection_id = request.form['collection_id']
-    executor.extraer_textos(collection_id)  # ← Aquí lo llamas
-    flash(f"Textos extraídos correctamente para la colección {collection_id}", "success")
+    workers = request.form.get('workers', type=int)
+    errores = executor.extraer_textos(collection_id, workers=workers)
+    if errores:
+        flash(f"Textos extraídos para la colección {collection_id} con {len(errores)} documento(s) con errores", "info")
+    else:
+        flash(f"Textos extraídos correctamente para la colección {collection_id}", "success")
     return redirect(url_for('main.index'))
 
 @main.route('/saltar_extraccion', methods=['POST'])
@@ -193,6 +203,27 @@ def procesar_pipeline():
     flash(f"Colección procesada correctamente. ID: {processed_id}", "success")
     return redirect(url_for('main.form_procesar_pipeline'))
 
+
+@main.route('/actualizar_procesada/<processed_id>', methods=['POST'])
+def actualizar_procesada(processed_id):
+    """
+    Actualiza de forma incremental una colección procesada con los documentos
+    nuevos, modificados o eliminados de su colección desde el último procesamiento.
+    """
+    try:
+        cambios = executor.actualizar_pipeline(processed_id)
+    except ValueError as e:
+        flash(f"No se pudo actualizar la colección procesada: {e}", "error")
+        return redirect(url_for('main.form_procesar_pipeline'))
+
+    buscadores.invalidar(processed_id)
+    flash(
+        f"Colección procesada actualizada: {len(cambios['nuevos'])} nuevos, "
+        f"{len(cambios['modificados'])} modificados, {len(cambios['eliminados'])} eliminados",
+        "success"
+    )
+    return redirect(url_for('main.form_procesar_pipeline'))
+
 # ------------------- VISUALIZACIÓN DE REPRESENTACIONES -------------------
 @main.route('/representaciones')
 def ver_representaciones():
@@ -222,16 +253,25 @@ def ver_representaciones():
             col_reps_db = col_model.get_by_processed_collection(selected_oid)
             col_rep = col_reps_db[0] if col_reps_db else None
 
-            rep_types = rep_type_model.list_all()
+            # Catálogo: un registro por paso; si no hay, registros antiguos (uno por fichero)
             rep_types_for_collection = [
-                rep for rep in rep_types if selected_id in rep.get("Output_Destination", "")
+                rep for rep in rep_type_model.list_by_processed(selected_id)
+                if rep.get("Output_Location_Type") == "filesystem"
             ]
+            if not rep_types_for_collection:
+                rep_types_for_collection = [
+                    rep for rep in rep_type_model.list_all() if selected_id in rep.get("Output_Destination", "")
+                ]
 
             mongo_doc_rep_keys = {(str(rep["Document_ID"]), rep["Representation_Type"]) for rep in doc_reps_db}
             for rep_type in rep_types_for_collection:
                 tipo = rep_type.get("Name")
                 destino = rep_type.get("Output_Destination", "")
-                is_global = "global" in destino
+
+                if "Scope" in rep_type:
+                    is_global = rep_type["Scope"] == "collection"
+                else:
+                    is_global = "global" in destino
 
                 if is_global:
                     if not col_rep:
@@ -240,14 +280,28 @@ def ver_representaciones():
                             "Representation_Type_Info": rep_type,
                             "Content": None
                         }
+                    continue
+
+                # Las entradas del catálogo apuntan a la carpeta del paso: se listan sus ficheros
+                if "Scope" in rep_type:
+                    prefijo = f"{tipo}_"
+                    ficheros = sorted(
+                        f for f in os.listdir(destino) if f.startswith(prefijo) and f.endswith(".json")
+                    ) if os.path.isdir(destino) else []
+                    entradas = [
+                        (f[len(prefijo):-len(".json")], dict(rep_type, Output_Destination=os.path.join(destino, f)))
+                        for f in ficheros
+                    ]
                 else:
-                    doc_id_str = destino.split("_")[-1].replace(".json", "")
+                    entradas = [(destino.split("_")[-1].replace(".json", ""), rep_type)]
+
+                for doc_id_str, info in entradas:
                     key = (doc_id_str, tipo)
                     if key not in mongo_doc_rep_keys:
                         doc_reps.append({
                             "Document_ID": doc_id_str,
                             "Representation_Type": tipo,
-                            "Representation_Type_Info": rep_type,
+                            "Representation_Type_Info": info,
                             "Content": None
                         })
 
@@ -269,11 +323,13 @@ def buscar():
     """
     Realiza una búsqueda en una colección procesada utilizando la consulta del usuario 
     y el comparador seleccionado (por defecto, coseno).
+    Las búsquedas reutilizan el buscador residente de la colección procesada.
 
     Renderiza la plantilla con:
     - Todas las colecciones procesadas disponibles.
     - Resultados de la búsqueda (si es POST).
-    - Consulta y comparador seleccionados.
+    - Consulta, comparador, modo de búsqueda, tipo de consulta y número de resultados (top_k) seleccionados.
+    - El error de la consulta, si es booleana y no es válida.
     """
     processed_model = ProcessedCollectionModel()
     colecciones = list(processed_model.collection.find())
@@ -282,15 +338,30 @@ def buscar():
     selected_id = None
     consulta = ""
     comparador = "coseno"
+    modo = "indice"
+    tipo_consulta = "libre"
+    top_k = 10
+    error = None
 
     if request.method == "POST":
         selected_id = request.form.get("collection_id")
         consulta = request.form.get("consulta")
-        comparador = request.form.get("comparador")
-
-        if selected_id and consulta:
-            buscador = Searcher(selected_id)
-            resultados = buscador.buscar(consulta, comparador_nombre=comparador)
+        comparador = request.form.get("comparador", "coseno")
+        modo = request.form.get("modo", "indice")
+        tipo_consulta = request.form.get("tipo_consulta", "libre")
+        top_k = request.form.get("top_k", 10, type=int)
+
+        # Con top_k = 0 se devolverían todos los resultados y con uno negativo, ninguno
+        if top_k < 1:
+            error = "El número de resultados debe ser un entero positivo"
+            top_k = 10
+        elif selected_id and consulta:
+            try:
+                resultados = buscadores.buscar(
+                    selected_id, consulta, comparador_nombre=comparador, modo=modo, top_k=top_k, tipo_consulta=tipo_consulta
+                )
+            except ValueError as e:
+                error = str(e)
 
     return render_template(
         "buscar.html",
@@ -298,9 +369,69 @@ def buscar():
         resultados=resultados,
         selected_id=selected_id,
         consulta=consulta,
-        comparador=comparador
+        comparador=comparador,
+        modo=modo,
+        tipo_consulta=tipo_consulta,
+        top_k=top_k,
+        error=error
     )
 
+# ------------------- BÚSQUEDA POR LOTES -------------------
+@main.route("/buscar_lote", methods=["POST"])
+def buscar_lote():
+    """
+    Ejecuta varias consultas sobre una colección procesada en una sola petición.
+    Las consultas se preprocesan y puntúan juntas con el buscador residente de la colección.
+
+    Cuerpo JSON:
+    - collection_id (str): ID de la colección procesada.
+    - consultas (list[str]): Textos de las consultas.
+    - comparador (str, opcional): 'coseno' (por defecto) o 'booleano'.
+    - modo (str, opcional): 'indice' (por defecto), 'exhaustivo' o 'matricial'.
+    - top_k (int, opcional): Número máximo de resultados por consulta.
+    - tipo_consulta (str, opcional): 'libre' (por defecto) o 'booleana'.
+
+    Retorna:
+    - JSON con una entrada {"consulta", "resultados"} por consulta, en el mismo orden,
+      un error 400 si la petición o alguna consulta booleana no es válida (como máximo
+      IR_MAX_CONSULTAS_LOTE consultas) o un error 404 si la colección procesada no existe.
+    """
+    datos = request.get_json(silent=True) or {}
+    selected_id = datos.get("collection_id")
+    consultas = datos.get("consultas")
+    top_k = datos.get("top_k")
+
+    if not selected_id or not ObjectId.is_valid(selected_id):
+        return jsonify({"error": "collection_id no válido"}), 400
+    if not isinstance(consultas, list) or not all(isinstance(c, str) for c in consultas):
+        return jsonify({"error": "consultas debe ser una lista de textos"}), 400
+    if len(consultas) > MAX_CONSULTAS_LOTE:
+        return jsonify({"error": f"Como máximo se admiten {MAX_CONSULTAS_LOTE} consultas por petición"}), 400
+    # bool es subclase de int, pero true/false no son un número de resultados
+    if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+        return jsonify({"error": "top_k debe ser un entero positivo"}), 400
+
+    if ProcessedCollectionModel().collection.find_one({"_id": ObjectId(selected_id)}, {"_id": 1}) is None:
+        return jsonify({"error": "La colección procesada no existe"}), 404
+
+    try:
+        resultados = buscadores.buscar_lote(
+            selected_id, consultas,
+            comparador_nombre=datos.get("comparador", "coseno"),
+            modo=datos.get("modo", "indice"),
+            top_k=top_k,
+            tipo_consulta=datos.get("tipo_consulta", "libre")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "resultados": [
+            {"consulta": consulta, "resultados": resultados_consulta}
+            for consulta, resultados_consulta in zip(consultas, resultados)
+        ]
+    })
+
 # ------------------- ELIMINACIÓN DE COLECCIÓN -------------------
 @main.route("/eliminar_coleccion/<collection_id>", methods=["POST"])
 def eliminar_coleccion(collection_id):
@@ -317,6 +448,10 @@ def eliminar_coleccion(collection_id):
     processed = proc_model.get_by_collection_id(collection_id)
     processed_ids = [str(p["_id"]) for p in processed]
 
+    # Descartar los buscadores residentes de las colecciones procesadas eliminadas
+    for proc_id in processed_ids:
+        buscadores.invalidar(proc_id)
+
     # Eliminar representaciones del sistema de ficheros si el usuario lo indica
     if request.form.get("eliminar_disco") == "si":
         for proc_id in processed_ids:
@@ -331,6 +466,9 @@ def eliminar_coleccion(collection_id):
     col_rep_model = CollectionRepresentationModel()
     col_rep_model.delete_all_by_collection_id(collection_id)
 
+    # Eliminar las entradas del catálogo de representaciones
+    RepresentationTypeModel().delete_by_processed_ids(processed_ids)
+
     # Eliminar documentos y la colección original
     doc_model = DocumentModel()
     documentos = doc_model.get_documents_by_collection(collection_id)
@@ -387,6 +525,9 @@ def descargar_desde_mongodb(tipo, doc_id):
     Permite descargar en formato JSON la representación almacenada en MongoDB 
     (documento o global) según su ID.
 
+    Las representaciones dispersas (lista de IDs de término) se acompañan de los
+    términos correspondientes, resueltos con el vocabulario de la colección procesada.
+
     Parámetros:
     - tipo (str): 'document' o 'global' para indicar el modelo.
     - doc_id (str): ID del documento o colección procesada.
@@ -404,11 +545,20 @@ def descargar_desde_mongodb(tipo, doc_id):
         rep = modelo.collection.find_one({"Document_ID": oid})
     else:
         modelo = CollectionRepresentationModel()
-        rep = modelo.collection.find_one({"Processed_Collection_ID": oid})
+        rep = modelo.collection.find_one({"Processed_Collection_ID": oid, **COMPLETA}, sort=MAS_RECIENTE)
+        if rep:
+            # Los índices troceados se reconstruyen a partir de sus bloques
+            rep["Content"] = modelo.get_content(rep)
 
     if rep and "Content" in rep:
+        contenido = rep["Content"]
+        if tipo == "document" and rep.get("Representation_Type") == "sparse_boolean_vector":
+            generador = get_representator("sparse_boolean_vector")
+            generador.cargar_desde_bd(rep["Processed_Collection_ID"])
+            contenido = {"ids": contenido, "terminos": generador.terminos(contenido)}
+
         return Response(
-            response=jsonify(rep["Content"]).get_data(as_text=True),
+            response=jsonify(contenido).get_data(as_text=True),
             mimetype='application/json',
             headers={
                 "Content-Disposition": f"attachment;filename=representacion_{tipo}_{doc_id}.json"
@@ -0,0 +1,125 @@
+# benchmarks/benchmark_indexado.py
+# Mide el tiempo de construcción del índice invertido sobre colecciones Zipf
+# sintéticas de tamaño creciente (ver corpus_zipf). Compara InvertedIndexBuilder,
+# que añade cada posting con coste constante, con la construcción anterior, que
+# recorría la lista de postings del término por cada documento añadido (coste
+# cuadrático en la longitud de las listas), y con la construcción completa de
+# InvertedIndexStructure (cotas y estadísticas incluidas).
+#
+# Uso (desde IR_SYSTEM):
+#   python -m benchmarks.benchmark_indexado
+#   python -m benchmarks.benchmark_indexado --documentos 1000 2000 4000 8000 --max-lineal 4000
+
+import argparse
+import time
+from benchmarks.corpus_zipf import generar_documentos
+from indexer.inverted_index_builder import InvertedIndexBuilder
+from indexer.structures.inverted_index_structure import InvertedIndexStructure
+
+
+def construir_con_busqueda_lineal(coleccion: dict[str, list[str]]) -> dict[str, list]:
+    """
+    Construcción de referencia anterior a InvertedIndexBuilder: para añadir un posting
+    se busca el documento recorriendo la lista de postings del término.
+
+    Args:
+        coleccion (dict[str, list[str]]): Diccionario docID → tokens.
+
+    Returns:
+        dict[str, list]: Índice término → postings (en orden de inserción).
+    """
+    index = {}
+    for doc_id, terms in coleccion.items():
+        term_positions = {}
+        for position, term in enumerate(terms):
+            term_positions.setdefault(term, []).append(position)
+
+        for term, positions in term_positions.items():
+            postings = index.setdefault(term, [])
+            if doc_id in [posting[0] for posting in postings]:
+                for posting in postings:
+                    if posting[0] == doc_id:
+                        posting[1] += len(positions)
+                        posting[2].extend(positions)
+                        break
+            else:
+                postings.append([doc_id, len(positions), positions])
+    return index
+
+
+def construir_con_builder(coleccion: dict[str, list[str]]) -> dict[str, list]:
+    """
+    Construye el índice con InvertedIndexBuilder.
+
+    Args:
+        coleccion (dict[str, list[str]]): Diccionario docID → tokens.
+
+    Returns:
+        dict[str, list]: Índice término → postings ordenados por docID.
+    """
+    builder = InvertedIndexBuilder()
+    for doc_id in sorted(coleccion):
+        builder.add_document(doc_id, coleccion[doc_id])
+    index, _, _ = builder.freeze()
+    return index
+
+
+def construir_estructura(coleccion: dict[str, list[str]]) -> dict[str, list]:
+    """
+    Construye la estructura completa (postings, cotas y estadísticas) en un solo proceso.
+
+    Args:
+        coleccion (dict[str, list[str]]): Diccionario docID → tokens.
+
+    Returns:
+        dict[str, list]: Índice término → postings ordenados por docID.
+    """
+    estructura = InvertedIndexStructure(workers=1)
+    estructura.build(coleccion)
+    return estructura.index
+
+
+def medir(funcion, coleccion: dict[str, list[str]], repeticiones: int) -> float:
+    """
+    Devuelve el mejor tiempo (en segundos) de varias ejecuciones de una construcción.
+    """
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(coleccion)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de construcción del índice invertido.")
+    parser.add_argument("--documentos", type=int, nargs="+", default=[1000, 2000, 4000, 8000],
+                        help="Tamaños de colección a medir.")
+    parser.add_argument("--tokens", type=int, default=150, help="Tokens por documento.")
+    parser.add_argument("--vocabulario", type=int, default=3000, help="Términos distintos posibles.")
+    parser.add_argument("--exponente", type=float, default=1.0, help="Exponente de la ley de Zipf.")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del generador.")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Ejecuciones por medida (se toma la mejor).")
+    parser.add_argument("--max-lineal", type=int, default=4000,
+                        help="Tamaño máximo para la construcción de referencia (es cuadrática).")
+    args = parser.parse_args()
+
+    print(f"Colección Zipf: {args.tokens} tokens/documento, vocabulario {args.vocabulario}, "
+          f"s = {args.exponente}, semilla {args.semilla}")
+    print(f"{'documentos':>10} {'postings':>10} {'lineal':>9} {'builder':>9} {'estructura':>11}")
+
+    for n_documentos in args.documentos:
+        coleccion = generar_documentos(n_documentos, args.tokens, args.vocabulario, args.exponente, args.semilla)
+        n_postings = sum(len(postings) for postings in construir_con_builder(coleccion).values())
+
+        lineal = "-"
+        if n_documentos <= args.max_lineal:
+            lineal = f"{medir(construir_con_busqueda_lineal, coleccion, args.repeticiones):.2f}s"
+        builder = medir(construir_con_builder, coleccion, args.repeticiones)
+        estructura = medir(construir_estructura, coleccion, args.repeticiones)
+
+        print(f"{n_documentos:>10} {n_postings:>10} {lineal:>9} {builder:>8.2f}s {estructura:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
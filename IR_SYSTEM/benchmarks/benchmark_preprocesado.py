@@ -0,0 +1,84 @@
+# benchmarks/benchmark_preprocesado.py
+# Mide la escalabilidad del preprocesamiento multiproceso del pipeline
+# (PipelineExecutor._preprocesar) con distinto número de workers sobre textos
+# sintéticos (ver corpus_zipf). Para cada número de workers muestra el tiempo,
+# los documentos por segundo, la aceleración respecto a un worker y la eficiencia
+# (aceleración / workers), y comprueba que la salida es idéntica a la secuencial.
+# La aceleración solo puede crecer mientras haya núcleos libres: por defecto se
+# mide hasta el número de CPUs disponibles para el proceso.
+#
+# Uso (desde IR_SYSTEM):
+#   python -m benchmarks.benchmark_preprocesado
+#   python -m benchmarks.benchmark_preprocesado --documentos 20000 --workers 1 2 4 8 --lote 64
+
+import os
+import argparse
+import time
+from benchmarks.corpus_zipf import generar_textos
+from controllers.pipeline_executor import PipelineExecutor
+
+METODOS_POR_DEFECTO = ["lowercase", "tokenize", "remove_punctuation", "remove_stopwords"]
+
+
+def cpus_disponibles() -> int:
+    """
+    Devuelve el número de CPUs que puede usar el proceso.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main():
+    cpus = cpus_disponibles()
+
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidad del preprocesamiento multiproceso.")
+    parser.add_argument("--documentos", type=int, default=20000, help="Número de textos.")
+    parser.add_argument("--tokens", type=int, default=150, help="Palabras por texto.")
+    parser.add_argument("--vocabulario", type=int, default=3000, help="Palabras distintas posibles.")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del generador.")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Números de workers a medir (por defecto, 1, 2, 4... hasta las CPUs disponibles).")
+    parser.add_argument("--lote", type=int, default=64, help="Textos por lote enviado a cada worker.")
+    parser.add_argument("--metodos", nargs="+", default=METODOS_POR_DEFECTO,
+                        help="Métodos de preprocesamiento, en orden.")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Ejecuciones por medida (se toma la mejor).")
+    args = parser.parse_args()
+
+    workers = args.workers
+    if workers is None:
+        workers = sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus})
+
+    textos = generar_textos(args.documentos, args.tokens, args.vocabulario, semilla=args.semilla)
+    metodos = [{"Name": nombre} for nombre in args.metodos]
+
+    ejecutor = PipelineExecutor("")
+    ejecutor.preprocessing_batch = args.lote
+
+    print(f"CPUs disponibles: {cpus}. {args.documentos} textos de {args.tokens} palabras, lotes de {args.lote}.")
+    print(f"Métodos: {', '.join(args.metodos)}")
+    print(f"{'workers':>7} {'tiempo':>9} {'docs/s':>9} {'aceleración':>12} {'eficiencia':>11}")
+
+    referencia = None
+    tiempo_base = None
+    for n_workers in workers:
+        mejor = float("inf")
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            salidas = [salida for _, _, salida in ejecutor._preprocesar(textos, metodos, n_workers)]
+            mejor = min(mejor, time.perf_counter() - inicio)
+
+        if referencia is None:
+            referencia = salidas
+        elif salidas != referencia:
+            raise RuntimeError(f"La salida con {n_workers} workers no coincide con la de {workers[0]}.")
+
+        tiempo_base = tiempo_base or mejor
+        aceleracion = tiempo_base / mejor
+        aviso = "  (más workers que CPUs)" if n_workers > cpus else ""
+        print(f"{n_workers:>7} {mejor:>8.2f}s {args.documentos / mejor:>9.0f} {aceleracion:>11.2f}x "
+              f"{aceleracion / n_workers:>10.0%}{aviso}")
+
+
+if __name__ == "__main__":
+    main()
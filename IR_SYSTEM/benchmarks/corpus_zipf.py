@@ -0,0 +1,73 @@
+# benchmarks/corpus_zipf.py
+# Generador de colecciones sintéticas para los benchmarks. Las frecuencias de los
+# términos siguen una ley de Zipf (el término de rango r aparece con probabilidad
+# proporcional a 1 / r^s), como en las colecciones reales: unos pocos términos
+# muy frecuentes con listas de postings largas y una cola de términos raros.
+# Con la misma semilla se genera siempre la misma colección.
+
+import random
+
+
+def generar_vocabulario(tamano: int) -> list[str]:
+    """
+    Genera un vocabulario de términos sintéticos, ordenado por rango.
+
+    Args:
+        tamano (int): Número de términos.
+
+    Returns:
+        list[str]: Términos 't0', 't1', ... (el primero es el más frecuente).
+    """
+    return [f"t{i}" for i in range(tamano)]
+
+
+def generar_documentos(n_documentos: int, tokens_por_documento: int = 150, tamano_vocabulario: int = 3000,
+                       exponente: float = 1.0, semilla: int = 1) -> dict[str, list[str]]:
+    """
+    Genera una colección de documentos tokenizados con términos distribuidos según Zipf.
+
+    Args:
+        n_documentos (int): Número de documentos.
+        tokens_por_documento (int): Tokens de cada documento.
+        tamano_vocabulario (int): Número de términos distintos posibles.
+        exponente (float): Exponente s de la ley de Zipf.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        dict[str, list[str]]: Diccionario docID → tokens.
+    """
+    aleatorio = random.Random(semilla)
+    vocabulario = generar_vocabulario(tamano_vocabulario)
+    pesos = [1 / (rango + 1) ** exponente for rango in range(tamano_vocabulario)]
+    return {
+        f"d{i:07d}": aleatorio.choices(vocabulario, pesos, k=tokens_por_documento)
+        for i in range(n_documentos)
+    }
+
+
+def generar_textos(n_documentos: int, tokens_por_documento: int = 150, tamano_vocabulario: int = 3000,
+                   exponente: float = 1.0, semilla: int = 1) -> list[tuple[str, str]]:
+    """
+    Genera textos sin preprocesar a partir de una colección Zipf: algunas palabras en
+    mayúsculas y signos de puntuación entre ellas, para que el preprocesamiento tenga trabajo.
+
+    Args:
+        n_documentos (int): Número de documentos.
+        tokens_por_documento (int): Palabras de cada texto.
+        tamano_vocabulario (int): Número de palabras distintas posibles.
+        exponente (float): Exponente s de la ley de Zipf.
+        semilla (int): Semilla del generador aleatorio.
+
+    Returns:
+        list[tuple[str, str]]: Pares (docID, texto).
+    """
+    aleatorio = random.Random(semilla)
+    signos = ["", "", "", ",", ".", ";", "!"]
+    textos = []
+    for doc_id, tokens in generar_documentos(n_documentos, tokens_por_documento, tamano_vocabulario, exponente, semilla).items():
+        palabras = [
+            (token.upper() if aleatorio.random() < 0.1 else token) + aleatorio.choice(signos)
+            for token in tokens
+        ]
+        textos.append((doc_id, " ".join(palabras)))
+    return textos
@@ -1,7 +1,8 @@
 # comparadores/base.py
 # Define la interfaz abstracta para todos los comparadores de representaciones.
 # Cada comparador implementa un método para calcular la similitud entre una
-# consulta y un documento representados en forma vectorial (diccionarios).
+# consulta y un documento representados en forma vectorial (diccionarios densos
+# o listas ordenadas de IDs de término en el caso de las representaciones dispersas).
 
 from abc import ABC, abstractmethod
 
@@ -13,15 +14,88 @@ class QueryComparator(ABC):
     """
 
     @abstractmethod
-    def comparar(self, query_rep: dict, doc_rep: dict) -> float:
+    def comparar(self, query_rep: dict | list[int], doc_rep: dict | list[int], norma_documento: float | None = None) -> float:
         """
         Compara la representación de la consulta con la del documento.
 
         Args:
-            query_rep (dict): Representación vectorial de la consulta.
-            doc_rep (dict): Representación vectorial del documento.
+            query_rep (dict | list[int]): Representación vectorial de la consulta.
+            doc_rep (dict | list[int]): Representación vectorial del documento.
+            norma_documento (float | None): Norma precalculada del vector del documento, si se
+                                            conoce (los comparadores que no la usan la ignoran).
 
         Returns:
             float: Puntuación de similitud entre la consulta y el documento.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def preparar_consulta(self, query_rep: dict | list[int]) -> dict:
+        """
+        Prepara una sola vez la representación de la consulta antes de compararla con
+        todos los documentos: se pasa a diccionario y se descartan los pesos nulos, de modo
+        que cada comparación cuesta lo que el número de términos de la consulta y no lo que
+        el vocabulario.
+
+        Args:
+            query_rep (dict | list[int]): Representación densa o dispersa de la consulta.
+
+        Returns:
+            dict: Representación término/ID → peso solo con los pesos no nulos.
+        """
+        return {k: v for k, v in self.a_diccionario(query_rep).items() if v}
+
+    def normalizar_acumulado(self, acumulado: float, norma_consulta: float, norma_documento: float) -> float:
+        """
+        Convierte la puntuación acumulada término a término (producto punto entre
+        vectores binarios) en la puntuación final del comparador. Se usa cuando la
+        búsqueda se resuelve sobre los postings del índice invertido en lugar de
+        comparar vectores completos.
+
+        Args:
+            acumulado (float): Número de términos en común entre consulta y documento.
+            norma_consulta (float): Norma L2 del vector de la consulta.
+            norma_documento (float): Norma L2 del vector del documento.
+
+        Returns:
+            float: Puntuación de similitud. Por defecto, el propio acumulado.
+        """
+        return acumulado
+
+    def normalizar_acumulados(self, acumulados, norma_consulta, normas_documentos):
+        """
+        Versión vectorizada de normalizar_acumulado para la evaluación matricial: recibe
+        arrays de NumPy con los acumulados y las normas de los documentos candidatos (todos
+        comparten algún término con la consulta, así que ninguna norma es cero).
+
+        Args:
+            acumulados (np.ndarray): Número de términos en común con cada documento.
+            norma_consulta (float | np.ndarray): Norma L2 de la consulta (o de la consulta
+                                                 de cada candidato, si se evalúan varias).
+            normas_documentos (np.ndarray): Norma L2 del vector de cada documento.
+
+        Returns:
+            np.ndarray: Puntuaciones. Por defecto, los propios acumulados.
+        """
+        return acumulados
+
+    @staticmethod
+    def a_diccionario(rep: dict | list[int]) -> dict:
+        """
+        Normaliza una representación a diccionario. Las representaciones dispersas
+        (lista de IDs de término presentes) se convierten en {id: 1}, de modo que su
+        coste es proporcional al número de términos presentes y no al vocabulario.
+
+        Args:
+            rep (dict | list[int]): Representación densa o dispersa.
+
+        Returns:
+            dict: Representación como diccionario término/ID → peso.
+
+        Raises:
+            TypeError: Si la representación no es ni diccionario ni lista.
+        """
+        if isinstance(rep, dict):
+            return rep
+        if isinstance(rep, list):
+            return dict.fromkeys(rep, 1)
+        raise TypeError(f"Representación no soportada: {type(rep).__name__}")
\ No newline at end of file
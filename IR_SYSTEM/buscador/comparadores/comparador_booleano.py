@@ -11,21 +11,24 @@ class ComparadorBooleano(QueryComparator):
     relevantes de la consulta que aparecen en el documento.
     """
 
-    def comparar(self, query_rep: dict, doc_rep: dict | str) -> float:
+    def comparar(self, query_rep: dict | list[int], doc_rep: dict | list[int] | str, norma_documento: float | None = None) -> float:
         """
         Compara la consulta con el documento usando lógica booleana: cuenta cuántos
         términos de la consulta (con valor 1) están presentes también en el documento.
 
         Args:
-            query_rep (dict): Representación booleana de la consulta (término → 0/1).
-            doc_rep (dict | str): Representación booleana del documento como diccionario o JSON serializado.
+            query_rep (dict | list[int]): Representación booleana de la consulta (término → 0/1)
+                                          o lista dispersa de IDs de término.
+            doc_rep (dict | list[int] | str): Representación booleana del documento como diccionario,
+                                              lista dispersa de IDs o JSON serializado.
+            norma_documento (float | None): No se usa; se acepta por compatibilidad con el resto de comparadores.
 
         Returns:
             float: Número de términos en común entre la consulta y el documento (no normalizado).
 
         Raises:
             ValueError: Si `doc_rep` es una cadena pero no es un JSON válido.
-            TypeError: Si `doc_rep` no es ni diccionario ni string JSON.
+            TypeError: Si `doc_rep` no es ni diccionario, ni lista, ni string JSON.
         """
         # Si es una cadena, intenta interpretarla como JSON
         if isinstance(doc_rep, str):
@@ -34,18 +37,33 @@ class ComparadorBooleano(QueryComparator):
             except json.JSONDecodeError:
                 raise ValueError("doc_rep es un string pero no es un JSON válido")
 
-        # Si no es un diccionario, lanza error
-        elif not isinstance(doc_rep, dict):
-            raise TypeError(f"doc_rep debe ser dict o JSON string, no {type(doc_rep)}")
+        # Si no es un diccionario ni una lista dispersa, lanza error
+        if not isinstance(doc_rep, (dict, list)):
+            raise TypeError(f"doc_rep debe ser dict, lista o JSON string, no {type(doc_rep)}")
 
         # Extrae los términos con valor 1 en la consulta
-        query_terms = {k for k, v in query_rep.items() if v == 1}
+        query_terms = self._terminos_presentes(query_rep)
 
         # Extrae los términos con valor 1 en el documento
-        doc_terms = {k for k, v in doc_rep.items() if v == 1}
+        doc_terms = self._terminos_presentes(doc_rep)
 
         # Calcula la intersección de términos (coincidencias)
         comunes = query_terms & doc_terms
 
         # Devuelve el número de términos comunes
-        return len(comunes)
\ No newline at end of file
+        return len(comunes)
+
+    @staticmethod
+    def _terminos_presentes(rep: dict | list[int]) -> set:
+        """
+        Devuelve el conjunto de términos (o IDs de término) presentes en una representación.
+
+        Args:
+            rep (dict | list[int]): Representación densa (término → 0/1) o dispersa (lista de IDs).
+
+        Returns:
+            set: Términos con valor 1.
+        """
+        if isinstance(rep, list):
+            return set(rep)
+        return {k for k, v in rep.items() if v == 1}
@@ -11,26 +11,38 @@ class ComparadorCoseno(QueryComparator):
     y la de un documento.
     """
 
-    def comparar(self, query_rep: dict, doc_rep: dict) -> float:
+    def comparar(self, query_rep: dict | list[int], doc_rep: dict | list[int], norma_documento: float | None = None) -> float:
         """
         Calcula la similitud del coseno entre la consulta y el documento.
+        Si se indica la norma del documento (precalculada al indexar), no se recorre
+        su vector para calcularla.
 
         Args:
-            query_rep (dict): Representación de la consulta como vector (diccionario término: peso).
-            doc_rep (dict): Representación del documento como vector (diccionario término: peso).
+            query_rep (dict | list[int]): Representación de la consulta como vector (diccionario término: peso)
+                                          o lista dispersa de IDs de término presentes.
+            doc_rep (dict | list[int]): Representación del documento como vector (diccionario término: peso)
+                                        o lista dispersa de IDs de término presentes.
+            norma_documento (float | None): Norma L2 precalculada del vector del documento.
 
         Returns:
             float: Valor entre 0 y 1 que indica la similitud entre los vectores. 
                    1 significa máxima similitud, 0 significa sin coincidencia.
         """
+        # Las representaciones dispersas se tratan como vectores binarios {id: 1}
+        query_rep = self.a_diccionario(query_rep)
+        doc_rep = self.a_diccionario(doc_rep)
+
         # Producto punto entre los vectores (numerador de la fórmula del coseno)
-        numerador = sum(query_rep.get(k, 0) * doc_rep.get(k, 0) for k in query_rep)
+        numerador = sum(v * doc_rep.get(k, 0) for k, v in query_rep.items() if v)
 
         # Magnitud (norma L2) de la consulta
         magnitud_q = math.sqrt(sum(v ** 2 for v in query_rep.values()))
 
-        # Magnitud (norma L2) del documento
-        magnitud_d = math.sqrt(sum(v ** 2 for v in doc_rep.values()))
+        # Magnitud (norma L2) del documento: la precalculada o, si no se conoce, la de su vector
+        if norma_documento is None:
+            magnitud_d = math.sqrt(sum(v ** 2 for v in doc_rep.values()))
+        else:
+            magnitud_d = norma_documento
 
         # Si alguna de las magnitudes es cero, no se puede calcular la similitud
         if magnitud_q == 0 or magnitud_d == 0:
@@ -38,3 +50,33 @@ class ComparadorCoseno(QueryComparator):
 
         # Devuelve la similitud del coseno
         return numerador / (magnitud_q * magnitud_d)
+
+    def normalizar_acumulado(self, acumulado: float, norma_consulta: float, norma_documento: float) -> float:
+        """
+        Divide el producto punto acumulado entre el producto de las normas.
+
+        Args:
+            acumulado (float): Producto punto entre consulta y documento.
+            norma_consulta (float): Norma L2 del vector de la consulta.
+            norma_documento (float): Norma L2 del vector del documento.
+
+        Returns:
+            float: Similitud del coseno (0 si alguna norma es cero).
+        """
+        if norma_consulta == 0 or norma_documento == 0:
+            return 0.0
+        return acumulado / (norma_consulta * norma_documento)
+
+    def normalizar_acumulados(self, acumulados, norma_consulta, normas_documentos):
+        """
+        Divide cada producto punto entre el producto de las normas (versión vectorizada).
+
+        Args:
+            acumulados (np.ndarray): Productos punto entre la consulta y los documentos candidatos.
+            norma_consulta (float | np.ndarray): Norma L2 de la consulta (o de la consulta de cada candidato).
+            normas_documentos (np.ndarray): Normas L2 de los documentos candidatos (no nulas).
+
+        Returns:
+            np.ndarray: Similitudes del coseno.
+        """
+        return acumulados / (norma_consulta * normas_documentos)
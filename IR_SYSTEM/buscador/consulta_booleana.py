@@ -0,0 +1,212 @@
+# buscador/consulta_booleana.py
+# Analizador del lenguaje de consultas booleanas: operadores AND, OR y NOT
+# (en mayúsculas), paréntesis y AND implícito entre operandos consecutivos,
+# frases entre comillas ("perro negro") y proximidad (perro NEAR/3 gato: ambos
+# términos a 3 posiciones o menos, en cualquier orden). La precedencia es
+# NEAR > NOT > AND > OR. Cada palabra se normaliza con el mismo preprocesamiento
+# que la colección, de modo que los operandos coinciden con los términos del
+# índice invertido.
+#
+# La consulta se traduce a un árbol de tuplas:
+#   ("termino", término) | ("frase", [términos]) | ("cerca", [término, término], k)
+#   | ("and", [hijos]) | ("or", [hijos]) | ("not", hijo)
+
+import re
+from typing import Callable
+
+OPERADORES = {"AND", "OR", "NOT"}
+
+_PATRON_SIMBOLOS = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+_PATRON_CERCA = re.compile(r"NEAR/(\d+)")
+
+
+def analizar_consulta(texto: str, normalizar: Callable[[str], list[str]]) -> tuple | None:
+    """
+    Analiza una consulta booleana y devuelve su árbol.
+
+    Las palabras que el preprocesamiento descarta (por ejemplo, palabras vacías) desaparecen
+    de la consulta; si una palabra da lugar a varios términos, se combinan con AND.
+
+    Args:
+        texto (str): Consulta escrita por el usuario, por ejemplo 'perro AND (gato OR NOT raton)'.
+        normalizar (Callable[[str], list[str]]): Función que convierte una palabra en sus términos
+                                                 (normalmente, Preprocessor.preprocess).
+
+    Returns:
+        tuple | None: Árbol de la consulta o None si no queda ningún término.
+
+    Raises:
+        ValueError: Si la consulta no es sintácticamente válida.
+    """
+    if texto.count('"') % 2:
+        raise ValueError("Falta cerrar unas comillas en la consulta booleana.")
+    analizador = _Analizador(_PATRON_SIMBOLOS.findall(texto), normalizar)
+    return analizador.analizar()
+
+
+def _combinar(operador: str, hijos: list) -> tuple | None:
+    """
+    Construye un nodo AND/OR descartando los hijos vacíos y aplanando los
+    hijos del mismo operador.
+
+    Args:
+        operador (str): 'and' u 'or'.
+        hijos (list): Subárboles (pueden ser None).
+
+    Returns:
+        tuple | None: Nodo resultante, su único hijo o None si no queda ninguno.
+    """
+    planos = []
+    for hijo in hijos:
+        if hijo is None:
+            continue
+        if hijo[0] == operador:
+            planos.extend(hijo[1])
+        else:
+            planos.append(hijo)
+
+    if not planos:
+        return None
+    if len(planos) == 1:
+        return planos[0]
+    return (operador, planos)
+
+
+class _Analizador:
+    """
+    Analizador descendente recursivo de la gramática:
+        expresion := conjuncion (OR conjuncion)*
+        conjuncion := negacion ([AND] negacion)*
+        negacion := NOT negacion | proximidad
+        proximidad := atomo (NEAR/k atomo)*
+        atomo := '(' expresion ')' | '"' frase '"' | palabra
+    """
+
+    def __init__(self, simbolos: list[str], normalizar: Callable[[str], list[str]]):
+        """
+        Args:
+            simbolos (list[str]): Paréntesis, operadores y palabras de la consulta.
+            normalizar (Callable[[str], list[str]]): Función que convierte una palabra en sus términos.
+        """
+        self.simbolos = simbolos
+        self.posicion = 0
+        self.normalizar = normalizar
+
+    def analizar(self) -> tuple | None:
+        """
+        Analiza la consulta completa.
+
+        Returns:
+            tuple | None: Árbol de la consulta o None si no queda ningún término.
+
+        Raises:
+            ValueError: Si la consulta está vacía o sobran símbolos.
+        """
+        if not self.simbolos:
+            raise ValueError("La consulta booleana está vacía.")
+        nodo = self._expresion()
+        if self.posicion < len(self.simbolos):
+            raise ValueError(f"Símbolo inesperado en la consulta booleana: '{self.simbolos[self.posicion]}'.")
+        return nodo
+
+    def _actual(self) -> str | None:
+        """
+        Devuelve el símbolo actual o None si se ha llegado al final.
+        """
+        return self.simbolos[self.posicion] if self.posicion < len(self.simbolos) else None
+
+    def _expresion(self) -> tuple | None:
+        """
+        expresion := conjuncion (OR conjuncion)*
+        """
+        hijos = [self._conjuncion()]
+        while self._actual() == "OR":
+            self.posicion += 1
+            hijos.append(self._conjuncion())
+        return _combinar("or", hijos)
+
+    def _conjuncion(self) -> tuple | None:
+        """
+        conjuncion := negacion ([AND] negacion)*
+        """
+        hijos = [self._negacion()]
+        while self._actual() is not None and self._actual() not in ("OR", ")"):
+            if self._actual() == "AND":
+                self.posicion += 1
+            hijos.append(self._negacion())
+        return _combinar("and", hijos)
+
+    def _negacion(self) -> tuple | None:
+        """
+        negacion := NOT negacion | proximidad
+        """
+        if self._actual() == "NOT":
+            self.posicion += 1
+            hijo = self._negacion()
+            return ("not", hijo) if hijo is not None else None
+        return self._proximidad()
+
+    def _proximidad(self) -> tuple | None:
+        """
+        proximidad := atomo (NEAR/k atomo)*
+
+        Los operandos de NEAR deben ser palabras. Una cadena 'a NEAR/2 b NEAR/3 c' equivale a
+        '(a NEAR/2 b) AND (b NEAR/3 c)'; si un operando desaparece al normalizarlo, el
+        operador se descarta y queda el otro operando.
+
+        Raises:
+            ValueError: Si un operando de NEAR no es una palabra.
+        """
+        operandos = [self._atomo()]
+        distancias = []
+        while self._actual() is not None and _PATRON_CERCA.fullmatch(self._actual()):
+            distancias.append(int(_PATRON_CERCA.fullmatch(self._actual()).group(1)))
+            self.posicion += 1
+            operandos.append(self._atomo())
+
+        if not distancias:
+            return operandos[0]
+        if any(op is not None and op[0] != "termino" for op in operandos):
+            raise ValueError("NEAR/k solo admite palabras como operandos en la consulta booleana.")
+
+        hijos = []
+        for k, (izquierda, derecha) in zip(distancias, zip(operandos, operandos[1:])):
+            if izquierda is not None and derecha is not None:
+                hijos.append(("cerca", [izquierda[1], derecha[1]], k))
+            else:
+                hijos.append(izquierda or derecha)
+        return _combinar("and", hijos)
+
+    def _atomo(self) -> tuple | None:
+        """
+        atomo := '(' expresion ')' | '"' frase '"' | palabra
+
+        Raises:
+            ValueError: Si falta un término o un paréntesis de cierre.
+        """
+        simbolo = self._actual()
+        if simbolo is None:
+            raise ValueError("La consulta booleana termina de forma inesperada.")
+
+        if simbolo == "(":
+            self.posicion += 1
+            nodo = self._expresion()
+            if self._actual() != ")":
+                raise ValueError("Falta cerrar un paréntesis en la consulta booleana.")
+            self.posicion += 1
+            return nodo
+
+        if simbolo == ")" or simbolo in OPERADORES or _PATRON_CERCA.fullmatch(simbolo):
+            raise ValueError(f"Se esperaba un término y se encontró '{simbolo}' en la consulta booleana.")
+
+        self.posicion += 1
+
+        if simbolo.startswith('"'):
+            # Frase: los términos se conservan en orden y con repeticiones
+            terminos = list(self.normalizar(simbolo[1:-1]))
+            if len(terminos) > 1:
+                return ("frase", terminos)
+            return ("termino", terminos[0]) if terminos else None
+
+        terminos = self.normalizar(simbolo)
+        return _combinar("and", [("termino", t) for t in dict.fromkeys(terminos)])
@@ -0,0 +1,329 @@
+# buscador/evaluador_booleano.py
+# Evalúa consultas booleanas (AND/OR/NOT, ver consulta_booleana) sobre el índice
+# invertido. Las conjunciones se planifican empezando por el operando con menos
+# documentos y cada intersección recorre la lista de candidatos avanzando por la
+# otra lista con búsqueda galopante (saltos exponenciales más búsqueda binaria),
+# de modo que el coste depende de la lista más corta y no del tamaño de la colección.
+# Las negaciones dentro de una conjunción se restan de los candidatos; solo una
+# negación sin operandos positivos necesita el complemento sobre todos los documentos.
+# Las frases y la proximidad (NEAR/k) se resuelven en dos fases: primero se
+# intersecan los docIDs de sus términos y después se leen las posiciones solo de
+# esos candidatos, sin decodificar las de los documentos que no pueden coincidir.
+
+import heapq
+from bisect import bisect_left
+from indexer.structures.inverted_index_structure import InvertedIndexStructure
+from indexer.structures.mmap_inverted_index import MmapInvertedIndex
+from indexer.structures.mongo_inverted_index import MongoInvertedIndex
+
+
+def _docid(posting: list) -> str:
+    """
+    Clave de ordenación de un posting: su docID.
+    """
+    return posting[0]
+
+
+def galopar(lista: list, objetivo: str, inicio: int = 0, clave=None) -> int:
+    """
+    Devuelve la primera posición desde 'inicio' cuyo elemento no es menor que 'objetivo'.
+    Avanza con saltos de tamaño creciente (1, 2, 4...) hasta pasarse y después busca
+    con búsqueda binaria en el último salto, así que el coste es logarítmico en la
+    distancia recorrida y no en la longitud de la lista.
+
+    Args:
+        lista (list): Lista ordenada (de docIDs o de postings).
+        objetivo (str): docID buscado.
+        inicio (int): Posición desde la que buscar.
+        clave (Callable, opcional): Función que extrae el docID de cada elemento.
+
+    Returns:
+        int: Posición encontrada (len(lista) si todos los elementos son menores).
+    """
+    fin = inicio
+    salto = 1
+    while fin < len(lista) and (clave(lista[fin]) if clave else lista[fin]) < objetivo:
+        inicio = fin + 1
+        fin += salto
+        salto *= 2
+    return bisect_left(lista, objetivo, lo=inicio, hi=min(fin, len(lista)), key=clave)
+
+
+def intersectar(candidatos: list[str], lista: list, clave=None) -> list[str]:
+    """
+    Intersección de una lista corta de docIDs con otra lista ordenada, recorriendo
+    solo la corta y galopando sobre la otra.
+
+    Args:
+        candidatos (list[str]): docIDs ordenados (la lista corta).
+        lista (list): docIDs o postings ordenados por docID.
+        clave (Callable, opcional): Función que extrae el docID de los elementos de 'lista'.
+
+    Returns:
+        list[str]: docIDs de 'candidatos' presentes en 'lista'.
+    """
+    resultado = []
+    posicion = 0
+    for doc_id in candidatos:
+        posicion = galopar(lista, doc_id, posicion, clave)
+        if posicion == len(lista):
+            break
+        if (clave(lista[posicion]) if clave else lista[posicion]) == doc_id:
+            resultado.append(doc_id)
+    return resultado
+
+
+def restar(candidatos: list[str], lista: list, clave=None) -> list[str]:
+    """
+    Diferencia entre una lista de docIDs y otra lista ordenada, galopando sobre la segunda.
+
+    Args:
+        candidatos (list[str]): docIDs ordenados.
+        lista (list): docIDs o postings ordenados por docID que se excluyen.
+        clave (Callable, opcional): Función que extrae el docID de los elementos de 'lista'.
+
+    Returns:
+        list[str]: docIDs de 'candidatos' que no están en 'lista'.
+    """
+    resultado = []
+    posicion = 0
+    for doc_id in candidatos:
+        posicion = galopar(lista, doc_id, posicion, clave)
+        if posicion == len(lista) or (clave(lista[posicion]) if clave else lista[posicion]) != doc_id:
+            resultado.append(doc_id)
+    return resultado
+
+
+def contiene_frase(posiciones: list[list[int]]) -> bool:
+    """
+    Comprueba si unos términos aparecen seguidos en un documento: existe una posición p
+    del primero tal que el i-ésimo aparece en p + i.
+
+    Args:
+        posiciones (list[list[int]]): Posiciones en el documento de cada término de la frase, en orden.
+
+    Returns:
+        bool: True si la frase aparece en el documento.
+    """
+    siguientes = [set(lista) for lista in posiciones[1:]]
+    return any(
+        all(inicio + i in conjunto for i, conjunto in enumerate(siguientes, 1))
+        for inicio in posiciones[0]
+    )
+
+
+def estan_cerca(primeras: list[int], segundas: list[int], k: int) -> bool:
+    """
+    Comprueba si dos términos aparecen a k posiciones o menos, en cualquier orden, recorriendo
+    a la vez sus listas ordenadas de posiciones.
+
+    Args:
+        primeras (list[int]): Posiciones ordenadas del primer término.
+        segundas (list[int]): Posiciones ordenadas del segundo término.
+        k (int): Distancia máxima.
+
+    Returns:
+        bool: True si alguna pareja de posiciones está a distancia k o menor.
+    """
+    i = j = 0
+    while i < len(primeras) and j < len(segundas):
+        if abs(primeras[i] - segundas[j]) <= k:
+            return True
+        if primeras[i] < segundas[j]:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def unir(listas: list[list[str]]) -> list[str]:
+    """
+    Unión ordenada y sin repetidos de varias listas ordenadas de docIDs (mezcla k-vías).
+
+    Args:
+        listas (list[list[str]]): Listas de docIDs ordenadas.
+
+    Returns:
+        list[str]: docIDs de todas las listas.
+    """
+    resultado = []
+    for doc_id in heapq.merge(*listas):
+        if not resultado or resultado[-1] != doc_id:
+            resultado.append(doc_id)
+    return resultado
+
+
+class EvaluadorBooleano:
+    """
+    Resuelve el árbol de una consulta booleana sobre un índice invertido y devuelve
+    los documentos que la cumplen, ordenados por docID.
+    """
+
+    def __init__(self, estructura: InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex):
+        """
+        Inicializa el evaluador con el índice invertido de la colección procesada.
+
+        Args:
+            estructura (InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex): Índice con
+                postings ordenados por docID y la lista ordenada de documentos indexados.
+        """
+        self.estructura = estructura
+
+    def evaluar(self, consulta: tuple | None) -> list[str]:
+        """
+        Devuelve los documentos que cumplen la consulta.
+
+        Args:
+            consulta (tuple | None): Árbol devuelto por analizar_consulta.
+
+        Returns:
+            list[str]: docIDs ordenados.
+        """
+        if consulta is None:
+            return []
+
+        # Si el índice se lee de forma remota, se descargan de una vez todos los términos
+        if hasattr(self.estructura, "precargar"):
+            self.estructura.precargar(self._terminos(consulta))
+
+        return self._evaluar(consulta)
+
+    def _terminos(self, nodo: tuple) -> list[str]:
+        """
+        Devuelve todos los términos de un árbol de consulta.
+
+        Args:
+            nodo (tuple): Árbol de la consulta.
+
+        Returns:
+            list[str]: Términos (con posibles repeticiones).
+        """
+        if nodo[0] == "termino":
+            return [nodo[1]]
+        if nodo[0] == "not":
+            return self._terminos(nodo[1])
+        if nodo[0] in ("frase", "cerca"):
+            return list(nodo[1])
+        return [t for hijo in nodo[1] for t in self._terminos(hijo)]
+
+    def _estimar(self, nodo: tuple) -> int:
+        """
+        Estima cuántos documentos cumple un subárbol, sin recorrer postings: el df de un
+        término, el mínimo de una conjunción, una frase o una proximidad y la suma de una disyunción.
+
+        Args:
+            nodo (tuple): Subárbol de la consulta.
+
+        Returns:
+            int: Número estimado de documentos.
+        """
+        total = len(self.estructura.documentos)
+        if nodo[0] == "termino":
+            return self.estructura.get_df(nodo[1])
+        if nodo[0] == "not":
+            return total - self._estimar(nodo[1])
+        if nodo[0] in ("frase", "cerca"):
+            return min(self.estructura.get_df(term) for term in nodo[1])
+        if nodo[0] == "or":
+            return min(total, sum(self._estimar(hijo) for hijo in nodo[1]))
+        positivos = [self._estimar(hijo) for hijo in nodo[1] if hijo[0] != "not"]
+        return min(positivos) if positivos else total
+
+    def _lista(self, nodo: tuple) -> tuple[list, object]:
+        """
+        Devuelve la lista ordenada de un subárbol para intersecarla o restarla. Los términos
+        se usan directamente sobre sus postings, sin copiar sus docIDs a otra lista.
+
+        Args:
+            nodo (tuple): Subárbol de la consulta.
+
+        Returns:
+            tuple: (lista de postings o de docIDs, función que extrae el docID o None).
+        """
+        if nodo[0] == "termino":
+            return self.estructura.get_postings(nodo[1], con_posiciones=False), _docid
+        return self._evaluar(nodo), None
+
+    def _evaluar(self, nodo: tuple) -> list[str]:
+        """
+        Evalúa un subárbol de la consulta.
+
+        Args:
+            nodo (tuple): Subárbol de la consulta.
+
+        Returns:
+            list[str]: docIDs ordenados que cumplen el subárbol.
+        """
+        if nodo[0] == "termino":
+            return [posting[0] for posting in self.estructura.get_postings(nodo[1], con_posiciones=False)]
+        if nodo[0] == "or":
+            return unir([self._evaluar(hijo) for hijo in nodo[1]])
+        if nodo[0] == "not":
+            lista, clave = self._lista(nodo[1])
+            return restar(self.estructura.documentos, lista, clave)
+        if nodo[0] == "frase":
+            return self._evaluar_posicional(nodo[1], contiene_frase)
+        if nodo[0] == "cerca":
+            k = nodo[2]
+            return self._evaluar_posicional(nodo[1], lambda posiciones: estan_cerca(posiciones[0], posiciones[1], k))
+        return self._evaluar_conjuncion(nodo[1])
+
+    def _evaluar_posicional(self, terminos: list[str], coincide) -> list[str]:
+        """
+        Evalúa una frase o una proximidad. Los candidatos son los documentos que contienen
+        todos los términos (intersección de docIDs, empezando por el de menor df) y solo de
+        ellos se leen las posiciones de cada término.
+
+        Args:
+            terminos (list[str]): Términos en el orden de la consulta (pueden repetirse).
+            coincide (Callable[[list[list[int]]], bool]): Recibe las posiciones de cada término
+                                                          en un documento y decide si cumple la condición.
+
+        Returns:
+            list[str]: docIDs ordenados que cumplen la frase o la proximidad.
+        """
+        distintos = list(dict.fromkeys(terminos))
+        candidatos = self._evaluar_conjuncion([("termino", term) for term in distintos])
+        if not candidatos:
+            return []
+
+        posiciones = {term: self.estructura.get_positions(term, candidatos) for term in distintos}
+
+        return [
+            doc_id for doc_id in candidatos
+            if coincide([posiciones[term][doc_id] for term in terminos])
+        ]
+
+    def _evaluar_conjuncion(self, hijos: list[tuple]) -> list[str]:
+        """
+        Evalúa una conjunción: interseca los operandos positivos de menor a mayor número
+        estimado de documentos y después resta los negados. En cuanto no quedan candidatos
+        se deja de leer el resto de operandos.
+
+        Args:
+            hijos (list[tuple]): Operandos de la conjunción.
+
+        Returns:
+            list[str]: docIDs ordenados que cumplen todos los operandos.
+        """
+        positivos = sorted((hijo for hijo in hijos if hijo[0] != "not"), key=self._estimar)
+        negados = sorted((hijo[1] for hijo in hijos if hijo[0] == "not"), key=self._estimar, reverse=True)
+
+        candidatos = self._evaluar(positivos[0]) if positivos else self.estructura.documentos
+        for hijo in positivos[1:]:
+            if not candidatos:
+                return []
+            lista, clave = self._lista(hijo)
+            # Se recorre siempre la lista más corta y se galopa sobre la otra
+            if clave is None and len(lista) < len(candidatos):
+                candidatos = intersectar(lista, candidatos)
+            else:
+                candidatos = intersectar(candidatos, lista, clave)
+
+        for hijo in negados:
+            if not candidatos:
+                break
+            lista, clave = self._lista(hijo)
+            candidatos = restar(candidatos, lista, clave)
+
+        return list(candidatos)
@@ -0,0 +1,199 @@
+# buscador/evaluador_indice.py
+# Evalúa consultas directamente sobre el índice invertido (term-at-a-time):
+# solo se recorren los postings de los términos de la consulta y se acumula
+# la puntuación de cada documento, sin tocar los documentos que no comparten
+# ningún término con ella. Para top-k se usa además una evaluación
+# documento a documento con poda MaxScore basada en las cotas por término.
+
+import math
+import heapq
+from bisect import bisect_left
+from buscador.base_comparador import QueryComparator
+from indexer.structures.inverted_index_structure import InvertedIndexStructure
+from indexer.structures.mmap_inverted_index import MmapInvertedIndex
+from indexer.structures.mongo_inverted_index import MongoInvertedIndex
+
+class EvaluadorIndice:
+    """
+    Resuelve consultas término a término sobre un índice invertido.
+    La puntuación final de cada documento la decide el comparador
+    a partir del número de términos en común y las normas de los vectores,
+    que se leen de las estadísticas guardadas con el índice.
+    """
+
+    def __init__(self, estructura: InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex):
+        """
+        Inicializa el evaluador con el índice invertido de la colección procesada.
+
+        Args:
+            estructura (InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex): Índice ya
+                cargado en memoria, mapeado desde un fichero binario o leído por términos de MongoDB
+                (todos ofrecen la misma interfaz de consulta).
+        """
+        self.estructura = estructura
+        self._compartidas = None
+
+    def _precargar(self, tokens: list[str]):
+        """
+        Si el índice se lee de forma remota (MongoInvertedIndex), descarga de una vez
+        los postings de todos los términos de la consulta.
+
+        Args:
+            tokens (list[str]): Consulta ya preprocesada.
+        """
+        if hasattr(self.estructura, "precargar"):
+            self.estructura.precargar(tokens)
+
+    def _get_postings(self, term: str) -> list:
+        """
+        Devuelve los postings (sin posiciones) de un término. Durante una evaluación por lotes
+        cada término se lee una sola vez y se comparte entre todas las consultas del lote.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            list: Postings [docID, frecuencia] ordenados por docID.
+        """
+        if self._compartidas is None:
+            return self.estructura.get_postings(term, con_posiciones=False)
+        if term not in self._compartidas:
+            self._compartidas[term] = self.estructura.get_postings(term, con_posiciones=False)
+        return self._compartidas[term]
+
+    def evaluar_lote(self, consultas: list[list[str]], comparador: QueryComparator, k: int | None = None) -> list[dict[str, float]]:
+        """
+        Evalúa varias consultas compartiendo la lectura del índice: los términos de todas
+        ellas se precargan juntos y los postings de cada término se leen (o decodifican)
+        una sola vez para todo el lote. Cada consulta obtiene el mismo resultado que con
+        evaluar o evaluar_top_k.
+
+        Args:
+            consultas (list[list[str]]): Consultas ya preprocesadas.
+            comparador (QueryComparator): Comparador que normaliza la puntuación acumulada.
+            k (int | None): Si se indica, número de resultados por consulta (con poda MaxScore).
+
+        Returns:
+            list[dict[str, float]]: Diccionario docID → puntuación de cada consulta, en el mismo orden.
+        """
+        self._precargar([term for tokens in consultas for term in tokens])
+        self._compartidas = {}
+        try:
+            return [self.evaluar_top_k(tokens, comparador, k) if k else self.evaluar(tokens, comparador) for tokens in consultas]
+        finally:
+            self._compartidas = None
+
+    def evaluar(self, tokens: list[str], comparador: QueryComparator) -> dict[str, float]:
+        """
+        Puntúa los documentos que comparten al menos un término con la consulta.
+
+        Args:
+            tokens (list[str]): Consulta ya preprocesada.
+            comparador (QueryComparator): Comparador que normaliza la puntuación acumulada.
+
+        Returns:
+            dict[str, float]: Diccionario docID → puntuación.
+        """
+        # La consulta se representa como vector binario: cada término cuenta una vez
+        self._precargar(tokens)
+        terminos = [t for t in dict.fromkeys(tokens) if self._get_postings(t)]
+        if not terminos:
+            return {}
+
+        # Acumulación término a término sobre los postings
+        acumulados = {}
+        for term in terminos:
+            for posting in self._get_postings(term):
+                doc_id = posting[0]
+                acumulados[doc_id] = acumulados.get(doc_id, 0) + 1
+
+        norma_consulta = math.sqrt(len(terminos))
+        normas = self.estructura.get_doc_norms()
+
+        return {
+            doc_id: comparador.normalizar_acumulado(acumulado, norma_consulta, normas.get(doc_id, 0.0))
+            for doc_id, acumulado in acumulados.items()
+        }
+
+    def evaluar_top_k(self, tokens: list[str], comparador: QueryComparator, k: int) -> dict[str, float]:
+        """
+        Devuelve los k documentos mejor puntuados usando la poda MaxScore.
+
+        Los términos de la consulta se ordenan por su aportación máxima posible. Los de menor
+        aportación cuya suma no alcanza la k-ésima puntuación actual pasan a ser "no esenciales":
+        ya no generan candidatos y solo se consultan (con búsqueda binaria) para documentos que
+        todavía pueden entrar en el top-k. Solo se mantienen k candidatos en un heap acotado.
+
+        Args:
+            tokens (list[str]): Consulta ya preprocesada.
+            comparador (QueryComparator): Comparador que normaliza la puntuación acumulada.
+            k (int): Número de resultados a devolver.
+
+        Returns:
+            dict[str, float]: Diccionario docID → puntuación con, como mucho, k entradas.
+        """
+        self._precargar(tokens)
+        terminos = [t for t in dict.fromkeys(tokens) if self._get_postings(t)]
+        if not terminos or k <= 0:
+            return {}
+
+        norma_consulta = math.sqrt(len(terminos))
+        normas = self.estructura.get_doc_norms()
+
+        # Aportación máxima de cada término: la de su documento de menor norma
+        def cota(term):
+            return comparador.normalizar_acumulado(1, norma_consulta, 1 / self.estructura.get_upper_bound(term))
+
+        terminos.sort(key=cota)
+        listas = [self._get_postings(t) for t in terminos]
+        cotas = [cota(t) for t in terminos]
+        acumuladas = [0.0]
+        for c in cotas:
+            acumuladas.append(acumuladas[-1] + c)
+
+        punteros = [0] * len(listas)
+        heap = []
+        primer_esencial = 0
+
+        while True:
+            umbral = heap[0][0] if len(heap) == k else -1.0
+
+            # Los términos cuya suma de cotas no supera el umbral dejan de generar candidatos
+            while primer_esencial < len(listas) and acumuladas[primer_esencial + 1] <= umbral:
+                primer_esencial += 1
+            if primer_esencial == len(listas):
+                break
+
+            # Siguiente candidato: el menor docID entre las listas esenciales
+            candidatos = [
+                listas[i][punteros[i]][0]
+                for i in range(primer_esencial, len(listas)) if punteros[i] < len(listas[i])
+            ]
+            if not candidatos:
+                break
+            doc_id = min(candidatos)
+
+            norma_doc = normas.get(doc_id, 0.0)
+            aportacion = comparador.normalizar_acumulado(1, norma_consulta, norma_doc)
+
+            coincidencias = 0
+            for i in range(primer_esencial, len(listas)):
+                if punteros[i] < len(listas[i]) and listas[i][punteros[i]][0] == doc_id:
+                    coincidencias += 1
+                    punteros[i] += 1
+
+            # Completar con las listas no esenciales mientras el documento pueda superar el umbral
+            for i in range(primer_esencial - 1, -1, -1):
+                if coincidencias * aportacion + acumuladas[i + 1] <= umbral:
+                    break
+                punteros[i] = bisect_left(listas[i], doc_id, lo=punteros[i], key=lambda posting: posting[0])
+                if punteros[i] < len(listas[i]) and listas[i][punteros[i]][0] == doc_id:
+                    coincidencias += 1
+
+            puntuacion = comparador.normalizar_acumulado(coincidencias, norma_consulta, norma_doc)
+            if len(heap) < k:
+                heapq.heappush(heap, (puntuacion, doc_id))
+            elif puntuacion > umbral:
+                heapq.heapreplace(heap, (puntuacion, doc_id))
+
+        return {doc_id: puntuacion for puntuacion, doc_id in heap}
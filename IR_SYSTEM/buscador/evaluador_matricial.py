@@ -0,0 +1,188 @@
+# buscador/evaluador_matricial.py
+# Evalúa consultas sobre una matriz dispersa término-documento (CSR) construida
+# una sola vez a partir de las representaciones documentales de la colección
+# procesada. Cada consulta se resuelve con un único producto vector-matriz
+# disperso y la selección top-k con argpartition, en lugar de recorrer los
+# vectores documentales en Python. Necesita NumPy y SciPy (opcionales).
+
+import math
+from buscador.base_comparador import QueryComparator
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+
+def matricial_disponible() -> bool:
+    """
+    Indica si están instaladas las dependencias del evaluador matricial.
+
+    Returns:
+        bool: True si se pueden importar NumPy y SciPy.
+    """
+    return np is not None and sparse is not None
+
+
+class EvaluadorMatricial:
+    """
+    Resuelve consultas sobre la matriz término-documento de una colección procesada.
+
+    Cada fila de la matriz es un término (o ID de término, en las representaciones
+    dispersas) y cada columna un documento, en el mismo orden en que se cargaron las
+    representaciones. Al ser booleanas, el producto de la consulta por la matriz da el
+    número de términos en común con cada documento, y el comparador lo normaliza igual
+    que en la evaluación sobre el índice invertido.
+    """
+
+    CONSULTAS_POR_BLOQUE = 256
+
+    def __init__(self, doc_reps: list[dict]):
+        """
+        Construye la matriz a partir de las representaciones documentales.
+
+        Args:
+            doc_reps (list[dict]): Representaciones con las claves 'Document_ID' y 'Content'
+                                   (diccionario término → peso o lista dispersa de IDs).
+
+        Raises:
+            ImportError: Si NumPy o SciPy no están instalados.
+        """
+        if not matricial_disponible():
+            raise ImportError("La búsqueda matricial necesita NumPy y SciPy (pip install numpy scipy).")
+
+        self.doc_ids = [str(doc["Document_ID"]) for doc in doc_reps]
+        self.filas = {}
+
+        filas, columnas, pesos = [], [], []
+        for columna, doc in enumerate(doc_reps):
+            for clave, peso in QueryComparator.a_diccionario(doc["Content"]).items():
+                if peso:
+                    filas.append(self.filas.setdefault(clave, len(self.filas)))
+                    columnas.append(columna)
+                    pesos.append(peso)
+
+        self.matriz = sparse.csr_matrix(
+            (np.asarray(pesos, dtype=np.float64), (np.asarray(filas, dtype=np.int64), np.asarray(columnas, dtype=np.int64))),
+            shape=(len(self.filas), len(self.doc_ids))
+        )
+
+        # Norma L2 de cada vector documental (la misma que la precalculada al indexar)
+        self.normas = np.sqrt(np.asarray(self.matriz.multiply(self.matriz).sum(axis=0)).ravel())
+
+    def evaluar(self, consulta_rep: dict, comparador: QueryComparator, top_k: int | None = None) -> list[tuple[str, float]]:
+        """
+        Puntúa todos los documentos frente a la consulta.
+
+        Args:
+            consulta_rep (dict): Representación de la consulta ya preparada por el comparador
+                                 (término/ID → peso, sin pesos nulos).
+            comparador (QueryComparator): Comparador que normaliza los productos punto.
+            top_k (int | None): Número máximo de resultados.
+
+        Returns:
+            list[tuple[str, float]]: Pares (docID, puntuación) ordenados por puntuación descendente;
+                                     los empates conservan el orden de carga de los documentos.
+        """
+        return self.evaluar_lote([consulta_rep], comparador, top_k)[0]
+
+    def evaluar_lote(self, consultas_rep: list[dict], comparador: QueryComparator, top_k: int | None = None) -> list[list[tuple[str, float]]]:
+        """
+        Puntúa varias consultas a la vez: las consultas forman una matriz dispersa (una fila
+        por consulta) que se multiplica por la matriz término-documento. Se procesan en bloques
+        de CONSULTAS_POR_BLOQUE para acotar el tamaño del producto.
+
+        Args:
+            consultas_rep (list[dict]): Representaciones de las consultas ya preparadas por el comparador.
+            comparador (QueryComparator): Comparador que normaliza los productos punto.
+            top_k (int | None): Número máximo de resultados por consulta.
+
+        Returns:
+            list[list[tuple[str, float]]]: Resultados de cada consulta, en el mismo orden (ver evaluar).
+        """
+        resultados = []
+        for inicio in range(0, len(consultas_rep), self.CONSULTAS_POR_BLOQUE):
+            resultados.extend(self._evaluar_bloque(consultas_rep[inicio:inicio + self.CONSULTAS_POR_BLOQUE], comparador, top_k))
+        return resultados
+
+    def _evaluar_bloque(self, consultas_rep: list[dict], comparador: QueryComparator, top_k: int | None) -> list[list[tuple[str, float]]]:
+        """
+        Puntúa un bloque de consultas con un único producto matriz-matriz disperso.
+
+        Args:
+            consultas_rep (list[dict]): Representaciones de las consultas del bloque.
+            comparador (QueryComparator): Comparador que normaliza los productos punto.
+            top_k (int | None): Número máximo de resultados por consulta.
+
+        Returns:
+            list[list[tuple[str, float]]]: Resultados de cada consulta del bloque.
+        """
+        filas, columnas, pesos = [], [], []
+        for fila, consulta_rep in enumerate(consultas_rep):
+            for clave, peso in consulta_rep.items():
+                if clave in self.filas:
+                    filas.append(fila)
+                    columnas.append(self.filas[clave])
+                    pesos.append(peso)
+
+        consultas = sparse.csr_matrix(
+            (np.asarray(pesos, dtype=np.float64), (np.asarray(filas, dtype=np.int64), np.asarray(columnas, dtype=np.int64))),
+            shape=(len(consultas_rep), len(self.filas))
+        )
+
+        # Producto punto de cada consulta con todos los documentos: cada fila del resultado
+        # contiene solo los documentos que comparten algún término con la consulta
+        acumulados = consultas @ self.matriz
+
+        # Se normalizan de una vez todos los candidatos del bloque (el resto puntúa 0)
+        normas_consulta = np.array([math.sqrt(sum(v ** 2 for v in consulta_rep.values())) for consulta_rep in consultas_rep])
+        consulta_de = np.repeat(np.arange(len(consultas_rep)), np.diff(acumulados.indptr))
+        candidatas = comparador.normalizar_acumulados(
+            acumulados.data, normas_consulta[consulta_de], self.normas[acumulados.indices]
+        )
+
+        resultados = []
+        for fila in range(len(consultas_rep)):
+            inicio, fin = acumulados.indptr[fila], acumulados.indptr[fila + 1]
+            puntuaciones = np.zeros(len(self.doc_ids))
+            puntuaciones[acumulados.indices[inicio:fin]] = candidatas[inicio:fin]
+            resultados.append([(self.doc_ids[i], float(puntuaciones[i])) for i in self._seleccionar(puntuaciones, top_k)])
+        return resultados
+
+    @staticmethod
+    def _seleccionar(puntuaciones, top_k: int | None):
+        """
+        Devuelve las posiciones de los mejores documentos en orden de puntuación descendente.
+        Con top_k se parte el vector con argpartition y solo se ordenan los k seleccionados;
+        en el umbral se eligen los primeros documentos empatados, como en la búsqueda exhaustiva.
+
+        Args:
+            puntuaciones (np.ndarray): Puntuación de cada documento.
+            top_k (int | None): Número máximo de resultados.
+
+        Returns:
+            np.ndarray: Posiciones de los documentos seleccionados, ordenadas.
+        """
+        if top_k and top_k < len(puntuaciones):
+            umbral = puntuaciones[np.argpartition(-puntuaciones, top_k - 1)[top_k - 1]]
+            mayores = np.flatnonzero(puntuaciones > umbral)
+            empatados = np.flatnonzero(puntuaciones == umbral)[:top_k - len(mayores)]
+            seleccion = np.concatenate((mayores, empatados))
+        else:
+            seleccion = np.arange(len(puntuaciones))
+
+        return seleccion[np.argsort(-puntuaciones[seleccion], kind="stable")]
+
+    def estimar_memoria(self) -> int:
+        """
+        Estima los bytes que ocupan la matriz, las normas y los mapas de términos y documentos.
+
+        Returns:
+            int: Estimación en bytes.
+        """
+        return (
+            self.matriz.data.nbytes + self.matriz.indices.nbytes + self.matriz.indptr.nbytes
+            + self.normas.nbytes + 150 * len(self.filas) + 100 * len(self.doc_ids)
+        )
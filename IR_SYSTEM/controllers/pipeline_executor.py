@@ -4,6 +4,14 @@
 
 import os
 import json
+import time
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from datetime import datetime
+from multiprocessing.connection import wait
 from bson import ObjectId
 from db.collection_model import CollectionModel
 from db.document_model import DocumentModel
@@ -16,8 +24,110 @@ from db.representation_type_model import RepresentationTypeModel
 from factories.preprocessing_step_factory import build_steps_from_methods
 from factories.representation_structure_factory import get_structure
 from factories.document_representator_factory import get_representator
-from extractor.extraction_controller import is_compressed, extract_files_from_archive
+from extractor.extraction_controller import is_compressed, extract_files_from_archive, compute_fingerprint
 from factories.extractor_factory import get_extractor_for_file
+from indexer.binary_index import escribir_indice_binario, cargar_estructura_global, EXTENSION as BINARY_EXTENSION
+
+
+def _extraer_documento(ruta: str, ruta_txt: str) -> None:
+    """
+    Extrae el texto de un archivo y lo guarda en ruta_txt. Se escribe primero en un
+    fichero temporal para que nunca quede un .txt a medio escribir.
+
+    Parámetros:
+    - ruta (str): ruta del archivo original.
+    - ruta_txt (str): ruta del fichero de texto de salida.
+    """
+    extractor = get_extractor_for_file(ruta)
+    resultados = extractor.extract(ruta)
+    texto = "\n".join(res.get("texto", "") for res in resultados)
+
+    ruta_tmp = _ruta_temporal(ruta_txt)
+    with open(ruta_tmp, "w", encoding="utf-8") as f:
+        f.write(texto)
+    os.replace(ruta_tmp, ruta_txt)
+
+
+def _ruta_temporal(ruta_txt: str) -> str:
+    """
+    Ruta del fichero temporal en el que se escribe un texto antes de renombrarlo.
+    """
+    return f"{ruta_txt}.tmp"
+
+
+def _proceso_extraccion(conexion) -> None:
+    """
+    Punto de entrada de cada proceso de extracción en paralelo. El proceso atiende
+    documentos hasta recibir None: por cada tarea (ruta, ruta_txt) envía por la conexión
+    None si todo fue bien o el mensaje de error.
+    """
+    try:
+        while True:
+            tarea = conexion.recv()
+            if tarea is None:
+                break
+            try:
+                _extraer_documento(*tarea)
+                conexion.send(None)
+            except Exception as e:
+                conexion.send(str(e))
+    except EOFError:
+        # El proceso principal cerró la conexión
+        pass
+    finally:
+        conexion.close()
+
+
+# Pasos de preprocesamiento de cada proceso del pool (uno por método), construidos
+# una sola vez al arrancar el proceso
+_pasos_preprocesado = None
+
+
+def _inicializar_preprocesado(metodos: list[dict]) -> None:
+    """
+    Inicializador de los procesos de preprocesamiento en paralelo: construye los pasos
+    de cada método de preprocesamiento del pipeline.
+
+    Parámetro:
+    - metodos (list[dict]): métodos de preprocesamiento, en el orden del pipeline.
+    """
+    global _pasos_preprocesado
+    _pasos_preprocesado = [build_steps_from_methods([metodo]) for metodo in metodos]
+
+
+def _aplicar_preprocesado(pasos_por_metodo: list[list], texto: str) -> list:
+    """
+    Aplica en cadena los pasos de preprocesamiento a un texto.
+
+    Parámetros:
+    - pasos_por_metodo (list[list]): pasos de cada método, en el orden del pipeline.
+    - texto (str): texto del documento.
+
+    Retorna:
+    - list: salida de cada método (una por método).
+    """
+    salidas = []
+    datos = texto
+    for pasos in pasos_por_metodo:
+        for paso in pasos:
+            datos = paso.apply(datos)
+        salidas.append(datos)
+    return salidas
+
+
+def _preprocesar_lote(textos: list[str]) -> list[list]:
+    """
+    Punto de entrada de cada tarea de preprocesamiento en paralelo: preprocesa un lote
+    de textos con los pasos construidos por _inicializar_preprocesado.
+
+    Parámetro:
+    - textos (list[str]): textos del lote.
+
+    Retorna:
+    - list[list]: salidas de cada texto, en el mismo orden que el lote.
+    """
+    return [_aplicar_preprocesado(_pasos_preprocesado, texto) for texto in textos]
+
 
 class PipelineExecutor:
     """
@@ -33,14 +143,23 @@ class PipelineExecutor:
         - collection_path (str): ruta local de la colección de documentos.
         """
         self.collection_path = collection_path
+        self.extraction_workers = int(os.environ.get("IR_EXTRACTION_WORKERS", 1))
+        self.extraction_timeout = float(os.environ.get("IR_EXTRACTION_TIMEOUT", 0)) or None
+        self.preprocessing_workers = int(os.environ.get("IR_PREPROCESSING_WORKERS", 1))
+        self.preprocessing_batch = int(os.environ.get("IR_PREPROCESSING_BATCH", 64))
         self.collection_model = CollectionModel()
         self.document_model = DocumentModel()
         self.pipeline_method_model = PipelineConfigModel()
+        self.doc_rep_model = DocumentRepresentationModel()
+        self.col_rep_model = CollectionRepresentationModel()
+        self.rep_type_model = RepresentationTypeModel()
   
     def registrar_coleccion(self, language: str, nombre_personalizado: str = None) -> str:
         """
         Registra una colección de documentos en la base de datos y registra sus documentos.
         Soporta tanto archivos comprimidos como directorios o archivos sueltos.
+        El registro no extrae el contenido: solo comprueba que haya un extractor para
+        cada archivo. La extracción se hace una única vez en extraer_textos.
 
         Parámetros:
         - language (str): idioma principal de la colección.
@@ -53,60 +172,322 @@ class PipelineExecutor:
         nombre = nombre_personalizado or os.path.basename(self.collection_path)
         collection_id = self.collection_model.insert_collection(nombre, language, self.collection_path)
 
+        with self.document_model.bulk_writer() as escritor:
+            for path in self._listar_archivos(self.collection_path):
+                self._registrar_documento(collection_id, path, escritor)
+
+        # Huella del archivo comprimido, para no volver a descomprimirlo si no cambia
         if is_compressed(self.collection_path):
-            archivos = extract_files_from_archive(self.collection_path)
-        elif os.path.isdir(self.collection_path):
-            archivos = [os.path.join(self.collection_path, f) for f in os.listdir(self.collection_path)]
-        else:
-            archivos = [self.collection_path]
+            self.collection_model.update_fingerprint(collection_id, compute_fingerprint(self.collection_path))
 
-        for path in archivos:
-            try:
-                extractor = get_extractor_for_file(path)
-                textos = extractor.extract(path)
-                
-                for i, doc in enumerate(textos):
-                    nombre_doc = doc.get("nombre") or f"{os.path.splitext(os.path.basename(path))[0]}_doc{i}"
-                    self.document_model.insert_document(collection_id, nombre_doc, path)
+        return collection_id
 
-            except Exception as e:
-                print(f"No se pudo registrar {path}: {e}")
+    @staticmethod
+    def _listar_archivos(collection_path: str) -> list[str]:
+        """
+        Lista los archivos de una colección: los de un archivo comprimido (que se
+        descomprime), los de un directorio o el propio archivo suelto.
 
-        return collection_id
+        Parámetro:
+        - collection_path (str): ruta de la colección.
 
-    def extraer_textos(self, collection_id: str) -> None:
+        Retorna:
+        - list[str]: rutas de los archivos.
+        """
+        if is_compressed(collection_path):
+            return extract_files_from_archive(collection_path)
+        elif os.path.isdir(collection_path):
+            return [os.path.join(collection_path, f) for f in os.listdir(collection_path)]
+        return [collection_path]
+
+    def _registrar_documento(self, collection_id: str, path: str, escritor=None) -> str | None:
+        """
+        Registra un archivo como documento de la colección si existe un extractor para él.
+
+        Parámetros:
+        - collection_id (str): ID de la colección.
+        - path (str): ruta del archivo.
+        - escritor (BulkWriter, opcional): escritor por lotes al que añadir el documento.
+
+        Retorna:
+        - str | None: ID del documento o None si no se pudo registrar.
+        """
+        try:
+            # Valida que el tipo de archivo esté soportado sin extraer su texto
+            get_extractor_for_file(path)
+            return self.document_model.insert_document(collection_id, os.path.basename(path), path, escritor=escritor)
+
+        except Exception as e:
+            print(f"No se pudo registrar {path}: {e}")
+            return None
+
+    def extraer_textos(self, collection_id: str, workers: int = None, timeout: float = None, forzar: bool = False) -> dict[str, str]:
         """
         Extrae los textos de todos los documentos registrados en una colección
         y los guarda como archivos .txt en una carpeta específica.
 
-        Parámetro:
+        La extracción es incremental: antes se sincroniza la colección con su ruta
+        (se registran los archivos nuevos y se eliminan los documentos y textos de los
+        archivos que ya no existen) y solo se extraen los documentos nuevos o cuya huella
+        (tamaño, fecha de modificación y hash) ha cambiado, salvo que se indique 'forzar'.
+        Si la colección es un archivo comprimido cuya huella no ha cambiado, no se
+        descomprime de nuevo ni se recalculan las huellas de los documentos ya extraídos.
+
+        Con más de un worker, los documentos se reparten entre 'workers' procesos que se
+        reutilizan de un documento a otro, y cada texto se escribe en cuanto termina.
+        Un documento que falla, se cuelga más de 'timeout' segundos o hace caer
+        su proceso solo afecta a ese documento (el proceso se sustituye por otro).
+
+        Parámetros:
         - collection_id (str): ID de la colección.
+        - workers (int, opcional): número de procesos de extracción
+          (por defecto, la variable de entorno IR_EXTRACTION_WORKERS o 1).
+        - timeout (float, opcional): segundos máximos por documento en modo paralelo
+          (por defecto, IR_EXTRACTION_TIMEOUT o sin límite).
+        - forzar (bool): si es True, vuelve a extraer todos los documentos.
+
+        Retorna:
+        - dict[str, str]: errores por documento (docID → mensaje).
         """
 
+        workers = workers or self.extraction_workers
+        timeout = timeout or self.extraction_timeout
+
         carpeta_destino = os.path.join("extracted_texts", str(collection_id))
         os.makedirs(carpeta_destino, exist_ok=True)
-        documentos = self.document_model.get_documents_by_collection(collection_id)
+        documentos, archivo_sin_cambios = self._sincronizar_documentos(collection_id, carpeta_destino)
 
+        tareas = []
+        huellas = {}
+        errores = {}
         for doc in documentos:
             doc_id = str(doc["_id"])
-            nombre = doc["Name"]
-            ruta = doc["Path"]
+            ruta_txt = os.path.join(carpeta_destino, f"{doc_id}.txt")
+            anterior = doc.get("Fingerprint")
+
+            if archivo_sin_cambios and not forzar and anterior and os.path.exists(ruta_txt):
+                # El archivo comprimido es el mismo de la última extracción, así que este documento también
+                continue
 
             try:
-                extractor = get_extractor_for_file(ruta)
-                resultados = extractor.extract(ruta)
+                huella = compute_fingerprint(doc["Path"], anterior)
+            except OSError as e:
+                errores[doc_id] = str(e)
+                continue
 
-                for res in resultados:
-                    texto = res.get("texto", "")
-                    ruta_txt = os.path.join(carpeta_destino, f"{doc_id}.txt")
+            if not forzar and os.path.exists(ruta_txt):
+                if anterior and anterior["Hash"] == huella["Hash"]:
+                    # Contenido sin cambios: solo se actualiza la fecha de modificación si ha variado
+                    if anterior != huella:
+                        self.document_model.update_fingerprint(doc_id, huella, extraido=False)
+                    continue
+                if not anterior and self._texto_vigente(doc["Path"], ruta_txt):
+                    # Texto extraído antes de guardar huellas: se adopta la huella actual
+                    self.document_model.update_fingerprint(doc_id, huella)
+                    continue
 
-                    with open(ruta_txt, "w", encoding="utf-8") as f:
-                        f.write(texto)
+            huellas[doc_id] = huella
+            tareas.append((doc_id, doc["Path"], ruta_txt))
 
-            except Exception as e:
-                print(f"Error al extraer texto de {ruta}: {e}")
+        print(f"Extracción: {len(tareas)} documento(s) nuevos o modificados de {len(documentos)}")
+
+        if workers > 1:
+            errores.update(self._extraer_en_paralelo(tareas, workers, timeout))
+        else:
+            for doc_id, ruta, ruta_txt in tareas:
+                try:
+                    _extraer_documento(ruta, ruta_txt)
+                except Exception as e:
+                    errores[doc_id] = str(e)
+
+        for doc_id, huella in huellas.items():
+            if doc_id not in errores:
+                self.document_model.update_fingerprint(doc_id, huella)
+
+        rutas = {str(doc["_id"]): doc["Path"] for doc in documentos}
+        for doc_id, error in errores.items():
+            print(f"Error al extraer texto de {rutas[doc_id]}: {error}")
 
         self.collection_model.update_state(collection_id, "extraída")
+        return errores
+
+    def _sincronizar_documentos(self, collection_id: str, carpeta_textos: str) -> tuple[list[dict], bool]:
+        """
+        Sincroniza los documentos registrados con los archivos presentes en la ruta de la
+        colección: registra los archivos nuevos y elimina los documentos (y sus textos
+        extraídos) cuyos archivos han desaparecido.
+
+        Si la colección es un archivo comprimido, solo se descomprime cuando su huella ha
+        cambiado (o falta alguno de los archivos descomprimidos); si no, no puede haber
+        archivos nuevos ni modificados.
+
+        Parámetros:
+        - collection_id (str): ID de la colección.
+        - carpeta_textos (str): carpeta con los textos extraídos de la colección.
+
+        Retorna:
+        - tuple[list[dict], bool]: documentos vigentes de la colección y si el archivo
+          comprimido no ha cambiado desde la última descompresión.
+        """
+        documentos = self.document_model.get_documents_by_collection(collection_id)
+        coleccion = self.collection_model.get_collection_by_id(collection_id)
+        ruta_coleccion = coleccion.get("Path") if coleccion else None
+        huella = None
+        archivo_sin_cambios = False
+
+        if ruta_coleccion and os.path.exists(ruta_coleccion) and is_compressed(ruta_coleccion):
+            anterior = coleccion.get("Fingerprint")
+            huella = compute_fingerprint(ruta_coleccion, anterior)
+            archivo_sin_cambios = (
+                anterior is not None and anterior["Hash"] == huella["Hash"]
+                and all(os.path.exists(doc["Path"]) for doc in documentos)
+            )
+            if huella == anterior:
+                huella = None
+
+        if ruta_coleccion and os.path.exists(ruta_coleccion) and not archivo_sin_cambios:
+            registrados = {os.path.abspath(doc["Path"]) for doc in documentos}
+            nuevos = [
+                path for path in self._listar_archivos(ruta_coleccion)
+                if os.path.abspath(path) not in registrados
+            ]
+            with self.document_model.bulk_writer() as escritor:
+                for path in nuevos:
+                    self._registrar_documento(collection_id, path, escritor)
+            if nuevos:
+                documentos = self.document_model.get_documents_by_collection(collection_id)
+
+        # La huella se guarda después de descomprimir, para no dar por buena una descompresión fallida
+        if huella is not None:
+            self.collection_model.update_fingerprint(collection_id, huella)
+
+        vigentes = []
+        for doc in documentos:
+            if os.path.exists(doc["Path"]):
+                vigentes.append(doc)
+                continue
+
+            print(f"El archivo {doc['Path']} ya no existe: se elimina el documento y su texto")
+            self.document_model.delete_document(doc["_id"])
+            ruta_txt = os.path.join(carpeta_textos, f"{doc['_id']}.txt")
+            if os.path.exists(ruta_txt):
+                os.remove(ruta_txt)
+
+        return vigentes, archivo_sin_cambios
+
+    @staticmethod
+    def _texto_vigente(ruta: str, ruta_txt: str) -> bool:
+        """
+        Indica si el texto extraído de un archivo sigue siendo válido, es decir,
+        si existe y es posterior a la última modificación del archivo original.
+
+        Parámetros:
+        - ruta (str): ruta del archivo original.
+        - ruta_txt (str): ruta del texto extraído.
+
+        Retorna:
+        - bool: True si no hace falta volver a extraerlo.
+        """
+        try:
+            return os.path.getmtime(ruta_txt) >= os.path.getmtime(ruta)
+        except OSError:
+            return False
+
+    def _extraer_en_paralelo(self, tareas: list[tuple], workers: int, timeout: float = None) -> dict[str, str]:
+        """
+        Reparte la extracción entre un conjunto acotado de procesos que se reutilizan de un
+        documento a otro (como mucho 'workers'). Cada proceso atiende un documento cada vez,
+        de forma que un fallo grave (excepción, caída del intérprete o tiempo excedido) solo
+        afecta a ese documento: el proceso caído o detenido se sustituye por uno nuevo y el
+        resto del lote continúa.
+
+        Parámetros:
+        - tareas (list[tuple]): tuplas (docID, ruta del archivo, ruta del .txt).
+        - workers (int): número máximo de procesos simultáneos.
+        - timeout (float, opcional): segundos máximos por documento.
+
+        Retorna:
+        - dict[str, str]: errores por documento (docID → mensaje).
+        """
+        pendientes = deque(tareas)
+        libres = []
+        # proceso → (conexión, docID, ruta del .txt, instante de inicio)
+        ocupados = {}
+        errores = {}
+
+        def nuevo_proceso():
+            conexion, conexion_hijo = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(target=_proceso_extraccion, args=(conexion_hijo,), daemon=True)
+            proceso.start()
+            conexion_hijo.close()
+            return proceso, conexion
+
+        def descartar(proceso, conexion, ruta_txt):
+            # El proceso se sustituye y el texto a medio escribir no llega a renombrarse
+            if proceso.is_alive():
+                proceso.terminate()
+            proceso.join()
+            conexion.close()
+            if os.path.exists(_ruta_temporal(ruta_txt)):
+                os.remove(_ruta_temporal(ruta_txt))
+
+        try:
+            while pendientes or ocupados:
+                while pendientes and (libres or len(ocupados) < workers):
+                    proceso, conexion = libres.pop() if libres else nuevo_proceso()
+                    doc_id, ruta, ruta_txt = pendientes.popleft()
+                    try:
+                        conexion.send((ruta, ruta_txt))
+                    except (BrokenPipeError, OSError):
+                        # El proceso libre murió mientras esperaba: se sustituye y la tarea se reintenta
+                        descartar(proceso, conexion, ruta_txt)
+                        pendientes.appendleft((doc_id, ruta, ruta_txt))
+                        continue
+                    ocupados[proceso] = (conexion, doc_id, ruta_txt, time.monotonic())
+
+                esperas = [proceso.sentinel for proceso in ocupados] + [conexion for conexion, _, _, _ in ocupados.values()]
+                wait(esperas, timeout=0.5)
+
+                for proceso, (conexion, doc_id, ruta_txt, inicio) in list(ocupados.items()):
+                    if conexion.poll():
+                        try:
+                            error = conexion.recv()
+                            libres.append((proceso, conexion))
+                        except (EOFError, OSError):
+                            # El proceso terminó sin enviar resultado (por ejemplo, una caída del intérprete)
+                            descartar(proceso, conexion, ruta_txt)
+                            error = f"el proceso de extracción terminó con código {proceso.exitcode}"
+                    elif not proceso.is_alive():
+                        descartar(proceso, conexion, ruta_txt)
+                        error = f"el proceso de extracción terminó con código {proceso.exitcode}"
+                    elif timeout and time.monotonic() - inicio > timeout:
+                        descartar(proceso, conexion, ruta_txt)
+                        error = f"tiempo de extracción excedido ({timeout} s)"
+                    else:
+                        continue
+
+                    del ocupados[proceso]
+                    if error:
+                        errores[doc_id] = error
+        finally:
+            # Un proceso ya muerto no debe impedir cerrar los demás ni ocultar el error original
+            for proceso, conexion in libres:
+                try:
+                    conexion.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                try:
+                    conexion.close()
+                except OSError:
+                    pass
+                proceso.join(timeout=5)
+                if proceso.is_alive():
+                    proceso.terminate()
+                    proceso.join()
+            for proceso, (conexion, _, ruta_txt, _) in ocupados.items():
+                descartar(proceso, conexion, ruta_txt)
+
+        return errores
 
     def crear_pipeline(self, name: str, desc: str, indices: str) -> str:
         """
@@ -143,26 +524,158 @@ class PipelineExecutor:
         return pipeline_id
 
     
-    def procesar_pipeline(self, collection_id: str, pipeline_id: str, destinos: dict = None):
+    def procesar_pipeline(self, collection_id: str, pipeline_id: str, destinos: dict = None, workers: int = None):
         """
         Ejecuta un pipeline completo: preprocesamiento, representación global y documental.
+        Los documentos se procesan de uno en uno, leyendo su texto solo cuando les toca.
+
+        Con más de un worker, el preprocesamiento se reparte por lotes entre un pool de
+        procesos; los resultados se recogen en el orden de los documentos, así que las
+        representaciones generadas son las mismas que en modo secuencial.
+
+        Parámetros:
+        - collection_id (str): ID de la colección.
+        - pipeline_id (str): ID del pipeline.
+        - destinos (dict, opcional): destino de cada paso (method_def_id → destino).
+        - workers (int, opcional): número de procesos de preprocesamiento
+          (por defecto, la variable de entorno IR_PREPROCESSING_WORKERS o 1).
+
+        Retorna:
+        - str: ID de la colección procesada.
         """
 
-        global_rep_path = None
-        global_rep_destino = None
-        global_rep_step_name = None
+        # Se anota antes de leer los documentos: un texto reextraído durante el procesamiento
+        # queda con una fecha posterior y la siguiente actualización lo recoge
+        fecha_lectura = datetime.utcnow()
 
-        documentos = self.document_model.get_documents_by_collection(collection_id)
+        # En orden de docID, el mismo en que build recorre la colección
+        documentos = sorted(self.document_model.get_documents_by_collection(collection_id), key=lambda d: str(d["_id"]))
 
         processed_model = ProcessedCollectionModel()
-        processed_collection_id = processed_model.insert_processed_collection(collection_id, pipeline_id)
+        processed_collection_id = processed_model.insert_processed_collection(
+            collection_id, pipeline_id, destinos, process_date=fecha_lectura
+        )
+
+        textos = self._iterar_textos(collection_id, documentos)
+        self._aplicar_pipeline(pipeline_id, destinos, textos, processed_collection_id, workers=workers)
+
+        self.collection_model.update_state(collection_id, "procesada")
+        return processed_collection_id
+
+    def actualizar_pipeline(self, processed_collection_id: str) -> dict[str, list[str]]:
+        """
+        Actualiza de forma incremental una colección procesada existente aplicando solo
+        los cambios de su colección desde el último procesamiento:
+        - documentos nuevos (no indexados todavía),
+        - documentos modificados (texto reextraído después del último procesamiento),
+        - documentos eliminados (indexados pero ya no registrados).
+
+        La representación global se carga de su destino, se actualiza con
+        remove_documents/add_documents y se guarda en el mismo sitio. Solo se
+        preprocesan y representan los documentos nuevos o modificados.
+
+        Parámetro:
+        - processed_collection_id (str): ID de la colección procesada.
+
+        Retorna:
+        - dict[str, list[str]]: IDs de documentos 'nuevos', 'modificados' y 'eliminados'.
+
+        Lanza:
+        - ValueError: si la representación global no está persistida o no se conocen sus destinos.
+        """
+
+        processed_model = ProcessedCollectionModel()
+        processed = processed_model.get_by_id(processed_collection_id)
+        if not processed:
+            raise ValueError(f"No existe la colección procesada {processed_collection_id}")
+
+        destinos = processed.get("Destinations")
+        if destinos is None:
+            raise ValueError("La colección procesada no guarda los destinos de sus pasos. Debe procesarse de nuevo.")
+
+        collection_id = str(processed["Collection_ID"])
+        pipeline_id = str(processed["Pipeline_ID"])
+        metodos = self._cargar_metodos_pipeline(pipeline_id)
+
+        metodo_global = next((m for m in metodos if m["Method_Type"] == "global_representation"), None)
+        if metodo_global is None:
+            raise ValueError("El pipeline no tiene representación global que actualizar.")
+        estructura = self._cargar_estructura_global(
+            processed_collection_id, metodo_global, destinos.get(str(metodo_global["_id"]), "memory")
+        )
+
+        # Calcular el delta entre los documentos registrados y los indexados. El momento del
+        # cálculo es la nueva fecha de actualización: 'Update_Date' se guarda al terminar, y un
+        # texto reextraído mientras tanto tendría una fecha anterior y no se volvería a recoger
+        fecha_delta = datetime.utcnow()
+        documentos = {str(doc["_id"]): doc for doc in self.document_model.get_documents_by_collection(collection_id)}
+        indexados = set(estructura.documentos)
+        ultima_fecha = processed.get("Update_Date") or processed["Process_Date"]
+
+        cambios = {
+            "nuevos": [d for d in documentos if d not in indexados],
+            "modificados": [
+                d for d in documentos
+                if d in indexados and documentos[d].get("Extraction_Date") and documentos[d]["Extraction_Date"] > ultima_fecha
+            ],
+            "eliminados": [d for d in indexados if d not in documentos]
+        }
+        print(
+            f"Actualización incremental: {len(cambios['nuevos'])} nuevos, "
+            f"{len(cambios['modificados'])} modificados, {len(cambios['eliminados'])} eliminados"
+        )
+        if not any(cambios.values()):
+            return cambios
+
+        # Descartar las representaciones obsoletas y aplicar el pipeline solo al delta
+        self._eliminar_representaciones_documentales(
+            processed_collection_id, cambios["modificados"] + cambios["eliminados"], metodos, destinos
+        )
+        estructura.remove_documents(cambios["eliminados"])
+
+        pendientes = [documentos[d] for d in cambios["nuevos"] + cambios["modificados"]]
+        textos = self._iterar_textos(collection_id, pendientes)
+        self._aplicar_pipeline(pipeline_id, destinos, textos, processed_collection_id, estructura)
+
+        processed_model.mark_updated(processed_collection_id, fecha_delta)
+        return cambios
 
-        pipeline_step_model = PipelineConfigModel()
+    def _cargar_metodos_pipeline(self, pipeline_id: str) -> list[dict]:
+        """
+        Recupera las definiciones de los métodos de un pipeline en su orden.
+
+        Parámetro:
+        - pipeline_id (str): ID del pipeline.
+
+        Retorna:
+        - list[dict]: definiciones de métodos ordenadas.
+
+        Lanza:
+        - ValueError: si algún método del pipeline no existe.
+        """
         method_model = MethodDefinitionModel()
-        steps = pipeline_step_model.get_ordered_methods(pipeline_id)
+        metodos = []
+        for step in PipelineConfigModel().get_ordered_methods(pipeline_id):
+            method_id = ObjectId(step["method_def_id"])
+            metodo = method_model.collection.find_one({"_id": method_id})
+
+            if not metodo:
+                raise ValueError(f"No se encontró el método con ID: {method_id}")
+            metodos.append(metodo)
+        return metodos
 
-        # Cargar textos desde archivos extraídos
-        reps_actuales = {}
+    def _iterar_textos(self, collection_id: str, documentos: list[dict]):
+        """
+        Recorre los textos extraídos de los documentos indicados, leyendo cada fichero
+        solo cuando se pide el documento.
+
+        Parámetros:
+        - collection_id (str): ID de la colección.
+        - documentos (list[dict]): documentos cuyos textos se quieren recorrer.
+
+        Retorna:
+        - Iterator[tuple[str, str]]: pares (docID, texto) (texto vacío si no se encontró).
+        """
         carpeta_textos = os.path.join("extracted_texts", str(collection_id))
 
         for doc in documentos:
@@ -172,75 +685,275 @@ class PipelineExecutor:
 
             if os.path.exists(ruta_txt):
                 with open(ruta_txt, "r", encoding="utf-8") as f:
-                    reps_actuales[doc_id] = f.read()
+                    yield doc_id, f.read()
             else:
                 print(f"No se encontró el texto extraído para {nombre_doc}")
-                reps_actuales[doc_id] = ""
+                yield doc_id, ""
 
-        # PRIMERA PASADA: preprocessing y global_representation
-        for step in steps:
-            method_id = ObjectId(step["method_def_id"])
-            metodo = method_model.collection.find_one({"_id": method_id})
+    def _preprocesar(self, textos, metodos: list[dict], workers: int = None):
+        """
+        Aplica los métodos de preprocesamiento a un flujo de textos, en este proceso o
+        repartiendo lotes entre un pool de procesos. En paralelo, solo hay en vuelo unos
+        pocos lotes por worker, de modo que la memoria sigue acotada.
 
-            if not metodo:
-                raise ValueError(f"No se encontró el método con ID: {method_id}")
+        Parámetros:
+        - textos (Iterable[tuple[str, str]]): pares (docID, texto).
+        - metodos (list[dict]): métodos de preprocesamiento, en el orden del pipeline.
+        - workers (int, opcional): número de procesos (por defecto, self.preprocessing_workers).
 
-            metodo_categoria = metodo["Method_Type"]
-            metodo_nombre = metodo["Name"]
-            entrada = metodo["Input_Format"]
-            salida = metodo["Output_Format"]
-            destino = destinos.get(step["method_def_id"], "memory") if destinos else "memory"
+        Retorna:
+        - Iterator[tuple[str, str, list]]: (docID, texto, salida de cada método), en el orden de entrada.
+        """
+        workers = workers or self.preprocessing_workers
+
+        if workers <= 1 or not metodos:
+            pasos_por_metodo = [build_steps_from_methods([metodo]) for metodo in metodos]
+            for doc_id, texto in textos:
+                yield doc_id, texto, _aplicar_preprocesado(pasos_por_metodo, texto)
+            return
 
-            if metodo_categoria == "preprocessing":
-                pasos = build_steps_from_methods([metodo])
-                for doc_id in reps_actuales:
-                    for paso in pasos:
-                        reps_actuales[doc_id] = paso.apply(reps_actuales[doc_id])
+        textos = iter(textos)
+        en_vuelo = deque()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_inicializar_preprocesado, initargs=(metodos,)
+        ) as pool:
+            while True:
+                lote = list(islice(textos, self.preprocessing_batch))
+                if lote:
+                    en_vuelo.append((lote, pool.submit(_preprocesar_lote, [texto for _, texto in lote])))
 
-                for doc_id, datos in reps_actuales.items():
-                    self.decidir_y_guardar_representacion(salida, datos, destino, processed_collection_id, doc_id, step_name=metodo_nombre)
+                # Los lotes se recogen en orden de envío para que el resultado sea determinista
+                while en_vuelo and (not lote or len(en_vuelo) >= 2 * workers):
+                    lote_hecho, futuro = en_vuelo.popleft()
+                    for (doc_id, texto), salidas in zip(lote_hecho, futuro.result()):
+                        yield doc_id, texto, salidas
 
-            elif metodo_categoria == "global_representation":
-                indexador = get_structure(metodo["Name"])
-                indexador.indexar(reps_actuales)
-                estructura = indexador.estructura.get_data()
+                if not lote:
+                    return
+
+    def _aplicar_pipeline(self, pipeline_id: str, destinos: dict, textos, processed_collection_id: str, estructura=None, workers: int = None):
+        """
+        Aplica los pasos del pipeline a los documentos indicados y guarda cada representación.
+
+        La ejecución es en flujo: cada documento recorre la cadena de preprocesamiento por
+        separado y sus representaciones se envían a su destino en cuanto se generan (las de
+        MongoDB, por lotes acotados). Solo la representación global acumula estado. La salida
+        del preprocesamiento se vuelca a un fichero temporal JSONL que se relee en la segunda
+        pasada, una vez construida la representación global.
+
+        Parámetros:
+        - pipeline_id (str): ID del pipeline.
+        - destinos (dict): destino de cada paso (method_def_id → destino).
+        - textos (Iterable[tuple[str, str]]): pares (docID, texto) de los documentos a procesar.
+          Se recorren una sola vez.
+        - processed_collection_id (str): ID de la colección procesada.
+        - estructura (BaseStructure, opcional): representación global existente. Si se indica,
+          se actualiza con add_documents y se guarda en el mismo destino en lugar de construirse.
+        - workers (int, opcional): número de procesos de preprocesamiento.
+        """
+
+        global_rep_path = None
+        global_rep_destino = None
+        metodos = self._cargar_metodos_pipeline(pipeline_id)
+
+        def destino_de(metodo):
+            return destinos.get(str(metodo["_id"]), "memory") if destinos else "memory"
+
+        # Las representaciones documentales se insertan por lotes
+        escritores = {
+            "representaciones": self.doc_rep_model.bulk_writer()
+        }
+        # Pares (paso, representación) ya registrados en el catálogo en esta ejecución
+        registrados = set()
+
+        # Representaciones globales en construcción
+        globales = {}
+        metodos_documentales = [m for m in metodos if m["Method_Type"] == "document_representation"]
+        volcado = None
+        completado = False
+
+        try:
+            for metodo in metodos:
+                if metodo["Method_Type"] == "global_representation":
+                    if estructura is None:
+                        indexador = get_structure(metodo["Name"])
+                        indexador.iniciar_indexado()
+                        globales[metodo["_id"]] = indexador
+                    else:
+                        # En la actualización incremental solo se acumula el delta
+                        globales[metodo["_id"]] = {}
+
+            if metodos_documentales:
+                volcado = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+            # PRIMERA PASADA: preprocessing y global_representation, documento a documento
+            metodos_preprocesado = [m for m in metodos if m["Method_Type"] == "preprocessing"]
+            for doc_id, datos, salidas in self._preprocesar(textos, metodos_preprocesado, workers):
+                salidas = iter(salidas)
+                for metodo in metodos:
+                    metodo_categoria = metodo["Method_Type"]
+
+                    if metodo_categoria == "preprocessing":
+                        datos = next(salidas)
+                        self.decidir_y_guardar_representacion(
+                            metodo["Output_Format"], datos, destino_de(metodo), processed_collection_id, doc_id,
+                            step_name=metodo["Name"], escritores=escritores, registrados=registrados
+                        )
+
+                    elif metodo_categoria == "global_representation":
+                        if estructura is None:
+                            globales[metodo["_id"]].indexar_documento(doc_id, datos)
+                        else:
+                            globales[metodo["_id"]][doc_id] = datos
+
+                if volcado:
+                    volcado.write(json.dumps([doc_id, datos]) + "\n")
+
+            for metodo in metodos:
+                if metodo["Method_Type"] != "global_representation":
+                    continue
+
+                salida = metodo["Output_Format"]
+                destino = destino_de(metodo)
+                if estructura is None:
+                    datos_globales = globales[metodo["_id"]].finalizar_indexado()
+                else:
+                    # En MongoDB la representación nueva sustituye a la anterior al completarse
+                    # (ver insert_representation), así que no se borra antes de guardarla
+                    estructura.add_documents(globales[metodo["_id"]])
+                    datos_globales = estructura.get_data()
+                globales[metodo["_id"]] = None
 
                 global_rep_path = self.decidir_y_guardar_representacion(
-                    salida, estructura, destino, processed_collection_id, None, step_name=metodo_nombre
+                    salida, datos_globales, destino, processed_collection_id, None, step_name=metodo["Name"], escritores=escritores, registrados=registrados
                 )
                 global_rep_destino = destino
-                global_rep_step_name = metodo_nombre
 
-        # SEGUNDA PASADA: document_representation (requiere que la global ya esté creada)
-        for step in steps:
-            method_id = ObjectId(step["method_def_id"])
-            metodo = method_model.collection.find_one({"_id": method_id})
+            # SEGUNDA PASADA: document_representation (requiere que la global ya esté creada)
+            generadores = []
+            for metodo in metodos_documentales:
+                destino = destino_de(metodo)
+                print(f"\nAplicando método: {metodo['Name']} (tokens → {metodo['Output_Format']})")
 
-            if not metodo or metodo["Method_Type"] != "document_representation":
-                continue
+                generator = get_representator(metodo["Name"])
+                if destino == "mongodb":
+                    generator.cargar_desde_bd(processed_collection_id)
+                elif destino in ("filesystem", "filesystem_temp"):
+                    generator.cargar_estructura(global_rep_path, perezoso=False)
+                else:
+                    raise ValueError(f"Destino {global_rep_destino} no soportado para carga de representación global.")
+                generadores.append((metodo, generator, destino))
 
-            metodo_nombre = metodo["Name"]
-            salida = metodo["Output_Format"]
-            destino = destinos.get(step["method_def_id"], "memory") if destinos else "memory"
+            if volcado:
+                volcado.seek(0)
+                for linea in volcado:
+                    doc_id, datos = json.loads(linea)
+                    for metodo, generator, destino in generadores:
+                        datos = generator.representar(datos, doc_id)
+                        self.decidir_y_guardar_representacion(
+                            metodo["Output_Format"], datos, destino, processed_collection_id, doc_id,
+                            step_name=metodo["Name"], escritores=escritores, registrados=registrados
+                        )
 
-            print(f"\nAplicando método: {metodo_nombre} (tokens → {salida})")
+            for escritor in escritores.values():
+                escritor.flush()
+            completado = True
+        finally:
+            if volcado:
+                volcado.close()
 
-            generator = get_representator(metodo["Name"])
-            if destino == "mongodb":
-                generator.cargar_desde_bd(processed_collection_id)
-            elif destino in ("filesystem", "filesystem_temp"):
-                generator.cargar_estructura(global_rep_path)
-            else:
-                raise ValueError(f"Destino {global_rep_destino} no soportado para carga de representación global.")
-            
-            for doc_id, datos in reps_actuales.items():
-                rep = generator.representar(datos, doc_id)
-                reps_actuales[doc_id] = rep
-                self.decidir_y_guardar_representacion(salida, rep, destino, processed_collection_id, doc_id, step_name=metodo_nombre)
+            # Si algún paso falla, las representaciones globales que no llegaron a terminarse
+            # liberan su construcción (pool de procesos e índices parciales, si los hay) y los
+            # lotes pendientes de los escritores se descartan
+            if estructura is None:
+                for indexador in globales.values():
+                    if indexador is not None:
+                        indexador.cancelar_indexado()
+            if not completado:
+                for escritor in escritores.values():
+                    escritor.descartar()
 
-        self.collection_model.update_state(collection_id, "procesada")
-        return processed_collection_id
+    def _cargar_estructura_global(self, processed_collection_id: str, metodo: dict, destino: str):
+        """
+        Carga la representación global persistida de una colección procesada.
 
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - metodo (dict): método de representación global del pipeline.
+        - destino (str): destino en el que se guardó ('filesystem' o 'mongodb').
+
+        Retorna:
+        - BaseStructure: estructura global cargada.
+
+        Lanza:
+        - ValueError: si la estructura no está persistida.
+        """
+        salida = metodo["Output_Format"]
+
+        if destino == "mongodb":
+            representacion = self.col_rep_model.get_by_type(processed_collection_id, salida)
+            contenido = representacion["Content"] if representacion else None
+        elif destino == "filesystem":
+            # Formato binario actual o JSON de colecciones procesadas con versiones anteriores
+            contenido = None
+            for extension in (BINARY_EXTENSION, ".json"):
+                ruta = self._ruta_fichero(processed_collection_id, metodo["Name"], salida, None, extension)
+                if os.path.exists(ruta):
+                    contenido = cargar_estructura_global(ruta)
+                    break
+        else:
+            contenido = None
+
+        if contenido is None:
+            raise ValueError("La representación global no está persistida. Debe procesarse la colección de nuevo.")
+
+        estructura = get_structure(metodo["Name"]).estructura
+        estructura.load_from_dict(contenido)
+        return estructura
+
+    def _eliminar_representaciones_documentales(self, processed_collection_id: str, doc_ids: list[str], metodos: list[dict], destinos: dict):
+        """
+        Elimina las representaciones documentales persistidas (en MongoDB y en disco)
+        de unos documentos de una colección procesada.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - doc_ids (list[str]): IDs de los documentos.
+        - metodos (list[dict]): métodos del pipeline.
+        - destinos (dict): destino de cada paso (method_def_id → destino).
+        """
+        if not doc_ids:
+            return
+
+        self.doc_rep_model.delete_by_documents(processed_collection_id, doc_ids)
+
+        for metodo in metodos:
+            if metodo["Method_Type"] == "global_representation":
+                continue
+            if destinos.get(str(metodo["_id"])) != "filesystem":
+                continue
+            for doc_id in doc_ids:
+                ruta = self._ruta_fichero(processed_collection_id, metodo["Name"], metodo["Output_Format"], doc_id)
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+
+    @staticmethod
+    def _ruta_fichero(processed_collection_id: str, step_name: str, nombre_rep: str, doc_id: str = None, extension: str = ".json") -> str:
+        """
+        Construye la ruta en disco de una representación guardada con el destino 'filesystem'.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - step_name (str): nombre del paso/método.
+        - nombre_rep (str): nombre de la representación.
+        - doc_id (str, opcional): ID del documento (None para la representación global).
+        - extension (str): extensión del fichero ('.json' o '.idx' para el índice binario).
+
+        Retorna:
+        - str: ruta del fichero.
+        """
+        carpeta_step = os.path.join("saved_structures", str(processed_collection_id), step_name or "unknown_step")
+        return os.path.join(carpeta_step, f"{nombre_rep}_{doc_id or 'global'}{extension}")
 
     def delete_pipeline(self, pipeline_id: str):
         """
@@ -249,10 +962,11 @@ class PipelineExecutor:
 
         self.collection.delete_one({"_id": ObjectId(pipeline_id)})
 
-    def decidir_y_guardar_representacion(self, nombre_rep, datos, destino, processed_collection_id=None, doc_id=None, step_name=None):
+    def decidir_y_guardar_representacion(self, nombre_rep, datos, destino, processed_collection_id=None, doc_id=None, step_name=None, escritores=None, registrados=None):
         """
         Decide dónde almacenar una representación generada (en memoria, disco o MongoDB)
-        y registra su metadata en la tabla RepresentationType.
+        y registra su metadata en el catálogo RepresentationType (un único registro por
+        colección procesada, paso y representación, no uno por documento).
 
         Parámetros:
         - nombre_rep (str): nombre de la representación.
@@ -261,61 +975,74 @@ class PipelineExecutor:
         - processed_collection_id (str, opcional): ID de la colección procesada.
         - doc_id (str, opcional): ID del documento (para representaciones documentales).
         - step_name (str, opcional): nombre del paso/método.
+        - escritores (dict, opcional): escritores por lotes ('representaciones') a los que
+          se añaden las inserciones en MongoDB en lugar de hacerse una a una.
+        - registrados (set, opcional): pares (paso, representación) ya registrados en el catálogo
+          durante esta ejecución del pipeline; si se indica, el registro se hace una sola vez por par.
 
         Retorna:
         - str | any: ruta, nombre o datos en memoria.
         """
         
-        rep_type_model = RepresentationTypeModel()
+        rep_type_model = self.rep_type_model
+        escritores = escritores or {}
+        scope = "document" if doc_id else "collection"
+        registrados = registrados if registrados is not None else set()
+
+        def registrar(**valores):
+            # El registro es un upsert idempotente: basta con hacerlo una vez por ejecución
+            if (step_name, nombre_rep) in registrados:
+                return
+            rep_type_model.register(processed_collection_id, step_name, nombre_rep, scope=scope, **valores)
+            registrados.add((step_name, nombre_rep))
 
         if destino == "memory":
-            rep_type_model.insert_representation_type(
-                name=nombre_rep,
-                description=f"Temporal en memoria",
+            registrar(
                 format_="transient",
                 location_type="RAM",
                 destination="",
-                temporary=True
+                temporary=True,
+                description=f"Temporal en memoria"
             )
             return datos 
 
         elif destino == "filesystem":
-            carpeta_base = "saved_structures"
-            carpeta_proc = os.path.join(carpeta_base, processed_collection_id)
-            carpeta_step = os.path.join(carpeta_proc, step_name or "unknown_step")
+            # El índice invertido global se guarda en el formato binario comprimido
+            binario = doc_id is None and isinstance(datos, dict) and datos.get("tipo") == "inverted_index"
+            path = self._ruta_fichero(processed_collection_id, step_name, nombre_rep, doc_id, BINARY_EXTENSION if binario else ".json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
 
-            os.makedirs(carpeta_step, exist_ok=True)
-            filename = f"{nombre_rep}_{doc_id or 'global'}.json"
-            path = os.path.join(carpeta_step, filename)
-
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(datos, f, indent=2)
+            if binario:
+                escribir_indice_binario(datos, path)
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(datos, f, indent=2)
 
-            rep_type_model.insert_representation_type(
-                name=nombre_rep,
-                description=f"Guardado persistente en disco",
-                format_="json",
+            # Las representaciones documentales se registran por su carpeta: cada documento
+            # está en '<nombre_rep>_<docID>.json' dentro de ella
+            registrar(
+                format_="binary" if binario else "json",
                 location_type="filesystem",
-                destination=path,
-                temporary=False
+                destination=os.path.dirname(path) if doc_id else path,
+                temporary=False,
+                description=f"Guardado persistente en disco"
             )
             return path
 
         elif destino == "mongodb":
             if doc_id:
-                DocumentRepresentationModel().insert_representation(
-                    processed_collection_id, doc_id, nombre_rep, datos
+                self.doc_rep_model.insert_representation(
+                    processed_collection_id, doc_id, nombre_rep, datos, escritor=escritores.get("representaciones")
                 )
             else:
-                CollectionRepresentationModel().insert_representation(
+                self.col_rep_model.insert_representation(
                     processed_collection_id, nombre_rep, datos
                 )
-            rep_type_model.insert_representation_type(
-                name=nombre_rep,
-                description=f"Guardado en MongoDB",
+            registrar(
                 format_="json",
                 location_type="MongoDB",
                 destination="document_representations" if doc_id else "collection_representations",
-                temporary=False
+                temporary=False,
+                description=f"Guardado en MongoDB"
             )
             return "MongoDB"
@@ -1,23 +1,40 @@
 # buscador/meta_buscador.py
 # Encargado de realizar una búsqueda en una colección procesada aplicando
 # los mismos pasos de preprocesamiento y representación usados en el pipeline.
-# Recupera las representaciones documentales y compara contra la consulta
-# usando un comparador especificado
+# Por defecto resuelve la consulta sobre el índice invertido (solo se leen los
+# postings de los términos de la consulta); si no hay índice persistido, recupera
+# las representaciones documentales y compara contra la consulta usando un
+# comparador especificado. El modo matricial carga esas representaciones en una
+# matriz dispersa y puntúa todos los documentos con un producto vector-matriz.
+# Las consultas booleanas (AND/OR/NOT, frases y NEAR/k) se resuelven intersecando
+# postings del índice y, para frases y proximidad, sus posiciones.
 
 import os
 import json
+import heapq
+import threading
+from collections import OrderedDict
 from bson import ObjectId
 from db.processed_collection_model import ProcessedCollectionModel
 from db.pipeline_config_model import PipelineConfigModel
 from db.method_definition_model import MethodDefinitionModel
 from db.document_representation_model import DocumentRepresentationModel
+from db.collection_representation_model import CollectionRepresentationModel
 from buscador.comparadores.comparador_coseno import ComparadorCoseno
 from preprocessor.preprocessor import Preprocessor
 from buscador.comparadores.comparador_booleano import ComparadorBooleano
+from buscador.evaluador_indice import EvaluadorIndice
+from buscador.evaluador_matricial import EvaluadorMatricial, matricial_disponible
+from buscador.evaluador_booleano import EvaluadorBooleano
+from buscador.consulta_booleana import analizar_consulta
 from db.document_model import DocumentModel
 from db.representation_type_model import RepresentationTypeModel
 from factories.preprocessing_step_factory import build_steps_from_methods
 from factories.document_representator_factory import get_representator
+from indexer.structures.inverted_index_structure import InvertedIndexStructure
+from indexer.structures.mmap_inverted_index import MmapInvertedIndex
+from indexer.structures.mongo_inverted_index import MongoInvertedIndex
+from indexer.binary_index import es_indice_binario
 
 
 class Searcher:
@@ -26,8 +43,19 @@ class Searcher:
     Clase encargada de realizar una búsqueda sobre una colección procesada.
     Aplica los mismos pasos de preprocesamiento y representación que se usaron
     en el pipeline original, y compara la consulta con las representaciones documentales.
+
+    Todo lo que se carga (pipeline, preprocesador, índice, vocabulario y vectores
+    documentales) se conserva en la instancia, de modo que un mismo Searcher
+    reutilizado entre consultas solo paga el coste de puntuar.
+
+    Una misma instancia atiende consultas desde varios hilos: las cargas perezosas y la
+    caché de metadatos se protegen con un cerrojo propio, y la puntuación se hace fuera de él.
     """
 
+    COMPARADORES = ("coseno", "booleano")
+    MODOS = ("indice", "exhaustivo", "matricial")
+    TIPOS_CONSULTA = ("libre", "booleana")
+
     def __init__(self, processed_collection_id: str):
         """
         Inicializa el buscador con el ID de una colección procesada.
@@ -43,37 +71,328 @@ class Searcher:
         self.doc_rep_model = DocumentRepresentationModel()
         self.document_model = DocumentModel()
 
-    def buscar(self, texto_consulta: str, comparador_nombre: str = "coseno") -> list[dict]:
+        self.processed = None
+        # Versión (ver ProcessedCollectionModel.get_version) de la colección procesada cargada
+        self.version = None
+        self._indice = None
+        self._indice_cargado = False
+        self._generador = None
+        self._doc_reps = None
+        self._matricial = None
+        # Bytes estimados de las estructuras estáticas, calculados una vez al cargarlas
+        self._memoria_cargada = 0
+        # Nombre y ruta de los últimos documentos devueltos (caché LRU acotada). Al ser del
+        # Searcher, se descarta con él cuando el registro lo expulsa o lo invalida.
+        self._metadatos = OrderedDict()
+        self._max_metadatos = int(os.environ.get("IR_SEARCH_METADATA_DOCS", 10000))
+        # Reentrante: la carga de las representaciones puede necesitar cargar el índice
+        self._cerrojo = threading.RLock()
+
+    def cargar(self):
         """
-        Ejecuta la búsqueda sobre la colección procesada.
+        Carga el pipeline asociado a la colección procesada y construye el preprocesador.
+        Solo se hace la primera vez; las siguientes llamadas no acceden a la BD.
 
-        Args:
-            texto_consulta (str): Texto ingresado por el usuario como consulta.
-            comparador_nombre (str): Nombre del comparador a usar ('coseno' o 'booleano').
+        Raises:
+            ValueError: Si la colección procesada no existe.
+        """
+        if self.processed is not None:
+            return
+        with self._cerrojo:
+            if self.processed is None:
+                self._cargar_pipeline()
 
-        Returns:
-            list[dict]: Lista de documentos con su puntuación y ruta, ordenados por relevancia.
+    def _cargar_pipeline(self):
+        """
+        Lee el pipeline de la colección procesada y construye el preprocesador.
+        Se llama con el cerrojo tomado.
+
+        Raises:
+            ValueError: Si la colección procesada no existe.
         """
-        
         # 1. Obtener pipeline asociado a la colección procesada
         processed = self.processed_model.collection.find_one({"_id": ObjectId(self.processed_collection_id)})
+        if processed is None:
+            raise ValueError(f"No existe la colección procesada {self.processed_collection_id}")
         pipeline_id = processed["Pipeline_ID"]
         pasos = self.pipeline_model.get_ordered_methods(pipeline_id)
-        metodos = [self.pipeline_method_model.collection.find_one({"_id": ObjectId(p["method_def_id"])}) for p in pasos]
+        self.metodos = [self.pipeline_method_model.collection.find_one({"_id": ObjectId(p["method_def_id"])}) for p in pasos]
 
         # 2. Construir preprocesador
-        pre_methods = [m for m in metodos if m["Method_Type"] == "preprocessing"]
+        pre_methods = [m for m in self.metodos if m["Method_Type"] == "preprocessing"]
         pre_steps = build_steps_from_methods(pre_methods)
-        preprocessor = Preprocessor(pre_steps)
+        self.preprocessor = Preprocessor(pre_steps)
+
+        self.collection_id = processed["Collection_ID"]
+        self.version = processed.get("Update_Date") or processed.get("Process_Date")
+        self.processed = processed
+
+    def buscar(self, texto_consulta: str, comparador_nombre: str = "coseno", modo: str = "indice", top_k: int | None = None,
+               tipo_consulta: str = "libre") -> list[dict]:
+        """
+        Ejecuta la búsqueda sobre la colección procesada.
+
+        Args:
+            texto_consulta (str): Texto ingresado por el usuario como consulta.
+            comparador_nombre (str): Nombre del comparador a usar ('coseno' o 'booleano').
+            modo (str): 'indice' para evaluar sobre los postings del índice invertido
+                        (solo se puntúan los documentos que comparten algún término con la consulta),
+                        'exhaustivo' para comparar con todas las representaciones documentales
+                        o 'matricial' para puntuarlas con la matriz término-documento (NumPy/SciPy).
+            top_k (int | None): Número máximo de resultados. Si se indica, solo se mantienen
+                                k candidatos y la búsqueda sobre el índice poda con MaxScore.
+            tipo_consulta (str): 'libre' para puntuar la consulta con el comparador o 'booleana'
+                                 para evaluarla como expresión AND/OR/NOT, con frases entre comillas
+                                 y proximidad NEAR/k, sobre el índice invertido (los documentos que la cumplen puntúan 1 y se ordenan por docID;
+                                 el comparador y el modo no se usan).
+
+        Returns:
+            list[dict]: Lista de documentos con su puntuación y ruta, ordenados por relevancia.
+
+        Raises:
+            ValueError: Si el comparador, el modo o el tipo de consulta no existen, la consulta
+                        booleana no es válida o la colección no tiene índice invertido.
+        """
+        return self.buscar_lote([texto_consulta], comparador_nombre, modo, top_k, tipo_consulta)[0]
+
+    def buscar_lote(self, textos_consulta: list[str], comparador_nombre: str = "coseno", modo: str = "indice", top_k: int | None = None,
+                    tipo_consulta: str = "libre") -> list[list[dict]]:
+        """
+        Ejecuta varias consultas a la vez sobre la colección procesada. Todas se preprocesan
+        en una pasada (las repetidas, una sola vez) y se puntúan juntas: en modo 'indice' los
+        postings de cada término se leen una vez para todo el lote y en modo 'matricial' las
+        consultas se multiplican como una matriz por la matriz término-documento. Las rutas de
+        los documentos seleccionados se obtienen también con una única consulta.
+
+        Args:
+            textos_consulta (list[str]): Textos de las consultas.
+            comparador_nombre (str): Nombre del comparador a usar ('coseno' o 'booleano').
+            modo (str): 'indice', 'exhaustivo' o 'matricial' (ver buscar).
+            top_k (int | None): Número máximo de resultados por consulta.
+            tipo_consulta (str): 'libre' o 'booleana' (ver buscar).
+
+        Returns:
+            list[list[dict]]: Resultados de cada consulta, en el mismo orden que los textos.
+
+        Raises:
+            ValueError: Si el comparador, el modo o el tipo de consulta no existen, alguna consulta
+                        booleana no es válida o la colección no tiene índice invertido.
+        """
+        if comparador_nombre not in self.COMPARADORES:
+            raise ValueError(f"Comparador no válido: '{comparador_nombre}'. Opciones: {', '.join(self.COMPARADORES)}.")
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de búsqueda no válido: '{modo}'. Opciones: {', '.join(self.MODOS)}.")
+        if tipo_consulta not in self.TIPOS_CONSULTA:
+            raise ValueError(f"Tipo de consulta no válido: '{tipo_consulta}'. Opciones: {', '.join(self.TIPOS_CONSULTA)}.")
+
+        self.cargar()
+
+        if tipo_consulta == "booleana":
+            return self._buscar_booleanas(textos_consulta, top_k)
+
+        # 3. Preprocesar las consultas
+        tokens_por_texto = {}
+        for texto in textos_consulta:
+            if texto not in tokens_por_texto:
+                tokens_por_texto[texto] = self.preprocessor.preprocess(texto)
+        consultas = list(tokens_por_texto.values())
+
+        comparador = ComparadorCoseno() if comparador_nombre == "coseno" else ComparadorBooleano()
+        puntuaciones = None
+
+        # 4. Evaluar sobre el índice invertido si está persistido
+        if modo == "indice":
+            estructura = self._obtener_indice()
+            if estructura is not None:
+                evaluador = EvaluadorIndice(estructura)
+                puntuaciones = [p.items() for p in evaluador.evaluar_lote(consultas, comparador, top_k)]
+            else:
+                print(" No hay índice invertido persistido para esta colección. Se usa la búsqueda exhaustiva.")
+
+        if modo == "matricial":
+            if matricial_disponible():
+                puntuaciones = self._puntuar_matricial(consultas, comparador, top_k)
+            else:
+                print(" NumPy y SciPy no están instalados. Se usa la búsqueda exhaustiva.")
+
+        if puntuaciones is None:
+            puntuaciones = [self._puntuar_exhaustivo(tokens, comparador) for tokens in consultas]
+
+        resultados = dict(zip(tokens_por_texto, self._formatear_lote(puntuaciones, top_k)))
+        return [resultados[texto] for texto in textos_consulta]
+
+    def _obtener_indice(self) -> InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex | None:
+        """
+        Devuelve el índice invertido de la colección procesada, cargándolo la primera vez.
+
+        Returns:
+            InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex | None: Índice o None si no está persistido.
+        """
+        if self._indice_cargado:
+            return self._indice
+        with self._cerrojo:
+            if not self._indice_cargado:
+                self._indice = self._cargar_indice()
+                if isinstance(self._indice, InvertedIndexStructure):
+                    self._memoria_cargada += sum(
+                        100 + sum(200 + 36 * len(posting[2]) for posting in postings)
+                        for postings in self._indice.index.values()
+                    )
+                self._indice_cargado = True
+        return self._indice
+
+    def _cargar_indice(self) -> InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex | None:
+        """
+        Carga el índice invertido de la colección procesada desde MongoDB (con acceso
+        por término si está troceado) o, si no está allí, desde el fichero registrado
+        en RepresentationType (mapeándolo en memoria si está en formato binario).
+
+        Returns:
+            InvertedIndexStructure | MmapInvertedIndex | MongoInvertedIndex | None:
+                Índice cargado o None si no se ha persistido.
+        """
+        estructura = InvertedIndexStructure()
+
+        modelo = CollectionRepresentationModel()
+        # Índice troceado en MongoDB: solo se descargan los términos de cada consulta
+        if modelo.is_sharded(self.processed_collection_id, "inverted_index"):
+            return MongoInvertedIndex(self.processed_collection_id)
+
+        representacion = modelo.get_by_type(self.processed_collection_id, "inverted_index")
+        if representacion and "Content" in representacion:
+            estructura.load_from_dict(representacion["Content"])
+            return estructura
+
+        rep_type_doc = RepresentationTypeModel().find_for_processed(
+            self.processed_collection_id, "inverted_index", "filesystem"
+        )
+        if rep_type_doc and os.path.exists(rep_type_doc["Output_Destination"]):
+            ruta = rep_type_doc["Output_Destination"]
+            # El índice binario se mapea en memoria y solo se leen los términos consultados
+            if es_indice_binario(ruta):
+                return MmapInvertedIndex(ruta)
+            estructura.load_from_file(ruta)
+            return estructura
+
+        return None
+
+    def _buscar_booleanas(self, textos_consulta: list[str], top_k: int | None = None) -> list[list[dict]]:
+        """
+        Evalúa consultas booleanas sobre el índice invertido. Cada palabra de la consulta
+        se normaliza con el preprocesador de la colección.
+
+        Args:
+            textos_consulta (list[str]): Consultas booleanas.
+            top_k (int | None): Número máximo de resultados por consulta.
+
+        Returns:
+            list[list[dict]]: Documentos que cumplen cada consulta (puntuación 1), ordenados por docID.
+
+        Raises:
+            ValueError: Si alguna consulta no es válida o la colección no tiene índice invertido.
+        """
+        estructura = self._obtener_indice()
+        if estructura is None:
+            raise ValueError("Las consultas booleanas necesitan el índice invertido de la colección procesada.")
+
+        evaluador = EvaluadorBooleano(estructura)
+        puntuaciones = []
+        for texto in textos_consulta:
+            documentos = evaluador.evaluar(analizar_consulta(texto, self.preprocessor.preprocess))
+            puntuaciones.append([(doc_id, 1.0) for doc_id in documentos])
+
+        return self._formatear_lote(puntuaciones, top_k)
+
+    def _puntuar_exhaustivo(self, tokens: list[str], comparador):
+        """
+        Compara la consulta con todas las representaciones documentales de la colección.
+
+        Args:
+            tokens (list[str]): Consulta ya preprocesada.
+            comparador (QueryComparator): Comparador a utilizar.
 
-        # 3. Preprocesar la consulta
-        tokens = preprocessor.preprocess(texto_consulta)
+        Returns:
+            Iterable[tuple[str, float]]: Pares (docID, puntuación), generados bajo demanda.
+        """
+        rep_method = next((m for m in self.metodos if m["Method_Type"] == "document_representation"), None)
+
+        with self._cerrojo:
+            if self._generador is None:
+                self._generador = self._cargar_generador(rep_method)
+                self._memoria_cargada += 150 * len(getattr(self._generador, "vocabulario", []))
+            if self._doc_reps is None:
+                doc_reps = self._cargar_representaciones(rep_method)
+                self._memoria_cargada += sum(
+                    300 + (100 * len(doc["Content"]) if isinstance(doc["Content"], dict) else 36 * len(doc["Content"]))
+                    for doc in doc_reps
+                )
+                self._doc_reps = doc_reps
+
+        consulta_rep = comparador.preparar_consulta(self._generador.representar(tokens, "consulta"))
+
+        # Normas de los documentos precalculadas al indexar (si el índice está persistido),
+        # para no recorrer cada vector documental en cada consulta
+        estructura = self._obtener_indice()
+        normas = estructura.get_doc_norms() if estructura is not None else None
+
+        # 9. Comparar con cada documento (las puntuaciones se generan bajo demanda para
+        #    que la selección top-k no necesite materializarlas todas)
+        return (
+            (
+                str(doc["Document_ID"]),
+                comparador.comparar(
+                    consulta_rep, doc["Content"],
+                    normas.get(str(doc["Document_ID"]), 0.0) if normas is not None else None
+                )
+            )
+            for doc in self._doc_reps
+        )
+
+    def _puntuar_matricial(self, consultas: list[list[str]], comparador, top_k: int | None = None) -> list[list[tuple[str, float]]]:
+        """
+        Puntúa todos los documentos con la matriz término-documento de la colección,
+        que se construye la primera vez. Da el mismo ranking que la búsqueda exhaustiva.
 
-        # 4. Representar la consulta
-        rep_method = next((m for m in metodos if m["Method_Type"] == "document_representation"), None)
+        Args:
+            consultas (list[list[str]]): Consultas ya preprocesadas.
+            comparador (QueryComparator): Comparador a utilizar.
+            top_k (int | None): Número máximo de resultados por consulta.
+
+        Returns:
+            list[list[tuple[str, float]]]: Pares (docID, puntuación) seleccionados de cada consulta.
+        """
+        rep_method = next((m for m in self.metodos if m["Method_Type"] == "document_representation"), None)
+
+        with self._cerrojo:
+            if self._generador is None:
+                self._generador = self._cargar_generador(rep_method)
+                self._memoria_cargada += 150 * len(getattr(self._generador, "vocabulario", []))
+            if self._matricial is None:
+                # Si los vectores ya están cargados (búsqueda exhaustiva) se reutilizan; si no,
+                # solo se conservan dentro de la matriz
+                doc_reps = self._doc_reps if self._doc_reps is not None else self._cargar_representaciones(rep_method)
+                matricial = EvaluadorMatricial(doc_reps)
+                self._memoria_cargada += matricial.estimar_memoria()
+                self._matricial = matricial
+
+        consultas_rep = [comparador.preparar_consulta(self._generador.representar(tokens, "consulta")) for tokens in consultas]
+        return self._matricial.evaluar_lote(consultas_rep, comparador, top_k)
+
+    def _cargar_generador(self, rep_method: dict):
+        """
+        Crea el representador de consultas y carga su estructura (vocabulario).
+
+        Args:
+            rep_method (dict): Método de representación documental del pipeline.
+
+        Returns:
+            RepresentationGenerator: Representador listo para representar consultas.
+        """
+
+        # 5. Crear el representador de la consulta
         generator = get_representator(rep_method["Name"])
 
-        # 5. Cargar estructura del representador desde BD o desde fichero
+        # 6. Cargar estructura del representador desde BD o desde fichero
         try:
             if hasattr(generator, "cargar_desde_bd"):
                 generator.cargar_desde_bd(self.processed_collection_id)
@@ -82,22 +401,12 @@ class Searcher:
             if hasattr(generator, "cargar_estructura"):
                 rep_type_model = RepresentationTypeModel()
 
-                #  Si la representación es boolean_vector, necesita estructura del tipo 'inverted_index'
-                estructura_necesaria = "inverted_index" if rep_method["Output_Format"] == "boolean_vector" else rep_method["Output_Format"]
-
-                rep_type_doc = rep_type_model.collection.find_one({
-                    "Format": estructura_necesaria,
-                    "Output_Location_Type": "filesystem",
-                    "Temporary": False
-                })
+                #  Los vectores booleanos (densos o dispersos) necesitan estructura del tipo 'inverted_index'
+                estructura_necesaria = "inverted_index" if rep_method["Output_Format"] in ("boolean_vector", "sparse_boolean_vector") else rep_method["Output_Format"]
 
-                if not rep_type_doc:
-                    print(f" No se encontró por Format. Intentando por Name = {estructura_necesaria}")
-                    rep_type_doc = rep_type_model.collection.find_one({
-                        "Name": estructura_necesaria,
-                        "Output_Location_Type": "filesystem",
-                        "Temporary": False
-                    })
+                rep_type_doc = rep_type_model.find_for_processed(
+                    self.processed_collection_id, estructura_necesaria, "filesystem"
+                )
 
                 if rep_type_doc and "Output_Destination" in rep_type_doc:
                     ruta_json = rep_type_doc["Output_Destination"]
@@ -108,13 +417,24 @@ class Searcher:
                 else:
                     raise RuntimeError(
                         f"No se encontró una ruta válida en RepresentationType para cargar la estructura.\n"
-                        f"Intentado con Format/Name = {estructura_necesaria}"
+                        f"Intentado con Name = {estructura_necesaria}"
                     )
             else:
                 raise RuntimeError("El representador no tiene forma de cargar la estructura (ni BD ni fichero).")
 
-        # 6. Representar la consulta
-        consulta_rep = generator.representar(tokens, "consulta")
+        return generator
+
+    def _cargar_representaciones(self, rep_method: dict) -> list[dict]:
+        """
+        Carga las representaciones documentales de la colección procesada desde MongoDB
+        o, si no están allí, desde disco.
+
+        Args:
+            rep_method (dict): Método de representación documental del pipeline.
+
+        Returns:
+            list[dict]: Representaciones con las claves 'Document_ID' y 'Content'.
+        """
 
         # 7. Cargar representaciones de documentos
         nombre_rep = rep_method["Output_Format"].strip()
@@ -125,24 +445,16 @@ class Searcher:
 
         # 8. Si no se encontraron en MongoDB, intentamos cargar desde disco consultando RepresentationType
         if not doc_reps:
-            rep_type_model = RepresentationTypeModel()
-            rep_type_doc = rep_type_model.collection.find_one({
-                "Format": nombre_rep,
-                "Output_Location_Type": "filesystem",
-                "Temporary": False
-            })
-
-            if not rep_type_doc:
-                rep_type_doc = rep_type_model.collection.find_one({
-                    "Name": nombre_rep,
-                    "Output_Location_Type": "filesystem",
-                    "Temporary": False
-                })
+            rep_type_doc = RepresentationTypeModel().find_for_processed(
+                self.processed_collection_id, nombre_rep, "filesystem"
+            )
 
             if rep_type_doc and "Output_Destination" in rep_type_doc:
-                base_dir = os.path.dirname(rep_type_doc["Output_Destination"])
+                # En el catálogo el destino ya es la carpeta; los registros antiguos apuntan a un fichero
+                destino = rep_type_doc["Output_Destination"]
+                base_dir = destino if rep_type_doc.get("Scope") == "document" else os.path.dirname(destino)
                 doc_reps = []
-                for doc in self.document_model.collection.find({"Collection_ID": processed["Collection_ID"]}):
+                for doc in self.document_model.collection.find({"Collection_ID": self.collection_id}):
                     doc_id = str(doc["_id"])
                     nombre_archivo = f"{nombre_rep}_{doc_id}.json"
                     ruta_vector = os.path.join(base_dir, nombre_archivo)
@@ -159,25 +471,93 @@ class Searcher:
             else:
                 print(" No se encontró representación documental en disco registrada en RepresentationType.")
 
-        # 9. Comparar con cada documento
-        comparador = ComparadorCoseno() if comparador_nombre == "coseno" else ComparadorBooleano()
+        return doc_reps
 
-        resultados = []
-        for doc in doc_reps:
-            doc_id = doc["Document_ID"]
-            doc_vector = doc["Content"]
+    def _formatear_lote(self, puntuaciones_por_consulta: list, top_k: int | None = None) -> list[list[dict]]:
+        """
+        Selecciona los mejores documentos de cada consulta, añade su ruta y los ordena por puntuación.
+        Las rutas se obtienen con una única consulta (y caché) solo para los documentos seleccionados
+        en alguna de las consultas.
+
+        Args:
+            puntuaciones_por_consulta (list[Iterable[tuple[str, float]]]): Pares (docID, puntuación) de cada consulta.
+            top_k (int | None): Número máximo de resultados. Si se indica, la selección
+                                se hace con un heap acotado a k elementos.
 
-            score = comparador.comparar(consulta_rep, doc_vector)
+        Returns:
+            list[list[dict]]: Documentos de cada consulta con su puntuación y ruta, ordenados por relevancia.
+        """
+        selecciones = []
+        for puntuaciones in puntuaciones_por_consulta:
+            if top_k:
+                selecciones.append(heapq.nlargest(top_k, puntuaciones, key=lambda par: par[1]))
+            else:
+                selecciones.append(sorted(puntuaciones, key=lambda par: par[1], reverse=True))
 
-            doc_info = self.document_model.collection.find_one({"_id": ObjectId(doc_id)})
-            doc_path = doc_info.get("Path", "Ruta no disponible")
+        doc_ids = dict.fromkeys(doc_id for seleccion in selecciones for doc_id, _ in seleccion)
+        metadatos = self._obtener_metadatos([str(doc_id) for doc_id in doc_ids])
 
-            resultados.append({
-                "doc_id": str(doc_id),
-                "score": score,
-                "path": doc_path
-            })
+        resultados = []
+        for seleccion in selecciones:
+            resultados_consulta = []
+            for doc_id, score in seleccion:
+                doc_info = metadatos.get(str(doc_id))
+                doc_path = (doc_info.get("Path") if doc_info else None) or "Ruta no disponible"
+
+                resultados_consulta.append({
+                    "doc_id": str(doc_id),
+                    "score": score,
+                    "path": doc_path
+                })
+            resultados.append(resultados_consulta)
 
-        # Ordenar los resultados por puntuación de similitud
-        resultados.sort(key=lambda x: x["score"], reverse=True)
         return resultados
+
+    def _obtener_metadatos(self, doc_ids: list[str]) -> dict[str, dict]:
+        """
+        Devuelve el nombre y la ruta de varios documentos. Los que no están en la caché LRU
+        se piden en una única consulta y, si la caché supera su tamaño máximo, se descartan
+        los usados hace más tiempo.
+
+        Args:
+            doc_ids (list[str]): IDs de los documentos.
+
+        Returns:
+            dict[str, dict]: docID → {"Name", "Path"} con los documentos encontrados.
+        """
+        metadatos = {}
+        with self._cerrojo:
+            for doc_id in doc_ids:
+                info = self._metadatos.get(doc_id)
+                if info is not None:
+                    self._metadatos.move_to_end(doc_id)
+                    metadatos[doc_id] = info
+
+        # La consulta a la BD se hace sin el cerrojo
+        pendientes = [doc_id for doc_id in doc_ids if doc_id not in metadatos]
+        if not pendientes:
+            return metadatos
+        encontrados = self.document_model.get_metadata(self.collection_id, pendientes)
+        metadatos.update(encontrados)
+
+        with self._cerrojo:
+            self._metadatos.update(encontrados)
+            while len(self._metadatos) > self._max_metadatos:
+                self._metadatos.popitem(last=False)
+        return metadatos
+
+    def estimar_memoria(self) -> int:
+        """
+        Estima (de forma aproximada) los bytes que ocupan las estructuras cargadas:
+        índice invertido, vocabulario del representador, vectores documentales,
+        matriz término-documento y metadatos de documentos en caché. Las estructuras estáticas se miden una sola vez al
+        cargarlas; de los índices con caché (mmap o MongoDB) se suma su contador, que
+        mantienen al insertar y descartar términos, así que la llamada no recorre postings.
+
+        Returns:
+            int: Estimación en bytes.
+        """
+        total = self._memoria_cargada + 400 * len(self._metadatos)
+        if isinstance(self._indice, (MmapInvertedIndex, MongoInvertedIndex)):
+            total += self._indice.estimar_memoria()
+        return total
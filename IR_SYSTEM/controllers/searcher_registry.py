@@ -0,0 +1,161 @@
+# controllers/searcher_registry.py
+# Registro de buscadores residentes en memoria, uno por colección procesada.
+# Evita volver a leer el pipeline, reconstruir los pasos de preprocesamiento y
+# recargar índice, vocabulario y vectores documentales en cada consulta.
+# Los buscadores menos usados recientemente se descartan cuando la memoria
+# estimada supera el presupuesto configurado. Cada proceso de la aplicación tiene su
+# propio registro, así que antes de reutilizar un buscador se comprueba que la colección
+# procesada no se ha actualizado ni eliminado desde que se cargó (en otro proceso).
+
+import os
+import threading
+from collections import OrderedDict
+from controllers.searcher import Searcher
+from db.processed_collection_model import ProcessedCollectionModel
+
+class SearcherRegistry:
+    """
+    Caché LRU de instancias de Searcher indexada por ID de colección procesada.
+    El presupuesto de memoria se toma del parámetro o de la variable de entorno
+    'IR_SEARCH_CACHE_MB' (por defecto, 512 MB).
+    """
+
+    def __init__(self, memoria_maxima_mb: float = None):
+        """
+        Inicializa el registro vacío.
+
+        Args:
+            memoria_maxima_mb (float, opcional): Memoria máxima estimada para todos los buscadores.
+        """
+        if memoria_maxima_mb is None:
+            memoria_maxima_mb = float(os.environ.get("IR_SEARCH_CACHE_MB", 512))
+
+        self.memoria_maxima = int(memoria_maxima_mb * 1024 * 1024)
+        self._buscadores = OrderedDict()
+        self._memoria = {}
+        self._lock = threading.Lock()
+        self.processed_model = ProcessedCollectionModel()
+
+    def obtener(self, processed_collection_id: str) -> Searcher:
+        """
+        Devuelve el buscador residente de una colección procesada, creándolo si no existe.
+        Un buscador nuevo solo se registra después de cargar su pipeline, de modo que las
+        colecciones inexistentes no ocupan entradas en el registro.
+
+        El buscador residente solo se reutiliza si la versión de la colección procesada
+        (fecha de su última actualización) coincide con la que tenía al cargarse; si ha
+        cambiado, se carga de nuevo, y si la colección ya no existe, se descarta.
+
+        Args:
+            processed_collection_id (str): ID de la colección procesada.
+
+        Returns:
+            Searcher: Buscador de la colección procesada.
+
+        Raises:
+            ValueError: Si la colección procesada no existe.
+        """
+        clave = str(processed_collection_id)
+        with self._lock:
+            buscador = self._buscadores.get(clave)
+
+        # Las consultas a la BD se hacen fuera del cerrojo
+        if buscador is not None:
+            if self.processed_model.get_version(clave) == buscador.version:
+                with self._lock:
+                    if clave in self._buscadores:
+                        self._buscadores.move_to_end(clave)
+                return buscador
+            self._descartar(clave, buscador)
+
+        nuevo = Searcher(clave)
+        nuevo.cargar()
+
+        with self._lock:
+            # Si otro hilo registró mientras tanto la misma versión, se conserva el suyo
+            buscador = self._buscadores.get(clave)
+            if buscador is None or buscador.version != nuevo.version:
+                buscador = self._buscadores[clave] = nuevo
+                self._memoria[clave] = 0
+            self._buscadores.move_to_end(clave)
+            return buscador
+
+    def buscar(self, processed_collection_id: str, texto_consulta: str, **kwargs) -> list[dict]:
+        """
+        Ejecuta una búsqueda con el buscador residente y actualiza la memoria ocupada.
+
+        Args:
+            processed_collection_id (str): ID de la colección procesada.
+            texto_consulta (str): Consulta del usuario.
+            **kwargs: Parámetros adicionales de Searcher.buscar.
+
+        Returns:
+            list[dict]: Resultados de la búsqueda.
+        """
+        buscador = self.obtener(processed_collection_id)
+        resultados = buscador.buscar(texto_consulta, **kwargs)
+        self._actualizar_memoria(str(processed_collection_id), buscador)
+        return resultados
+
+    def buscar_lote(self, processed_collection_id: str, textos_consulta: list[str], **kwargs) -> list[list[dict]]:
+        """
+        Ejecuta un lote de consultas con el buscador residente y actualiza la memoria ocupada.
+
+        Args:
+            processed_collection_id (str): ID de la colección procesada.
+            textos_consulta (list[str]): Consultas del lote.
+            **kwargs: Parámetros adicionales de Searcher.buscar_lote.
+
+        Returns:
+            list[list[dict]]: Resultados de cada consulta, en el mismo orden.
+        """
+        buscador = self.obtener(processed_collection_id)
+        resultados = buscador.buscar_lote(textos_consulta, **kwargs)
+        self._actualizar_memoria(str(processed_collection_id), buscador)
+        return resultados
+
+    def invalidar(self, processed_collection_id: str):
+        """
+        Descarta el buscador residente de una colección procesada.
+
+        Args:
+            processed_collection_id (str): ID de la colección procesada.
+        """
+        clave = str(processed_collection_id)
+        with self._lock:
+            self._buscadores.pop(clave, None)
+            self._memoria.pop(clave, None)
+
+    def _descartar(self, clave: str, buscador: Searcher):
+        """
+        Descarta un buscador que ha dejado de estar vigente, salvo que otro hilo ya lo haya sustituido.
+
+        Args:
+            clave (str): ID de la colección procesada.
+            buscador (Searcher): Buscador que se descarta.
+        """
+        with self._lock:
+            if self._buscadores.get(clave) is buscador:
+                del self._buscadores[clave]
+                self._memoria.pop(clave, None)
+
+    def _actualizar_memoria(self, clave: str, buscador: Searcher):
+        """
+        Anota la memoria estimada de un buscador (que este calcula al cargar sus
+        estructuras, sin recorrerlas en cada consulta) y descarta los menos usados
+        recientemente hasta volver al presupuesto (el más reciente siempre se conserva).
+
+        Args:
+            clave (str): ID de la colección procesada.
+            buscador (Searcher): Buscador cuya memoria se anota.
+        """
+        memoria = buscador.estimar_memoria()
+        with self._lock:
+            if self._buscadores.get(clave) is not buscador:
+                return
+            self._memoria[clave] = memoria
+
+            while len(self._buscadores) > 1 and sum(self._memoria.values()) > self.memoria_maxima:
+                antigua, _ = self._buscadores.popitem(last=False)
+                self._memoria.pop(antigua, None)
+                print(f"Buscador de la colección procesada {antigua} descartado por límite de memoria")
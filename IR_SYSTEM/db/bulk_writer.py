@@ -0,0 +1,74 @@
+import os
+from bson import ObjectId
+
+class BulkWriter:
+    """
+    Acumula documentos y los inserta por lotes con insert_many no ordenado, en lugar de
+    hacer un insert_one (y un viaje de ida y vuelta al servidor) por documento.
+
+    Los IDs se generan en el cliente al añadir cada documento, así que se conocen antes
+    de que el lote se escriba. Se usa como gestor de contexto para vaciar el último lote:
+
+        with modelo.bulk_writer() as escritor:
+            modelo.insert_document(..., escritor=escritor)
+    """
+
+    def __init__(self, collection, batch_size: int = None):
+        """
+        Inicializa el escritor sobre una colección de MongoDB.
+
+        Parámetros:
+        - collection (Collection): colección de PyMongo donde se insertan los documentos.
+        - batch_size (int, opcional): documentos por lote (por defecto, la variable de
+          entorno IR_MONGO_BATCH_SIZE o 1000).
+        """
+        self.collection = collection
+        self.batch_size = max(1, batch_size or int(os.environ.get("IR_MONGO_BATCH_SIZE", 1000)))
+        self.insertados = 0
+        self._pendientes = []
+
+    def add(self, document: dict) -> ObjectId:
+        """
+        Añade un documento al lote actual y escribe el lote si está lleno.
+
+        Parámetro:
+        - document (dict): documento a insertar (se le asigna un '_id' si no lo tiene).
+
+        Retorna:
+        - ObjectId: ID del documento.
+        """
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        self._pendientes.append(document)
+        if len(self._pendientes) >= self.batch_size:
+            self.flush()
+        return document["_id"]
+
+    def flush(self):
+        """
+        Inserta los documentos pendientes. Con escrituras no ordenadas, un documento
+        que falla no impide que se inserte el resto del lote (PyMongo lanza después
+        un BulkWriteError con el detalle).
+        """
+        if not self._pendientes:
+            return
+        lote, self._pendientes = self._pendientes, []
+        self.collection.insert_many(lote, ordered=False)
+        self.insertados += len(lote)
+
+    def descartar(self):
+        """
+        Descarta los documentos pendientes sin insertarlos.
+        """
+        self._pendientes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Si el bloque terminó con error, el lote pendiente se descarta
+        if exc_type is None:
+            self.flush()
+        else:
+            self.descartar()
+        return False
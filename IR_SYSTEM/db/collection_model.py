@@ -69,6 +69,24 @@ class CollectionModel:
             {"$set": {"State": new_state}}
         )
 
+    def update_fingerprint(self, collection_id, fingerprint):
+        """
+        Guarda la huella (tamaño, fecha de modificación y hash) del archivo comprimido
+        de una colección en su última descompresión.
+
+        Parámetros:
+        - collection_id (str): ID de la colección.
+        - fingerprint (dict): huella con las claves 'Size', 'Mtime' y 'Hash'.
+
+        Retorna:
+        - UpdateResult: resultado de la operación de actualización.
+        """
+
+        return self.collection.update_one(
+            {"_id": ObjectId(collection_id)},
+            {"$set": {"Fingerprint": fingerprint}}
+        )
+
     def get_all_collections(self):
         """
         Recupera todas las colecciones registradas en el sistema.
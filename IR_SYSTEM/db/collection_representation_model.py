@@ -1,21 +1,115 @@
+import os
+import math
 from db.conexion import MongoDBConnector
+from db.bulk_writer import BulkWriter
+from db.indexes import crear_indices_coleccion
 from bson import ObjectId
 
+# Los índices invertidos se guardan troceados para no superar el límite de 16 MB por documento
+# de MongoDB: una cabecera en 'collection_representations' y bloques en 'collection_representation_blocks'
+# (uno o varios por término, según el tamaño de sus postings, y la tabla de documentos por tramos).
+TIPOS_TROCEADOS = ("inverted_index",)
+TAMANO_MAX_BLOQUE = int(os.environ.get("IR_MONGO_BLOCK_BYTES", 4 * 1024 * 1024))
+DOCUMENTOS_POR_BLOQUE = 50000
+
+# La cabecera de un índice troceado se inserta con 'Complete': False antes que sus bloques y
+# solo se marca como completa al terminar de escribirlos: las lecturas ignoran las cabeceras
+# incompletas, así que un guardado interrumpido nunca se sirve a medias. Las representaciones
+# guardadas antes de este campo no lo tienen y se consideran completas.
+# Cada bloque lleva el ID de su cabecera ('Header_ID'), de modo que al reescribir una
+# representación la nueva se escribe junto a la anterior, que se sigue sirviendo hasta que
+# la nueva está completa; solo entonces se borra la anterior con sus bloques. Si en ese
+# momento hay dos cabeceras completas, las lecturas usan la más reciente.
+COMPLETA = {"Complete": {"$ne": False}}
+MAS_RECIENTE = [("_id", -1)]
+
+_indices_creados = False
+
+
 class CollectionRepresentationModel:
     """
     Modelo para gestionar las representaciones globales de una colección procesada,
     como índices invertidos u otras estructuras que resumen el conjunto documental.
+
+    Los índices invertidos se guardan troceados: la cabecera solo contiene metadatos
+    ('Layout': 'sharded') y cada término (con su ID, cota y postings) vive en sus propios
+    bloques, de modo que se pueden recuperar solo los términos de una consulta.
     """
     
     def __init__(self):
         """
-        Inicializa la conexión con la colección 'collection_representations' de MongoDB.
+        Inicializa la conexión con las colecciones 'collection_representations' y
+        'collection_representation_blocks' de MongoDB.
+        """
+        conector = MongoDBConnector()
+        self.collection = conector.get_collection("collection_representations")
+        self.blocks = conector.get_collection("collection_representation_blocks")
+
+    def _crear_indices(self):
+        """
+        Crea (una sola vez por proceso) los índices de la colección de bloques:
+        búsqueda de términos concretos y recorrido del vocabulario por ID de término.
         """
-        self.collection = MongoDBConnector().get_collection("collection_representations")
+        global _indices_creados
+        if _indices_creados:
+            return
+        crear_indices_coleccion(self.blocks, "collection_representation_blocks")
+        _indices_creados = True
+
+    def _filtro_bloques(self, cabecera: dict) -> dict:
+        """
+        Filtro de los bloques de una cabecera troceada. Los bloques guardados antes de
+        'Header_ID' no lo tienen (y su cabecera tampoco tiene 'Complete').
+
+        Parámetro:
+        - cabecera (dict): cabecera con '_id', 'Processed_Collection_ID' y 'Representation_Type'.
+
+        Retorna:
+        - dict: filtro de 'collection_representation_blocks'.
+        """
+        return {
+            "Processed_Collection_ID": cabecera["Processed_Collection_ID"],
+            "Representation_Type": cabecera["Representation_Type"],
+            "Header_ID": cabecera["_id"] if "Complete" in cabecera else None
+        }
+
+    def get_header(self, processed_collection_id, representation_type) -> dict | None:
+        """
+        Recupera la cabecera vigente (completa y más reciente) de una representación global,
+        sin su contenido.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+
+        Retorna:
+        - dict | None: cabecera con '_id', 'Layout' y 'Complete' (si lo tiene), o None si no existe.
+        """
+        return self.collection.find_one(
+            {"Processed_Collection_ID": ObjectId(processed_collection_id),
+             "Representation_Type": representation_type, **COMPLETA},
+            {"Processed_Collection_ID": 1, "Representation_Type": 1, "Layout": 1, "Complete": 1},
+            sort=MAS_RECIENTE
+        )
+
+    def _borrar_anteriores(self, pcid: ObjectId, representation_type: str, cabecera_id):
+        """
+        Borra las representaciones de un tipo anteriores a la indicada: primero sus cabeceras,
+        para que dejen de leerse, y después sus bloques.
+
+        Parámetros:
+        - pcid (ObjectId): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+        - cabecera_id (ObjectId): ID de la representación que se conserva.
+        """
+        filtro = {"Processed_Collection_ID": pcid, "Representation_Type": representation_type}
+        self.collection.delete_many({**filtro, "_id": {"$ne": cabecera_id}})
+        self.blocks.delete_many({**filtro, "Header_ID": {"$ne": cabecera_id}})
 
     def insert_representation(self, processed_collection_id, representation_type, content):
         """
-        Inserta una nueva representación global asociada a una colección procesada.
+        Inserta una nueva representación global asociada a una colección procesada. Sustituye
+        a la que hubiera del mismo tipo, que se borra solo cuando la nueva está completa.
 
         Parámetros:
         - processed_collection_id (str): ID de la colección procesada.
@@ -26,14 +120,297 @@ class CollectionRepresentationModel:
         - str: ID del documento insertado.
         """
 
+        if representation_type in TIPOS_TROCEADOS and isinstance(content, dict) and "index" in content:
+            return self._insert_sharded(processed_collection_id, representation_type, content)
+
         representation = {
             "Processed_Collection_ID": ObjectId(processed_collection_id),
             "Representation_Type": representation_type,
             "Content": content  # Estructura global como dict, lista, etc.
         }
         result = self.collection.insert_one(representation)
+        self._borrar_anteriores(representation["Processed_Collection_ID"], representation_type, result.inserted_id)
         return str(result.inserted_id)
 
+    def _insert_sharded(self, processed_collection_id, representation_type, content):
+        """
+        Inserta un índice invertido troceado: una cabecera con metadatos y los bloques de
+        términos y documentos. La representación anterior del mismo tipo se sigue sirviendo
+        mientras se escriben los bloques y se borra al marcar la nueva como completa.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+        - content (dict): índice con 'vocabulario', 'documentos', 'index', 'cotas' y
+          'estadisticas' (calculadas por quien construye el índice).
+
+        Retorna:
+        - str: ID de la cabecera insertada.
+
+        Lanza:
+        - ValueError: si el contenido no incluye las estadísticas de colección.
+        """
+        estadisticas = content.get("estadisticas")
+        if not estadisticas:
+            raise ValueError("El índice troceado debe incluir sus estadísticas de colección.")
+
+        self._crear_indices()
+        pcid = ObjectId(processed_collection_id)
+        index = content.get("index", {})
+        cotas = content.get("cotas") or {}
+
+        vocabulario = list(content.get("vocabulario", []))
+        vistos = set(vocabulario)
+        vocabulario.extend(term for term in index if term not in vistos)
+
+        documentos = list(content.get("documentos") or [])
+        cuentas = {}
+        for postings in index.values():
+            for posting in postings:
+                cuentas[posting[0]] = cuentas.get(posting[0], 0) + 1
+        conocidos = set(documentos)
+        documentos.extend(sorted(doc_id for doc_id in cuentas if doc_id not in conocidos))
+
+        longitudes, normas, idf = estadisticas["longitudes"], estadisticas["normas"], estadisticas["idf"]
+
+        cabecera = {
+            "Processed_Collection_ID": pcid,
+            "Representation_Type": representation_type,
+            "Layout": "sharded",
+            "Complete": False,
+            "Content": {
+                "tipo": content.get("tipo", representation_type),
+                "n_terminos": len(vocabulario),
+                "n_documentos": len(documentos)
+            }
+        }
+        cabecera_id = self.collection.insert_one(cabecera).inserted_id
+
+        def bloques():
+            base = {"Processed_Collection_ID": pcid, "Representation_Type": representation_type, "Header_ID": cabecera_id}
+
+            for i in range(0, max(len(documentos), 1), DOCUMENTOS_POR_BLOQUE):
+                tramo = documentos[i:i + DOCUMENTOS_POR_BLOQUE]
+                yield {**base, "Kind": "documents", "Block": i // DOCUMENTOS_POR_BLOQUE,
+                       "Documents": [
+                           [doc_id, cuentas.get(doc_id, 0), longitudes.get(doc_id, 0), normas.get(doc_id, 0.0)]
+                           for doc_id in tramo
+                       ]}
+
+            for term_id, term in enumerate(vocabulario):
+                postings = index.get(term, [])
+                bloque, tamano, numero = [], 0, 0
+                for posting in postings:
+                    # Estimación del tamaño en BSON de un posting [docID, frecuencia, posiciones]
+                    tamano_posting = 64 + len(str(posting[0])) + 12 * len(posting[2])
+                    if bloque and tamano + tamano_posting > TAMANO_MAX_BLOQUE:
+                        yield {**base, "Kind": "term", "Term": term, "Term_ID": term_id, "Block": numero,
+                               "Df": len(postings), "Idf": idf.get(term, 0.0), "Cota": cotas.get(term, 0.0),
+                               "Postings": bloque}
+                        bloque, tamano, numero = [], 0, numero + 1
+                    bloque.append(posting)
+                    tamano += tamano_posting
+                yield {**base, "Kind": "term", "Term": term, "Term_ID": term_id, "Block": numero,
+                       "Df": len(postings), "Idf": idf.get(term, 0.0), "Cota": cotas.get(term, 0.0),
+                       "Postings": bloque}
+
+        try:
+            with BulkWriter(self.blocks) as escritor:
+                for bloque in bloques():
+                    escritor.add(bloque)
+        except BaseException:
+            # No se dejan bloques huérfanos: se borran junto con la cabecera incompleta, y la
+            # representación anterior sigue intacta
+            self.blocks.delete_many({"Processed_Collection_ID": pcid, "Representation_Type": representation_type,
+                                     "Header_ID": cabecera_id})
+            self.collection.delete_one({"_id": cabecera_id})
+            raise
+
+        self.collection.update_one({"_id": cabecera_id}, {"$set": {"Complete": True}})
+        self._borrar_anteriores(pcid, representation_type, cabecera_id)
+        return str(cabecera_id)
+
+    def get_content(self, representation):
+        """
+        Devuelve el contenido completo de una representación global. Si está troceada,
+        se reconstruye a partir de sus bloques en el formato de get_data().
+
+        Parámetro:
+        - representation (dict): documento de 'collection_representations'.
+
+        Retorna:
+        - dict | list | any: contenido de la representación.
+        """
+        if representation.get("Layout") != "sharded":
+            return representation.get("Content")
+
+        pcid = representation["Processed_Collection_ID"]
+        tipo = representation["Representation_Type"]
+
+        vocabulario, index, cotas, idf = [], {}, {}, {}
+        for bloque in self.blocks.find(
+            {**self._filtro_bloques(representation), "Kind": "term"}
+        ).sort([("Term_ID", 1), ("Block", 1)]):
+            term = bloque["Term"]
+            if bloque["Block"] == 0:
+                vocabulario.append(term)
+            if bloque["Postings"]:
+                index.setdefault(term, []).extend(bloque["Postings"])
+                cotas[term] = bloque["Cota"]
+                idf[term] = bloque.get("Idf")
+
+        tabla = self.get_documents(pcid, tipo, cabecera=representation)
+        documentos = [fila[0] for fila in tabla]
+
+        # Los índices guardados antes de persistir las estadísticas no tienen longitudes ni idf:
+        # se devuelven sin ellas y las calcula quien carga el índice
+        if any(fila[2] is None for fila in tabla) or None in idf.values():
+            estadisticas = None
+        else:
+            estadisticas = {
+                "n_documentos": len(documentos),
+                "longitudes": {doc_id: longitud for doc_id, cuenta, longitud, _ in tabla if cuenta},
+                "normas": {doc_id: norma for doc_id, cuenta, _, norma in tabla if cuenta},
+                "df": {term: len(postings) for term, postings in index.items()},
+                "idf": idf
+            }
+
+        return {
+            "tipo": representation["Content"].get("tipo", tipo),
+            "vocabulario": vocabulario,
+            "documentos": documentos,
+            "index": index,
+            "cotas": cotas,
+            "estadisticas": estadisticas
+        }
+
+    def is_sharded(self, processed_collection_id, representation_type) -> bool:
+        """
+        Indica si la representación global de un tipo está guardada troceada.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+
+        Retorna:
+        - bool: True si existe y está troceada.
+        """
+        cabecera = self.get_header(processed_collection_id, representation_type)
+        return bool(cabecera) and cabecera.get("Layout") == "sharded"
+
+    def get_terms(self, processed_collection_id, representation_type, terms, cabecera: dict = None) -> dict[str, dict]:
+        """
+        Recupera solo los términos indicados de un índice troceado.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+        - terms (Iterable[str]): términos a recuperar.
+        - cabecera (dict, opcional): cabecera (ver get_header) de la que leer. Por defecto, la vigente.
+
+        Retorna:
+        - dict[str, dict]: término → {'term_id', 'cota', 'df', 'idf', 'postings'} (los términos que
+          no están se omiten; 'idf' es None en los índices guardados antes de persistirlo).
+        """
+        cabecera = cabecera or self.get_header(processed_collection_id, representation_type)
+        if not cabecera:
+            return {}
+
+        terminos = {}
+        for bloque in self.blocks.find({
+            **self._filtro_bloques(cabecera),
+            "Kind": "term",
+            "Term": {"$in": list(terms)}
+        }).sort([("Term", 1), ("Block", 1)]):
+            entrada = terminos.setdefault(bloque["Term"], {
+                "term_id": bloque["Term_ID"], "cota": bloque["Cota"],
+                "df": bloque.get("Df", 0), "idf": bloque.get("Idf"), "postings": []
+            })
+            entrada["postings"].extend(bloque["Postings"])
+        return terminos
+
+    def get_vocabulary(self, processed_collection_id, representation_type) -> list[str] | None:
+        """
+        Recupera el vocabulario (ordenado por ID de término) de una representación global,
+        sin cargar sus postings.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+
+        Retorna:
+        - list[str] | None: vocabulario o None si la representación no existe o no lo tiene.
+        """
+        cabecera = self.collection.find_one(
+            {"Processed_Collection_ID": ObjectId(processed_collection_id),
+             "Representation_Type": representation_type, **COMPLETA},
+            {"Processed_Collection_ID": 1, "Representation_Type": 1, "Layout": 1, "Complete": 1,
+             "Content.vocabulario": 1},
+            sort=MAS_RECIENTE
+        )
+        if not cabecera:
+            return None
+        if cabecera.get("Layout") != "sharded":
+            return cabecera.get("Content", {}).get("vocabulario")
+
+        return [
+            bloque["Term"] for bloque in self.blocks.find(
+                {**self._filtro_bloques(cabecera), "Kind": "term", "Block": 0},
+                {"Term": 1, "_id": 0}
+            ).sort("Term_ID", 1)
+        ]
+
+    def get_documents(self, processed_collection_id, representation_type,
+                      cabecera: dict = None) -> list[tuple[str, int, int | None, float]]:
+        """
+        Recupera la tabla de documentos de un índice troceado.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+        - cabecera (dict, opcional): cabecera (ver get_header) de la que leer. Por defecto, la vigente.
+
+        Retorna:
+        - list[tuple[str, int, int | None, float]]: (docID, número de términos distintos, longitud, norma)
+          en orden de docID. En los índices guardados antes de persistir las estadísticas la longitud
+          es None y la norma se calcula a partir del número de términos distintos.
+        """
+        cabecera = cabecera or self.get_header(processed_collection_id, representation_type)
+        if not cabecera:
+            return []
+
+        documentos = []
+        for bloque in self.blocks.find({**self._filtro_bloques(cabecera), "Kind": "documents"}).sort("Block", 1):
+            for fila in bloque["Documents"]:
+                if len(fila) >= 4:
+                    documentos.append(tuple(fila[:4]))
+                else:
+                    documentos.append((fila[0], fila[1], None, math.sqrt(fila[1])))
+        return documentos
+
+    def get_document_lengths(self, processed_collection_id, representation_type, cabecera: dict = None) -> dict[str, int]:
+        """
+        Calcula la longitud de cada documento recorriendo los postings de un índice troceado.
+        Solo hace falta para los índices guardados antes de persistir las estadísticas.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación.
+        - cabecera (dict, opcional): cabecera (ver get_header) de la que leer. Por defecto, la vigente.
+
+        Retorna:
+        - dict[str, int]: docID → número de tokens (los documentos sin términos se omiten).
+        """
+        cabecera = cabecera or self.get_header(processed_collection_id, representation_type)
+        if not cabecera:
+            return {}
+
+        longitudes = {}
+        for bloque in self.blocks.find({**self._filtro_bloques(cabecera), "Kind": "term"}, {"Postings": 1}):
+            for posting in bloque["Postings"]:
+                longitudes[posting[0]] = longitudes.get(posting[0], 0) + posting[1]
+        return longitudes
+
     def get_by_processed_collection(self, processed_collection_id):
         """
         Recupera todas las representaciones asociadas a una colección procesada.
@@ -46,12 +423,14 @@ class CollectionRepresentationModel:
         """
 
         return list(self.collection.find({
-            "Processed_Collection_ID": ObjectId(processed_collection_id)
+            "Processed_Collection_ID": ObjectId(processed_collection_id),
+            **COMPLETA
         }))
 
     def get_by_type(self, processed_collection_id, representation_type):
         """
         Recupera una representación específica por tipo asociada a una colección procesada.
+        Si está troceada, 'Content' se reconstruye completo a partir de sus bloques.
 
         Parámetros:
         - processed_collection_id (str): ID de la colección procesada.
@@ -61,10 +440,33 @@ class CollectionRepresentationModel:
         - dict | None: representación encontrada o None si no existe.
         """
 
-        return self.collection.find_one({
+        representation = self.collection.find_one({
+            "Processed_Collection_ID": ObjectId(processed_collection_id),
+            "Representation_Type": representation_type,
+            **COMPLETA
+        }, sort=MAS_RECIENTE)
+        if representation and representation.get("Layout") == "sharded":
+            representation["Content"] = self.get_content(representation)
+        return representation
+
+    def delete_by_type(self, processed_collection_id, representation_type):
+        """
+        Elimina la representación de un tipo concreto asociada a una colección procesada.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - representation_type (str): tipo de representación a eliminar.
+
+        Retorna:
+        - DeleteResult: resultado de la operación de borrado.
+        """
+
+        filtro = {
             "Processed_Collection_ID": ObjectId(processed_collection_id),
             "Representation_Type": representation_type
-        })
+        }
+        self.blocks.delete_many(filtro)
+        return self.collection.delete_many(filtro)
 
     def delete_by_processed_collection(self, processed_collection_id):
         """
@@ -77,9 +479,9 @@ class CollectionRepresentationModel:
         - DeleteResult: resultado de la operación de borrado.
         """
 
-        return self.collection.delete_many({
-            "Processed_Collection_ID": ObjectId(processed_collection_id)
-        })
+        filtro = {"Processed_Collection_ID": ObjectId(processed_collection_id)}
+        self.blocks.delete_many(filtro)
+        return self.collection.delete_many(filtro)
 
     def delete_all_by_collection_id(self, collection_id: str):
         """
@@ -91,6 +493,7 @@ class CollectionRepresentationModel:
         """
 
         self.collection.delete_many({"Collection_ID": ObjectId(collection_id)})
+        self.blocks.delete_many({"Collection_ID": ObjectId(collection_id)})
 
     def delete_all_by_processed_ids(self, processed_ids: list[str]):
         """
@@ -102,3 +505,4 @@ class CollectionRepresentationModel:
         
         object_ids = [ObjectId(pid) for pid in processed_ids]
         self.collection.delete_many({"Processed_Collection_ID": {"$in": object_ids}})
+        self.blocks.delete_many({"Processed_Collection_ID": {"$in": object_ids}})
@@ -1,21 +1,169 @@
+import os
+import threading
 from pymongo import MongoClient
 
+# Un único MongoClient por proceso (y URI): cada cliente mantiene su propio pool de conexiones
+# e hilos de monitorización, así que todos los modelos comparten el mismo. La configuración
+# se lee de variables de entorno:
+# - IR_MONGO_URI / IR_MONGO_DB: URI de conexión y base de datos.
+# - IR_MONGO_MAX_POOL / IR_MONGO_MIN_POOL: tamaño máximo y mínimo del pool de conexiones.
+# - IR_MONGO_SERVER_TIMEOUT_MS / IR_MONGO_CONNECT_TIMEOUT_MS / IR_MONGO_SOCKET_TIMEOUT_MS: tiempos de espera.
+URI_POR_DEFECTO = os.environ.get("IR_MONGO_URI", "mongodb://localhost:27017")
+DB_POR_DEFECTO = os.environ.get("IR_MONGO_DB", "tfg_ir_system")
+
+_clientes: dict[str, MongoClient] = {}
+_pid = os.getpid()
+_lock = threading.Lock()
+
+
+def _opciones_cliente() -> dict:
+    """
+    Construye las opciones del pool de conexiones a partir de las variables de entorno.
+
+    Retorna:
+    - dict: argumentos para MongoClient.
+    """
+    opciones = {
+        "maxPoolSize": int(os.environ.get("IR_MONGO_MAX_POOL", 100)),
+        "minPoolSize": int(os.environ.get("IR_MONGO_MIN_POOL", 0)),
+        "serverSelectionTimeoutMS": int(os.environ.get("IR_MONGO_SERVER_TIMEOUT_MS", 5000)),
+        "connectTimeoutMS": int(os.environ.get("IR_MONGO_CONNECT_TIMEOUT_MS", 10000)),
+        # No se conecta hasta la primera operación, de modo que importar o crear
+        # modelos antes de un fork no abre sockets en el proceso padre
+        "connect": False
+    }
+    socket_timeout = os.environ.get("IR_MONGO_SOCKET_TIMEOUT_MS")
+    if socket_timeout:
+        opciones["socketTimeoutMS"] = int(socket_timeout)
+    return opciones
+
+
+def _reiniciar_tras_fork():
+    """
+    Descarta en el proceso hijo los clientes heredados del padre tras un fork
+    (workers de gunicorn o multiprocessing): PyMongo no admite compartirlos entre procesos.
+    """
+    global _clientes, _pid, _lock
+    _clientes = {}
+    _pid = os.getpid()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+
+
+def get_client(uri: str = None) -> MongoClient:
+    """
+    Devuelve el MongoClient compartido del proceso para una URI, creándolo la primera vez.
+
+    Parámetro:
+    - uri (str, opcional): URI de conexión. Por defecto, IR_MONGO_URI o localhost.
+
+    Retorna:
+    - MongoClient: cliente compartido.
+    """
+    uri = uri or URI_POR_DEFECTO
+
+    # Comprobación adicional por si el proceso se creó sin pasar por register_at_fork
+    if _pid != os.getpid():
+        _reiniciar_tras_fork()
+
+    cliente = _clientes.get(uri)
+    if cliente is None:
+        with _lock:
+            cliente = _clientes.get(uri)
+            if cliente is None:
+                cliente = MongoClient(uri, **_opciones_cliente())
+                _clientes[uri] = cliente
+    return cliente
+
+
+def close_clients():
+    """
+    Cierra todos los clientes compartidos del proceso actual (por ejemplo, al apagar la aplicación).
+    """
+    with _lock:
+        for cliente in _clientes.values():
+            cliente.close()
+        _clientes.clear()
+
+
+class ColeccionPerezosa:
+    """
+    Referencia a una colección de MongoDB que se resuelve sobre el cliente del proceso
+    actual en cada operación, en lugar de guardar el objeto Collection del cliente que
+    existía al crearla.
+
+    Los modelos se crean a menudo a nivel de módulo (por ejemplo, en las rutas de la
+    aplicación) antes de que gunicorn con --preload o multiprocessing hagan fork; con esta
+    referencia, el proceso hijo usa su propio cliente y no el heredado del padre.
+    """
+
+    def __init__(self, uri: str, db_name: str, name: str):
+        """
+        Parámetros:
+        - uri (str): URI de conexión a MongoDB.
+        - db_name (str): nombre de la base de datos.
+        - name (str): nombre de la colección.
+        """
+        self._uri = uri
+        self._db_name = db_name
+        self._name = name
+
+    def resolver(self):
+        """
+        Devuelve la colección sobre el cliente compartido del proceso actual.
+
+        Retorna:
+        - Collection: objeto de colección de PyMongo.
+        """
+        return get_client(self._uri)[self._db_name][self._name]
+
+    def __getattr__(self, atributo):
+        # Solo se llama para los atributos que no tiene la referencia (find, insert_many...)
+        if atributo.startswith("_"):
+            raise AttributeError(atributo)
+        return getattr(self.resolver(), atributo)
+
+    def __repr__(self):
+        return f"ColeccionPerezosa({self._db_name!r}, {self._name!r})"
+
+
 class MongoDBConnector:
     """
-    Clase de utilidad para gestionar la conexión con la base de datos MongoDB 
+    Clase de utilidad para gestionar la conexión con la base de datos MongoDB
     y facilitar la obtención de colecciones.
+
+    Todas las instancias reutilizan el cliente compartido del proceso, por lo que
+    crear un conector (o un modelo) no abre conexiones nuevas. El cliente se busca en
+    cada acceso, así que un conector creado antes de un fork sigue siendo válido en el hijo.
     """
 
-    def __init__(self, uri="mongodb://localhost:27017", db_name="tfg_ir_system"):
+    def __init__(self, uri=None, db_name=None):
         """
-        Inicializa el conector estableciendo la conexión con el servidor de MongoDB.
+        Inicializa el conector. No crea el cliente: se obtiene del proceso actual al usarlo.
 
         Parámetros:
-        - uri (str): URI de conexión a MongoDB. Por defecto se conecta a localhost.
-        - db_name (str): Nombre de la base de datos a utilizar.
+        - uri (str, opcional): URI de conexión a MongoDB. Por defecto, IR_MONGO_URI o localhost.
+        - db_name (str, opcional): Nombre de la base de datos. Por defecto, IR_MONGO_DB o 'tfg_ir_system'.
+        """
+        self.uri = uri or URI_POR_DEFECTO
+        self.db_name = db_name or DB_POR_DEFECTO
+
+    @property
+    def client(self) -> MongoClient:
+        """
+        Cliente compartido del proceso actual.
+        """
+        return get_client(self.uri)
+
+    @property
+    def db(self):
+        """
+        Base de datos sobre el cliente del proceso actual.
         """
-        self.client = MongoClient(uri)
-        self.db = self.client[db_name]
+        return self.client[self.db_name]
 
     def get_collection(self, name):
         """
@@ -25,6 +173,7 @@ class MongoDBConnector:
         - name (str): Nombre de la colección deseada.
 
         Retorna:
-        - Collection: objeto de colección de PyMongo para operaciones CRUD.
+        - ColeccionPerezosa: colección que admite las operaciones CRUD de PyMongo y se
+          resuelve sobre el cliente del proceso que la usa.
         """
-        return self.db[name]
+        return ColeccionPerezosa(self.uri, self.db_name, name)
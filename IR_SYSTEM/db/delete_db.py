@@ -1,16 +1,16 @@
-from pymongo import MongoClient
+from db.conexion import MongoDBConnector
 
-def drop_all_collections(uri="mongodb://localhost:27017", db_name="tfg_ir_system"):
+def drop_all_collections(uri=None, db_name=None):
     """
     Elimina todas las colecciones de una base de datos MongoDB específica.
 
     Parámetros:
-    - uri (str): URI de conexión a MongoDB (por defecto apunta al localhost)
-    - db_name (str): Nombre de la base de datos sobre la que se ejecutará la operación
+    - uri (str, opcional): URI de conexión a MongoDB (por defecto, IR_MONGO_URI o localhost)
+    - db_name (str, opcional): Nombre de la base de datos sobre la que se ejecutará la operación
+      (por defecto, IR_MONGO_DB)
     """
     
-    client = MongoClient(uri)
-    db = client[db_name]
+    db = MongoDBConnector(uri, db_name).db
 
     colecciones = db.list_collection_names()
     for nombre in colecciones:
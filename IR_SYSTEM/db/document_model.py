@@ -1,5 +1,7 @@
 from db.conexion import MongoDBConnector
+from db.bulk_writer import BulkWriter
 from bson import ObjectId
+from datetime import datetime
 
 class DocumentModel:
     """
@@ -13,7 +15,7 @@ class DocumentModel:
         """
         self.collection = MongoDBConnector().get_collection("documents")
 
-    def insert_document(self, collection_id: str, name: str, path: str) -> str:
+    def insert_document(self, collection_id: str, name: str, path: str, escritor: BulkWriter = None) -> str:
         """
         Inserta un nuevo documento asociado a una colección.
 
@@ -21,6 +23,10 @@ class DocumentModel:
         - collection_id (str): ID de la colección a la que pertenece el documento.
         - name (str): nombre del documento.
         - path (str): ruta o ubicación del archivo físico asociado.
+        - escritor (BulkWriter, opcional): si se indica, el documento se añade a su lote
+          en lugar de insertarse inmediatamente.
+
+        El documento se crea sin huella ('Fingerprint'); esta se guarda al extraer su texto.
 
         Retorna:
         - str: ID del documento insertado.
@@ -28,11 +34,26 @@ class DocumentModel:
         doc = {
             "Collection_ID": ObjectId(collection_id),
             "Name": name,
-            "Path": path
+            "Path": path,
+            "Fingerprint": None
         }
+        if escritor is not None:
+            return str(escritor.add(doc))
         result = self.collection.insert_one(doc)
         return str(result.inserted_id)
 
+    def bulk_writer(self, batch_size: int = None) -> BulkWriter:
+        """
+        Crea un escritor por lotes sobre la colección de este modelo.
+
+        Parámetro:
+        - batch_size (int, opcional): documentos por lote.
+
+        Retorna:
+        - BulkWriter: escritor que se pasa como 'escritor' a los métodos de inserción.
+        """
+        return BulkWriter(self.collection, batch_size)
+
     def get_documents_by_collection(self, collection_id: str) -> list[dict]:
         """
         Recupera todos los documentos asociados a una colección.
@@ -68,6 +89,48 @@ class DocumentModel:
         - DeleteResult: resultado de la operación de borrado.
         """
         return self.collection.delete_one({"_id": ObjectId(document_id)})
+
+    def update_fingerprint(self, document_id: str, fingerprint: dict, extraido: bool = True):
+        """
+        Guarda la huella (tamaño, fecha de modificación y hash) de la versión del archivo
+        cuyo texto está extraído.
+
+        Parámetros:
+        - document_id (str): ID del documento.
+        - fingerprint (dict): huella con las claves 'Size', 'Mtime' y 'Hash'.
+        - extraido (bool): True si el texto se acaba de (re)extraer; en ese caso se
+          actualiza también 'Extraction_Date'.
+
+        Retorna:
+        - UpdateResult: resultado de la operación de actualización.
+        """
+        cambios = {"Fingerprint": fingerprint}
+        if extraido:
+            cambios["Extraction_Date"] = datetime.utcnow()
+        return self.collection.update_one({"_id": ObjectId(document_id)}, {"$set": cambios})
+
+    def get_metadata(self, collection_id: str, document_ids: list[str]) -> dict[str, dict]:
+        """
+        Recupera el nombre y la ruta de varios documentos de una colección en una única
+        consulta con $in. La caché de estos metadatos la mantiene quien los pide (el Searcher).
+
+        Parámetros:
+        - collection_id (str): ID de la colección a la que pertenecen los documentos.
+        - document_ids (list[str]): IDs de los documentos.
+
+        Retorna:
+        - dict[str, dict]: diccionario docID → {"Name", "Path"} con los documentos encontrados.
+        """
+        if not document_ids:
+            return {}
+
+        return {
+            str(doc["_id"]): {"Name": doc.get("Name"), "Path": doc.get("Path")}
+            for doc in self.collection.find(
+                {"_id": {"$in": [ObjectId(d) for d in document_ids]}, "Collection_ID": ObjectId(collection_id)},
+                {"Name": 1, "Path": 1}
+            )
+        }
     
     def document_exists(self, collection_id: str, name: str) -> bool:
         """
@@ -1,4 +1,5 @@
 from db.conexion import MongoDBConnector
+from db.bulk_writer import BulkWriter
 from bson import ObjectId
 
 class DocumentRepresentationModel:
@@ -13,7 +14,7 @@ class DocumentRepresentationModel:
         """
         self.collection = MongoDBConnector().get_collection("document_representations")
 
-    def insert_representation(self, processed_collection_id: str, document_id: str, representation_type: str, content) -> str:
+    def insert_representation(self, processed_collection_id: str, document_id: str, representation_type: str, content, escritor: BulkWriter = None) -> str:
         """
         Inserta una nueva representación para un documento dentro de una colección procesada.
 
@@ -22,6 +23,8 @@ class DocumentRepresentationModel:
         - document_id (str): ID del documento al que se asocia la representación.
         - representation_type (str): tipo de representación (por ejemplo, 'tokens', 'boolean_vector').
         - content (any): contenido de la representación (puede ser lista, dict, etc.).
+        - escritor (BulkWriter, opcional): si se indica, la representación se añade a su lote
+          en lugar de insertarse inmediatamente.
 
         Retorna:
         - str: ID del documento insertado.
@@ -32,9 +35,23 @@ class DocumentRepresentationModel:
             "Representation_Type": representation_type,
             "Content": content
         }
+        if escritor is not None:
+            return str(escritor.add(representation))
         result = self.collection.insert_one(representation)
         return str(result.inserted_id)
 
+    def bulk_writer(self, batch_size: int = None) -> BulkWriter:
+        """
+        Crea un escritor por lotes sobre la colección de este modelo.
+
+        Parámetro:
+        - batch_size (int, opcional): documentos por lote.
+
+        Retorna:
+        - BulkWriter: escritor que se pasa como 'escritor' a los métodos de inserción.
+        """
+        return BulkWriter(self.collection, batch_size)
+
     def get_by_document(self, document_id: str) -> list[dict]:
         """
         Recupera todas las representaciones asociadas a un documento.
@@ -84,3 +101,19 @@ class DocumentRepresentationModel:
         """
         object_ids = [ObjectId(pid) for pid in processed_ids]
         self.collection.delete_many({"Processed_Collection_ID": {"$in": object_ids}})
+
+    def delete_by_documents(self, processed_collection_id: str, document_ids: list[str]):
+        """
+        Elimina todas las representaciones de unos documentos dentro de una colección procesada.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - document_ids (list[str]): IDs de los documentos.
+
+        Retorna:
+        - DeleteResult: resultado de la operación de borrado.
+        """
+        return self.collection.delete_many({
+            "Processed_Collection_ID": ObjectId(processed_collection_id),
+            "Document_ID": {"$in": [ObjectId(d) for d in document_ids]}
+        })
@@ -0,0 +1,184 @@
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from db.conexion import MongoDBConnector
+
+# Índices compuestos que necesitan las rutas de acceso de los modelos, el buscador,
+# el ejecutor del pipeline y las rutas de la aplicación. Se crean al inicializar la
+# base de datos y en la primera petición de cada proceso de la aplicación; create_index
+# no hace nada si ya existen.
+# Cada entrada es (claves, opciones de create_index).
+INDICES = {
+    "documents": [
+        # get_documents_by_collection, document_exists, get_document_by_name y la búsqueda exhaustiva
+        ([("Collection_ID", 1), ("Name", 1)], {}),
+    ],
+    "document_representations": [
+        # Representaciones de un tipo en una colección procesada y borrado por documentos
+        ([("Processed_Collection_ID", 1), ("Representation_Type", 1), ("Document_ID", 1)], {}),
+        # get_by_document y la descarga de una representación documental
+        ([("Document_ID", 1)], {}),
+    ],
+    "collection_representations": [
+        ([("Processed_Collection_ID", 1), ("Representation_Type", 1)], {}),
+        ([("Collection_ID", 1)], {}),
+    ],
+    "collection_representation_blocks": [
+        # Términos concretos de una consulta y recorrido del vocabulario por ID de término,
+        # siempre dentro de los bloques de una cabecera
+        ([("Processed_Collection_ID", 1), ("Representation_Type", 1), ("Header_ID", 1), ("Kind", 1), ("Term", 1), ("Block", 1)], {}),
+        ([("Processed_Collection_ID", 1), ("Representation_Type", 1), ("Header_ID", 1), ("Kind", 1), ("Term_ID", 1)], {}),
+    ],
+    "processed_collections": [
+        ([("Collection_ID", 1)], {}),
+        ([("Pipeline_ID", 1)], {}),
+    ],
+    "representation_types": [
+        # Catálogo: un registro por (colección procesada, paso, representación). Es parcial
+        # para no afectar a los registros antiguos, que no tienen Processed_Collection_ID
+        ([("Processed_Collection_ID", 1), ("Step", 1), ("Name", 1)], {
+            "unique": True,
+            "partialFilterExpression": {"Processed_Collection_ID": {"$exists": True}}
+        }),
+        # Búsqueda de registros antiguos por nombre y ubicación
+        ([("Name", 1), ("Output_Location_Type", 1), ("Temporary", 1)], {}),
+    ],
+}
+
+# Consultas representativas de las rutas de acceso anteriores, usadas para comprobar con
+# explain que ninguna recorre la colección completa. Los valores de ejemplo no tienen que
+# existir: el plan elegido depende de la forma de la consulta, no de los resultados.
+_ID = ObjectId("000000000000000000000000")
+CONSULTAS_CALIENTES = [
+    ("documents", {"Collection_ID": _ID}),
+    ("documents", {"Collection_ID": _ID, "Name": ""}),
+    ("document_representations", {"Processed_Collection_ID": _ID, "Representation_Type": ""}),
+    ("document_representations", {"Processed_Collection_ID": _ID, "Document_ID": {"$in": [_ID]}}),
+    ("document_representations", {"Document_ID": _ID}),
+    ("collection_representations", {"Processed_Collection_ID": _ID, "Representation_Type": ""}),
+    ("collection_representations", {"Collection_ID": _ID}),
+    ("collection_representation_blocks", {
+        "Processed_Collection_ID": _ID, "Representation_Type": "", "Header_ID": _ID, "Kind": "term", "Term": {"$in": [""]}
+    }),
+    ("processed_collections", {"Collection_ID": _ID}),
+    ("processed_collections", {"Pipeline_ID": _ID}),
+    ("representation_types", {"Processed_Collection_ID": _ID, "Name": ""}),
+    ("representation_types", {"Name": "", "Output_Location_Type": "filesystem"}),
+]
+
+
+def crear_indices_coleccion(collection, nombre: str) -> list[str]:
+    """
+    Crea los índices declarados en INDICES para una colección.
+
+    Parámetros:
+    - collection (Collection): colección de PyMongo.
+    - nombre (str): nombre de la colección en INDICES.
+
+    Retorna:
+    - list[str]: nombres de los índices creados o ya existentes.
+    """
+    return [collection.create_index(claves, **opciones) for claves, opciones in INDICES.get(nombre, [])]
+
+
+def crear_indices(db=None) -> dict[str, list[str]]:
+    """
+    Crea todos los índices declarados en INDICES. Un índice que no se puede crear (por ejemplo,
+    el único del catálogo si hay duplicados) no impide crear el resto; se informa del error.
+
+    Parámetro:
+    - db (Database, opcional): base de datos. Por defecto, la del conector compartido.
+
+    Retorna:
+    - dict[str, list[str]]: nombres de los índices creados por colección.
+    """
+    db = db if db is not None else MongoDBConnector().db
+    creados = {}
+    for nombre, indices in INDICES.items():
+        creados[nombre] = []
+        for claves, opciones in indices:
+            try:
+                creados[nombre].append(db[nombre].create_index(claves, **opciones))
+            except PyMongoError as e:
+                print(f"No se pudo crear el índice {claves} en '{nombre}': {e}")
+    return creados
+
+
+def verificar_indices(db=None) -> list[tuple[str, list]]:
+    """
+    Comprueba que existen todos los índices declarados en INDICES.
+
+    Parámetro:
+    - db (Database, opcional): base de datos. Por defecto, la del conector compartido.
+
+    Retorna:
+    - list[tuple[str, list]]: (colección, claves) de cada índice que falta.
+    """
+    db = db if db is not None else MongoDBConnector().db
+    faltan = []
+    for nombre, indices in INDICES.items():
+        existentes = {tuple(info["key"]) for info in db[nombre].index_information().values()}
+        for claves, _ in indices:
+            if tuple(claves) not in existentes:
+                faltan.append((nombre, claves))
+    return faltan
+
+
+def _etapas(plan: dict):
+    """
+    Recorre recursivamente las etapas de un plan de ejecución de explain.
+    """
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for clave in ("inputStage", "queryPlan", "innerStage", "outerStage"):
+        yield from _etapas(plan.get(clave))
+    for subplan in plan.get("inputStages", []):
+        yield from _etapas(subplan)
+
+
+def informe_collscan(db=None) -> list[dict]:
+    """
+    Ejecuta explain sobre las consultas de CONSULTAS_CALIENTES y devuelve las que
+    todavía se resuelven recorriendo la colección completa (COLLSCAN).
+
+    Parámetro:
+    - db (Database, opcional): base de datos. Por defecto, la del conector compartido.
+
+    Retorna:
+    - list[dict]: consultas con COLLSCAN ({"coleccion", "filtro", "etapas"}).
+    """
+    db = db if db is not None else MongoDBConnector().db
+    informe = []
+    for nombre, filtro in CONSULTAS_CALIENTES:
+        plan = db[nombre].find(filtro).explain().get("queryPlanner", {}).get("winningPlan", {})
+        etapas = list(_etapas(plan))
+        if "COLLSCAN" in etapas:
+            informe.append({"coleccion": nombre, "filtro": filtro, "etapas": etapas})
+    return informe
+
+
+def asegurar_indices(db=None) -> list[dict]:
+    """
+    Crea y verifica los índices y muestra las consultas que siguen sin usarlos.
+
+    Parámetro:
+    - db (Database, opcional): base de datos. Por defecto, la del conector compartido.
+
+    Retorna:
+    - list[dict]: consultas con COLLSCAN (ver informe_collscan).
+    """
+    crear_indices(db)
+    for nombre, claves in verificar_indices(db):
+        print(f"Falta el índice {claves} en '{nombre}'.")
+
+    informe = informe_collscan(db)
+    for consulta in informe:
+        print(f"COLLSCAN en '{consulta['coleccion']}' con el filtro {consulta['filtro']}: {consulta['etapas']}")
+    return informe
+
+
+if __name__ == "__main__":
+    # Crea los índices y muestra el informe si se invoca como script principal.
+    if not asegurar_indices():
+        print("Todas las consultas frecuentes usan índices.")
@@ -1,4 +1,5 @@
 from db.conexion import MongoDBConnector
+from db.indexes import asegurar_indices
 
 def init_method_definitions():
     """
@@ -8,7 +9,7 @@ def init_method_definitions():
     Estas definiciones describen las transformaciones que se pueden aplicar 
     en las diferentes etapas del pipeline de procesamiento:
     - Preprocesamiento de texto (limpieza y normalización).
-    - Representación de documentos (e.g., vectores booleanos).
+    - Representación de documentos (e.g., vectores booleanos densos o dispersos).
     - Representación global de colecciones (e.g., índice invertido).
     """
 
@@ -62,6 +63,13 @@ def init_method_definitions():
             "Input_Format": "tokens",
             "Output_Format": "boolean_vector"
         },
+        {
+            "Name": "sparse_boolean_vector",
+            "Description": "Genera un vector binario disperso con los IDs de los términos presentes.",
+            "Method_Type": "document_representation",
+            "Input_Format": "tokens",
+            "Output_Format": "sparse_boolean_vector"
+        },
 
         # Métodos de representación global de colecciones
         {
@@ -81,4 +89,6 @@ def init_method_definitions():
 if __name__ == "__main__":
     # Ejecuta la inicialización si se invoca como script principal.
     init_method_definitions()
+    # Crea los índices de las consultas frecuentes e informa de las que siguen sin usarlos.
+    asegurar_indices()
     print("Base de datos inicializada.")
@@ -15,13 +15,18 @@ class ProcessedCollectionModel:
         """
         self.collection = MongoDBConnector().get_collection("processed_collections")
 
-    def insert_processed_collection(self, collection_id: str, pipeline_id: str) -> str:
+    def insert_processed_collection(self, collection_id: str, pipeline_id: str, destinations: dict = None,
+                                    process_date: datetime = None) -> str:
         """
         Inserta un registro de colección procesada.
 
         Parámetros:
         - collection_id (str): ID de la colección de documentos original.
         - pipeline_id (str): ID del pipeline que se utilizó para procesar la colección.
+        - destinations (dict, opcional): destino de almacenamiento de cada paso (method_def_id → destino),
+          necesario para actualizar después la colección procesada de forma incremental.
+        - process_date (datetime, opcional): momento en que se leyeron los documentos procesados
+          (por defecto, ahora). Los textos extraídos después se consideran modificados.
 
         Retorna:
         - str: ID del registro de colección procesada insertado.
@@ -29,11 +34,29 @@ class ProcessedCollectionModel:
         document = {
             "Collection_ID": ObjectId(collection_id),
             "Pipeline_ID": ObjectId(pipeline_id),
-            "Process_Date": datetime.utcnow()
+            "Process_Date": process_date or datetime.utcnow(),
+            "Destinations": destinations or {}
         }
         result = self.collection.insert_one(document)
         return str(result.inserted_id)
 
+    def mark_updated(self, processed_id: str, update_date: datetime = None):
+        """
+        Registra la fecha de la última actualización incremental de una colección procesada.
+
+        Parámetros:
+        - processed_id (str): ID de la colección procesada.
+        - update_date (datetime, opcional): momento en que se calculó el delta de la actualización
+          (por defecto, ahora). Los textos extraídos después se consideran modificados.
+
+        Retorna:
+        - UpdateResult: resultado de la operación de actualización.
+        """
+        return self.collection.update_one(
+            {"_id": ObjectId(processed_id)},
+            {"$set": {"Update_Date": update_date or datetime.utcnow()}}
+        )
+
     def get_by_id(self, processed_id: str) -> dict | None:
         """
         Recupera un registro de colección procesada por su ID.
@@ -46,6 +69,23 @@ class ProcessedCollectionModel:
         """
         return self.collection.find_one({"_id": ObjectId(processed_id)})
 
+    def get_version(self, processed_id: str):
+        """
+        Recupera la versión de una colección procesada: la fecha de su última actualización
+        incremental o, si no se ha actualizado, la de su procesamiento. Permite saber si una
+        copia cargada en memoria sigue vigente sin leer el registro completo.
+
+        Parámetro:
+        - processed_id (str): ID de la colección procesada.
+
+        Retorna:
+        - datetime | None: versión o None si la colección procesada no existe.
+        """
+        processed = self.collection.find_one({"_id": ObjectId(processed_id)}, {"Update_Date": 1, "Process_Date": 1})
+        if processed is None:
+            return None
+        return processed.get("Update_Date") or processed.get("Process_Date")
+
     def get_by_collection(self, collection_id: str) -> list[dict]:
         """
         Recupera todas las instancias procesadas de una misma colección de documentos.
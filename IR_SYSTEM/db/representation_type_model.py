@@ -1,11 +1,20 @@
+import re
 from db.conexion import MongoDBConnector
+from db.indexes import crear_indices_coleccion
 from bson import ObjectId
 
+_indices_creados = False
+
 class RepresentationTypeModel:
     """
     Modelo para gestionar los tipos de representaciones generadas durante el pipeline.
     Permite registrar metadatos sobre el formato, destino de almacenamiento 
     y la temporalidad de cada representación.
+
+    Funciona como catálogo normalizado: hay un único registro por (colección procesada,
+    paso, representación) que apunta al destino de todas sus representaciones. Para las
+    representaciones documentales en disco, 'Output_Destination' es la carpeta del paso
+    y cada documento se guarda en '<Name>_<docID>.json'.
     """
 
     def __init__(self):
@@ -14,6 +23,100 @@ class RepresentationTypeModel:
         """
         self.collection = MongoDBConnector().get_collection("representation_types")
 
+    def _crear_indices(self):
+        """
+        Crea (una sola vez por proceso) los índices del catálogo, entre ellos el índice único
+        por (colección procesada, paso, representación).
+        """
+        global _indices_creados
+        if _indices_creados:
+            return
+        crear_indices_coleccion(self.collection, "representation_types")
+        _indices_creados = True
+
+    def register(self, processed_collection_id: str, step: str, name: str, format_: str, location_type: str,
+                 destination: str, temporary: bool, description: str = "", scope: str = "document"):
+        """
+        Registra (o actualiza) en el catálogo dónde se guardan las representaciones de un paso
+        de una colección procesada. Es un upsert idempotente: quien guarda las representaciones
+        lo llama una vez por (colección procesada, paso, representación) en cada ejecución.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - step (str): nombre del paso/método del pipeline.
+        - name (str): nombre de la representación (formato de salida del paso).
+        - format_ (str): formato de almacenamiento ('json', 'binary', 'transient').
+        - location_type (str): tipo de ubicación ('RAM', 'filesystem', 'MongoDB').
+        - destination (str): carpeta, fichero o colección de MongoDB donde se guarda.
+        - temporary (bool): indica si es una representación temporal.
+        - description (str): descripción legible.
+        - scope (str): 'document' para representaciones por documento o 'collection' para la global.
+        """
+        self._crear_indices()
+        self.collection.update_one(
+            {"Processed_Collection_ID": ObjectId(processed_collection_id), "Step": step, "Name": name},
+            {"$set": {
+                "Description": description,
+                "Format": format_,
+                "Output_Location_Type": location_type,
+                "Output_Destination": destination,
+                "Temporary": temporary,
+                "Scope": scope
+            }},
+            upsert=True
+        )
+
+    def find_for_processed(self, processed_collection_id: str, name: str, location_type: str = None) -> dict | None:
+        """
+        Busca en el catálogo (consulta indexada) el registro de una representación de una
+        colección procesada. Si no existe, se recurre a los registros antiguos por documento,
+        identificados por contener el ID de la colección procesada en su destino.
+
+        Parámetros:
+        - processed_collection_id (str): ID de la colección procesada.
+        - name (str): nombre de la representación.
+        - location_type (str, opcional): tipo de ubicación requerido.
+
+        Retorna:
+        - dict | None: registro encontrado o None.
+        """
+        filtro = {"Processed_Collection_ID": ObjectId(processed_collection_id), "Name": name}
+        if location_type:
+            filtro["Output_Location_Type"] = location_type
+        registro = self.collection.find_one(filtro)
+        if registro:
+            return registro
+
+        filtro_antiguo = {
+            "Processed_Collection_ID": {"$exists": False},
+            "Name": name,
+            "Output_Destination": {"$regex": re.escape(str(processed_collection_id))}
+        }
+        if location_type:
+            filtro_antiguo["Output_Location_Type"] = location_type
+        return self.collection.find_one(filtro_antiguo)
+
+    def list_by_processed(self, processed_collection_id: str) -> list[dict]:
+        """
+        Lista los registros del catálogo de una colección procesada.
+
+        Parámetro:
+        - processed_collection_id (str): ID de la colección procesada.
+
+        Retorna:
+        - list[dict]: registros de la colección procesada.
+        """
+        return list(self.collection.find({"Processed_Collection_ID": ObjectId(processed_collection_id)}))
+
+    def delete_by_processed_ids(self, processed_ids: list[str]):
+        """
+        Elimina los registros del catálogo de varias colecciones procesadas.
+
+        Parámetro:
+        - processed_ids (list[str]): IDs de las colecciones procesadas.
+        """
+        self.collection.delete_many({"Processed_Collection_ID": {"$in": [ObjectId(pid) for pid in processed_ids]}})
+
     def insert_representation_type(self, name: str, description: str, format_: str, location_type: str, destination: str, temporary: bool) -> str:
         """
         Inserta un nuevo tipo de representación en la base de datos.
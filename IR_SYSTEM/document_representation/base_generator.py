@@ -23,7 +23,7 @@ class RepresentationGenerator(ABC):
         pass
 
     @abstractmethod
-    def representar(self, tokens: list[str], doc_id: str) -> dict:
+    def representar(self, tokens: list[str], doc_id: str) -> dict | list:
         """
         Genera la representación del documento a partir de sus tokens.
 
@@ -32,7 +32,8 @@ class RepresentationGenerator(ABC):
             doc_id (str): Identificador del documento que se está representando.
 
         Returns:
-            dict: Representación generada del documento
+            dict | list: Representación generada del documento (densa como diccionario
+                         o dispersa como lista de IDs de término)
         """
         pass
 
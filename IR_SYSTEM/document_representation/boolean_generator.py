@@ -1,9 +1,13 @@
 # document_representation/boolean_generator.py
 # Implementa un generador de representaciones booleanas a partir de un vocabulario.
 # Cada término del vocabulario se representa con 1 (presente) o 0 (ausente) en el documento.
+# En modo disperso solo se guardan los IDs de los términos presentes, tomando como
+# tabla de vocabulario compartida el vocabulario de la representación global.
 
-import json
+from indexer.binary_index import cargar_estructura_global, es_indice_binario
+from indexer.structures.mmap_inverted_index import MmapInvertedIndex
 from document_representation.base_generator import RepresentationGenerator
+from bson import ObjectId
 from db.collection_representation_model import CollectionRepresentationModel
 
 class BooleanRepresentationGenerator(RepresentationGenerator):
@@ -11,29 +15,50 @@ class BooleanRepresentationGenerator(RepresentationGenerator):
     Generador de representaciones booleanas para documentos.
     A partir de un vocabulario (previamente cargado), construye un vector binario
     que indica la presencia o ausencia de cada término en el documento.
+
+    Si se crea en modo disperso, el vector se devuelve como una lista ordenada con los
+    IDs (posición en el vocabulario) de los términos presentes.
     """
 
-    def cargar_estructura(self, ruta_estructura: str):
+    def __init__(self, disperso: bool = False):
+        """
+        Inicializa el generador.
+
+        Args:
+            disperso (bool): Si es True, las representaciones son listas ordenadas de IDs
+                             de término en lugar de diccionarios sobre todo el vocabulario.
+        """
+        self.disperso = disperso
+        self._lector = None
+
+    def cargar_estructura(self, ruta_estructura: str, perezoso: bool = True):
         """
-        Carga el vocabulario desde un archivo JSON.
+        Carga el vocabulario desde el archivo de la estructura global. Si es un índice
+        binario, se mapea en memoria y los IDs de término se buscan en su diccionario
+        bajo demanda; el vocabulario completo solo se decodifica si hace falta
+        (representación densa o traducción de IDs a términos).
 
         Args:
             ruta_estructura (str): Ruta al archivo con la estructura de representación.
+            perezoso (bool): Si es False, el vocabulario del índice binario se carga entero de
+                             inicio (conviene al representar muchos documentos seguidos).
 
         Raises:
             IOError: Si ocurre un error al leer el archivo.
-            ValueError: Si el JSON no contiene un campo 'vocabulario'.
+            ValueError: Si la estructura no contiene un campo 'vocabulario'.
         """
         try:
-            with open(ruta_estructura, "r", encoding="utf-8") as f:
-                estructura = json.load(f)
+            if es_indice_binario(ruta_estructura) and perezoso:
+                self._lector = MmapInvertedIndex(ruta_estructura)
+                return
+            estructura = cargar_estructura_global(ruta_estructura)
         except Exception as e:
             raise IOError(f"No se pudo cargar la estructura desde archivo: {e}")
 
         if "vocabulario" in estructura:
-            self.vocabulario = set(estructura["vocabulario"])
+            self._fijar_vocabulario(estructura["vocabulario"])
         else:
-            raise ValueError("El archivo JSON no contiene un campo 'vocabulario'.")
+            raise ValueError("El archivo no contiene un campo 'vocabulario'.")
 
     def cargar_desde_bd(self, processed_collection_id: str):
         """
@@ -47,17 +72,44 @@ class BooleanRepresentationGenerator(RepresentationGenerator):
             ValueError: Si no se encuentra la estructura o no contiene vocabulario válido.
         """
         modelo = CollectionRepresentationModel()
-        estructura = modelo.get_by_type(processed_collection_id, "inverted_index")
-
-        if estructura is None:
+        if not modelo.collection.find_one({
+            "Processed_Collection_ID": ObjectId(processed_collection_id),
+            "Representation_Type": "inverted_index"
+        }, {"_id": 1}):
             raise ValueError("No se encontró la representación global en la BD.")
 
-        if "Content" in estructura and "vocabulario" in estructura["Content"]:
-            self.vocabulario = set(estructura["Content"]["vocabulario"])
+        # Solo se descarga el vocabulario (sin postings), también si el índice está troceado
+        vocabulario = modelo.get_vocabulary(processed_collection_id, "inverted_index")
+        if vocabulario is not None:
+            self._fijar_vocabulario(vocabulario)
         else:
             raise ValueError("La representación no contiene vocabulario válido.")
 
-    def representar(self, data, doc_id: str) -> dict[str, int]:
+    def _fijar_vocabulario(self, vocabulario: list[str]):
+        """
+        Guarda el vocabulario en su orden original y la tabla término → ID.
+        El ID de un término es su posición en el vocabulario de la estructura global.
+
+        Args:
+            vocabulario (list[str]): Vocabulario de la colección.
+        """
+        self.vocabulario = list(vocabulario)
+        self.term_ids = {term: i for i, term in enumerate(self.vocabulario)}
+        self._lector = None
+
+    def _asegurar_vocabulario(self):
+        """
+        Comprueba que haya un vocabulario cargado, decodificándolo del índice mapeado si es necesario.
+
+        Raises:
+            RuntimeError: Si no se ha cargado el vocabulario.
+        """
+        if not hasattr(self, "vocabulario"):
+            if self._lector is None:
+                raise RuntimeError("Debes cargar primero el vocabulario con cargar_desde_bd()")
+            self._fijar_vocabulario(self._lector.vocabulario)
+
+    def representar(self, data, doc_id: str) -> dict[str, int] | list[int]:
         """
         Genera un vector booleano para un documento: 1 si el término aparece, 0 si no.
 
@@ -66,23 +118,44 @@ class BooleanRepresentationGenerator(RepresentationGenerator):
             doc_id (str): Identificador del documento (no se utiliza internamente, pero se respeta la firma).
 
         Returns:
-            dict[str, int]: Diccionario con términos del vocabulario como claves y 0/1 como valores.
+            dict[str, int] | list[int]: Diccionario con términos del vocabulario como claves y 0/1
+                                        como valores o, en modo disperso, lista ordenada de IDs
+                                        de los términos presentes.
 
         Raises:
             RuntimeError: Si no se ha cargado el vocabulario.
             TypeError: Si se proporciona texto plano o un tipo no compatible.
         """
-        if not hasattr(self, "vocabulario"):
-            raise RuntimeError("Debes cargar primero el vocabulario con cargar_desde_bd()")
-
         if isinstance(data, str):
             raise TypeError("BooleanRepresentationGenerator no acepta texto plano. Usa un tokenizer primero.")
-        if isinstance(data, list):
-            tokens = data
-        elif isinstance(data, dict):
-            tokens = list(data.keys())
+        if isinstance(data, (list, dict)):
+            presentes = set(data)
         else:
             raise TypeError(f"Tipo de entrada no compatible: {type(data).__name__}")
 
+        if self.disperso and self._lector is not None:
+            # Índice mapeado: cada término se busca en el diccionario del fichero
+            ids = (self._lector.get_term_id(t) for t in presentes)
+            return sorted(i for i in ids if i is not None)
+
+        self._asegurar_vocabulario()
+
+        if self.disperso:
+            # Solo los IDs de los términos del vocabulario que aparecen en el documento
+            return sorted(self.term_ids[t] for t in presentes if t in self.term_ids)
+
         # Devuelve un diccionario con 1 si el término está presente, 0 en caso contrario
-        return {term: int(term in tokens) for term in self.vocabulario}
+        return {term: int(term in presentes) for term in self.vocabulario}
+
+    def terminos(self, ids: list[int]) -> list[str]:
+        """
+        Traduce una representación dispersa (lista de IDs) a los términos correspondientes.
+
+        Args:
+            ids (list[int]): IDs de término.
+
+        Returns:
+            list[str]: Términos del vocabulario en el mismo orden que los IDs.
+        """
+        self._asegurar_vocabulario()
+        return [self.vocabulario[i] for i in ids]
@@ -2,8 +2,12 @@
 # Este módulo gestiona la extracción de texto desde archivos individuales o comprimidos.
 # Si el archivo está comprimido (.zip, .tar, .gz), lo descomprime temporalmente y extrae
 # el texto de cada archivo interno, utilizando el extractor adecuado según su tipo.
+# También calcula la huella (tamaño, fecha de modificación y hash) de cada archivo
+# para poder detectar qué documentos han cambiado entre extracciones.
 
 import os
+import time
+import hashlib
 import zipfile
 import tarfile
 from factories.extractor_factory import get_extractor_for_file
@@ -48,9 +52,13 @@ def extract_files_from_archive(file_path: str) -> list[str]:
     if ext == ".zip":
         with zipfile.ZipFile(file_path, 'r') as zip_ref:
             zip_ref.extractall(extract_dir)
-            for name in zip_ref.namelist():
-                full_path = os.path.join(extract_dir, name)
+            for info in zip_ref.infolist():
+                full_path = os.path.join(extract_dir, info.filename)
                 if os.path.isfile(full_path):
+                    # Se conserva la fecha del miembro (como hace tarfile) para que la huella
+                    # de un archivo que no ha cambiado siga siendo la misma tras descomprimirlo
+                    mtime = time.mktime(info.date_time + (0, 0, -1))
+                    os.utime(full_path, (mtime, mtime))
                     extracted_files.append(full_path)
 
     # Archivos .tar y .gz
@@ -62,4 +70,30 @@ def extract_files_from_archive(file_path: str) -> list[str]:
                 if os.path.isfile(full_path):
                     extracted_files.append(full_path)
 
-    return extracted_files
\ No newline at end of file
+    return extracted_files
+
+def compute_fingerprint(file_path: str, previous: dict = None) -> dict:
+
+    """
+    Función auxiliar que calcula la huella de un archivo: tamaño, fecha de modificación
+    y hash SHA-256 de su contenido. Si se proporciona una huella previa con el mismo tamaño
+    y fecha de modificación, se reutiliza su hash sin volver a leer el archivo.
+
+    Args:
+        file_path (str): Ruta del archivo.
+        previous (dict, opcional): Huella calculada anteriormente para el mismo archivo.
+
+    Returns:
+        dict: Huella con las claves 'Size', 'Mtime' y 'Hash'.
+    """
+
+    stat = os.stat(file_path)
+    if previous and previous.get("Size") == stat.st_size and previous.get("Mtime") == stat.st_mtime:
+        return {"Size": stat.st_size, "Mtime": stat.st_mtime, "Hash": previous["Hash"]}
+
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloque)
+
+    return {"Size": stat.st_size, "Mtime": stat.st_mtime, "Hash": sha.hexdigest()}
@@ -21,5 +21,7 @@ def get_representator(name):
 
     if name == "boolean_vector":
         return BooleanRepresentationGenerator()
+    elif name == "sparse_boolean_vector":
+        return BooleanRepresentationGenerator(disperso=True)
     else:
         raise ValueError(f"Representador de documentos no soportado: {name}")
\ No newline at end of file
@@ -18,6 +18,38 @@ class BaseStructure(ABC):
         """
         pass
 
+    def start_build(self) -> None:
+        """
+        Inicia una construcción documento a documento (ver add_to_build y finish_build).
+        Por defecto se acumulan los documentos y se llama a build al terminar; las estructuras
+        que pueden construirse de forma incremental lo sobrescriben.
+        """
+        self._en_construccion = {}
+
+    def add_to_build(self, docID: str, tokens: list[str]) -> None:
+        """
+        Añade un documento a la construcción en curso.
+
+        Args:
+            docID (str): ID del documento.
+            tokens (list[str]): Tokens del documento.
+        """
+        self._en_construccion[docID] = tokens
+
+    def finish_build(self) -> None:
+        """
+        Termina la construcción en curso y deja la estructura lista para get_data.
+        """
+        coleccion, self._en_construccion = self._en_construccion, None
+        self.build(coleccion)
+
+    def cancel_build(self) -> None:
+        """
+        Abandona la construcción en curso (por ejemplo, si falla el pipeline) y libera
+        lo acumulado hasta el momento.
+        """
+        self._en_construccion = None
+
     @abstractmethod
     def load_from_dict(self, estructura: dict) -> None:
         """
@@ -0,0 +1,503 @@
+# indexer/binary_index.py
+# Formato binario comprimido para guardar en disco el índice invertido.
+#
+# Estructura del fichero (little endian):
+#   - Cabecera fija: firma 'IRIX', versión, nº de documentos, nº de términos y desplazamiento de cada sección.
+#   - Tabla de documentos: docIDs originales en orden de ordinal (longitud en vbyte + UTF-8) y,
+#     desde la versión 2, el número de términos distintos de cada documento. Desde la versión 3,
+#     también su longitud en tokens (vbyte) y la norma de su vector (double).
+#   - Diccionario de términos: entradas de tamaño fijo ordenadas por término, con el ID del término
+#     (posición en el vocabulario), df, desplazamiento y longitud de sus postings y posiciones, su cota
+#     y, desde la versión 3, su idf.
+#   - Cadenas de los términos, referenciadas desde el diccionario.
+#   - Postings: por cada posting, delta del ordinal del documento, frecuencia y nº de bytes de sus posiciones.
+#   - Posiciones: deltas de las posiciones de cada posting, en un flujo aparte para poder saltarlas.
+#   - Metadatos en JSON (tipo de estructura).
+# Todos los enteros de los flujos se codifican con byte variable (7 bits por byte).
+
+import json
+import os
+import struct
+from itertools import accumulate
+from indexer.collection_statistics import calcular_estadisticas, calcular_idf
+
+MAGIC = b"IRIX"
+VERSION = 3
+VERSIONES_SOPORTADAS = (1, 2, 3)
+EXTENSION = ".idx"
+
+CABECERA = struct.Struct("<4sHHIIQQQQQQ")
+ENTRADA_TERMINO = struct.Struct("<IHIIQIQId")
+ENTRADA_TERMINO_V3 = struct.Struct("<IHIIQIQIdd")
+NORMA = struct.Struct("<d")
+
+
+def codificar_vbyte(numeros, salida: bytearray = None) -> bytearray:
+    """
+    Codifica enteros no negativos con byte variable: 7 bits de datos por byte y el bit
+    alto a 1 en todos los bytes salvo el último de cada número.
+
+    Args:
+        numeros (Iterable[int]): Enteros a codificar.
+        salida (bytearray, opcional): Buffer al que añadir los bytes.
+
+    Returns:
+        bytearray: Buffer con los números codificados.
+    """
+    if salida is None:
+        salida = bytearray()
+    for n in numeros:
+        while n >= 0x80:
+            salida.append((n & 0x7F) | 0x80)
+            n >>= 7
+        salida.append(n)
+    return salida
+
+
+def decodificar_vbyte(datos, inicio: int = 0, fin: int = None) -> list[int]:
+    """
+    Decodifica una secuencia de enteros codificados con byte variable.
+
+    Args:
+        datos (bytes | memoryview | mmap): Buffer de origen.
+        inicio (int): Posición del primer byte.
+        fin (int, opcional): Posición final (exclusiva). Por defecto, el final del buffer.
+
+    Returns:
+        list[int]: Enteros decodificados.
+    """
+    if fin is None:
+        fin = len(datos)
+    bloque = datos[inicio:fin]
+    if not bloque:
+        return []
+    # Caso frecuente: todos los números caben en un byte
+    if max(bloque) < 0x80:
+        return list(bloque)
+
+    numeros = []
+    n = 0
+    desplazamiento = 0
+    for byte in bloque:
+        n |= (byte & 0x7F) << desplazamiento
+        if byte & 0x80:
+            desplazamiento += 7
+        else:
+            numeros.append(n)
+            n = 0
+            desplazamiento = 0
+    return numeros
+
+
+def decodificar_posiciones(datos) -> list[int]:
+    """
+    Decodifica las posiciones de un posting (codificadas como deltas).
+
+    Args:
+        datos (bytes | memoryview): Bytes de las posiciones de un posting.
+
+    Returns:
+        list[int]: Posiciones absolutas.
+    """
+    return list(accumulate(decodificar_vbyte(datos)))
+
+
+def escribir_indice_binario(datos: dict, ruta: str) -> None:
+    """
+    Guarda un índice invertido (en el formato de InvertedIndexStructure.get_data) en binario.
+
+    Args:
+        datos (dict): Diccionario con 'vocabulario', 'documentos', 'index', 'cotas'
+                      y, opcionalmente, 'estadisticas' (si no están, se calculan).
+        ruta (str): Ruta del fichero de salida.
+    """
+    index = datos.get("index", {})
+    vocabulario = list(datos.get("vocabulario", []))
+    cotas = datos.get("cotas") or {}
+
+    documentos = list(datos.get("documentos") or [])
+    conocidos = set(documentos)
+    for postings in index.values():
+        for posting in postings:
+            if posting[0] not in conocidos:
+                documentos.append(posting[0])
+                conocidos.add(posting[0])
+    documentos.sort()
+    ordinales = {doc_id: i for i, doc_id in enumerate(documentos)}
+
+    # Los términos del índice que no estén en el vocabulario se añaden al final para no perderlos
+    vistos = set(vocabulario)
+    vocabulario.extend(term for term in index if term not in vistos)
+
+    cuentas = [0] * len(documentos)
+    for postings in index.values():
+        for posting in postings:
+            cuentas[ordinales[posting[0]]] += 1
+
+    estadisticas = datos.get("estadisticas") or calcular_estadisticas(index, documentos)
+    longitudes = estadisticas["longitudes"]
+    normas = estadisticas["normas"]
+    idf = estadisticas["idf"]
+
+    tabla_docs = bytearray()
+    for doc_id, cuenta in zip(documentos, cuentas):
+        codificado = str(doc_id).encode("utf-8")
+        codificar_vbyte((len(codificado),), tabla_docs)
+        tabla_docs.extend(codificado)
+        codificar_vbyte((cuenta, longitudes.get(doc_id, 0)), tabla_docs)
+        tabla_docs.extend(NORMA.pack(float(normas.get(doc_id, 0.0))))
+
+    cadenas = bytearray()
+    flujo_postings = bytearray()
+    flujo_posiciones = bytearray()
+    entradas = []
+
+    for term_id, term in sorted(enumerate(vocabulario), key=lambda par: par[1]):
+        codificado = term.encode("utf-8")
+        offset_cadena = len(cadenas)
+        cadenas.extend(codificado)
+
+        postings = sorted(index.get(term, []), key=lambda posting: ordinales[posting[0]])
+        offset_postings = len(flujo_postings)
+        offset_posiciones = len(flujo_posiciones)
+        anterior = 0
+        for doc_id, frecuencia, posiciones in postings:
+            ordinal = ordinales[doc_id]
+
+            inicio = len(flujo_posiciones)
+            ultima = 0
+            for posicion in posiciones:
+                codificar_vbyte((posicion - ultima,), flujo_posiciones)
+                ultima = posicion
+
+            codificar_vbyte((ordinal - anterior, frecuencia, len(flujo_posiciones) - inicio), flujo_postings)
+            anterior = ordinal
+
+        entradas.append(ENTRADA_TERMINO_V3.pack(
+            offset_cadena, len(codificado), term_id, len(postings),
+            offset_postings, len(flujo_postings) - offset_postings,
+            offset_posiciones, len(flujo_posiciones) - offset_posiciones,
+            float(cotas.get(term, 0.0)), float(idf.get(term, 0.0))
+        ))
+
+    meta = json.dumps({"tipo": datos.get("tipo", "inverted_index")}).encode("utf-8")
+
+    offset_docs = CABECERA.size
+    offset_terminos = offset_docs + len(tabla_docs)
+    offset_cadenas = offset_terminos + ENTRADA_TERMINO_V3.size * len(entradas)
+    offset_postings = offset_cadenas + len(cadenas)
+    offset_posiciones = offset_postings + len(flujo_postings)
+    offset_meta = offset_posiciones + len(flujo_posiciones)
+
+    cabecera = CABECERA.pack(
+        MAGIC, VERSION, 0, len(documentos), len(entradas),
+        offset_docs, offset_terminos, offset_cadenas, offset_postings, offset_posiciones, offset_meta
+    )
+
+    # Se escribe en un fichero temporal y se sustituye el original de una vez: los lectores
+    # que tengan el índice anterior mapeado en memoria siguen viendo un fichero completo
+    ruta_tmp = f"{ruta}.tmp"
+    with open(ruta_tmp, "wb") as f:
+        for seccion in (cabecera, tabla_docs, *entradas, cadenas, flujo_postings, flujo_posiciones, meta):
+            f.write(seccion)
+    os.replace(ruta_tmp, ruta)
+
+
+def leer_cabecera(datos) -> dict:
+    """
+    Lee y valida la cabecera de un índice binario.
+
+    Args:
+        datos (bytes | mmap): Contenido del fichero.
+
+    Returns:
+        dict: Versión, número de documentos y términos, desplazamiento de cada sección
+              y formato ('entrada') de las entradas del diccionario de términos.
+
+    Raises:
+        ValueError: Si el fichero no es un índice binario o su versión no está soportada.
+    """
+    if len(datos) < CABECERA.size:
+        raise ValueError("El fichero es demasiado corto para ser un índice binario.")
+
+    (magic, version, _, n_docs, n_terminos, offset_docs, offset_terminos,
+     offset_cadenas, offset_postings, offset_posiciones, offset_meta) = CABECERA.unpack_from(datos, 0)
+
+    if magic != MAGIC:
+        raise ValueError("El fichero no es un índice invertido binario.")
+    if version not in VERSIONES_SOPORTADAS:
+        raise ValueError(f"Versión de índice binario no soportada: {version}")
+
+    return {
+        "version": version,
+        "n_docs": n_docs,
+        "n_terminos": n_terminos,
+        "docs": offset_docs,
+        "terminos": offset_terminos,
+        "cadenas": offset_cadenas,
+        "postings": offset_postings,
+        "posiciones": offset_posiciones,
+        "meta": offset_meta,
+        "entrada": ENTRADA_TERMINO_V3 if version >= 3 else ENTRADA_TERMINO
+    }
+
+
+def _leer_vbyte(datos, pos: int) -> tuple[int, int]:
+    """
+    Lee un único entero codificado con byte variable.
+
+    Args:
+        datos (bytes | mmap): Buffer de origen.
+        pos (int): Posición del primer byte.
+
+    Returns:
+        tuple[int, int]: (entero leído, posición siguiente).
+    """
+    n = 0
+    desplazamiento = 0
+    while True:
+        byte = datos[pos]
+        pos += 1
+        n |= (byte & 0x7F) << desplazamiento
+        if not byte & 0x80:
+            return n, pos
+        desplazamiento += 7
+
+
+def leer_documentos(datos, cabecera: dict) -> tuple[list[str], dict[str, int] | None]:
+    """
+    Lee la tabla de documentos (docID original de cada ordinal).
+
+    Args:
+        datos (bytes | mmap): Contenido del fichero.
+        cabecera (dict): Cabecera leída con leer_cabecera.
+
+    Returns:
+        tuple: (docIDs en orden de ordinal, docID → número de términos distintos de los
+               documentos con algún término). Los ficheros de la versión 1 no guardan
+               el número de términos y devuelven None en su lugar.
+    """
+    documentos, cuentas, _, _ = leer_tabla_documentos(datos, cabecera)
+    return documentos, cuentas
+
+
+def leer_tabla_documentos(datos, cabecera: dict) -> tuple:
+    """
+    Lee la tabla de documentos completa, con las estadísticas de cada documento.
+
+    Args:
+        datos (bytes | mmap): Contenido del fichero.
+        cabecera (dict): Cabecera leída con leer_cabecera.
+
+    Returns:
+        tuple: (docIDs en orden de ordinal, docID → número de términos distintos,
+               docID → longitud, docID → norma). Solo aparecen los documentos con algún
+               término; las tablas que la versión del fichero no guarda son None.
+    """
+    con_cuentas = cabecera["version"] >= 2
+    con_estadisticas = cabecera["version"] >= 3
+    documentos = []
+    cuentas = {} if con_cuentas else None
+    longitudes = {} if con_estadisticas else None
+    normas = {} if con_estadisticas else None
+    pos = cabecera["docs"]
+    for _ in range(cabecera["n_docs"]):
+        longitud, pos = _leer_vbyte(datos, pos)
+        doc_id = bytes(datos[pos:pos + longitud]).decode("utf-8")
+        pos += longitud
+        documentos.append(doc_id)
+        if con_cuentas:
+            cuenta, pos = _leer_vbyte(datos, pos)
+            if cuenta:
+                cuentas[doc_id] = cuenta
+        if con_estadisticas:
+            longitud_doc, pos = _leer_vbyte(datos, pos)
+            norma, = NORMA.unpack_from(datos, pos)
+            pos += NORMA.size
+            if cuenta:
+                longitudes[doc_id] = longitud_doc
+                normas[doc_id] = norma
+    return documentos, cuentas, longitudes, normas
+
+
+def leer_entrada(datos, cabecera: dict, i: int) -> tuple:
+    """
+    Lee la i-ésima entrada del diccionario de términos.
+
+    Args:
+        datos (bytes | mmap): Contenido del fichero.
+        cabecera (dict): Cabecera leída con leer_cabecera.
+        i (int): Posición de la entrada en el diccionario (ordenado por término).
+
+    Returns:
+        tuple: (término, term_id, df, offset_postings, longitud_postings,
+                offset_posiciones, longitud_posiciones, cota, idf). En los ficheros
+                anteriores a la versión 3 el idf se calcula a partir de df.
+    """
+    formato = cabecera["entrada"]
+    campos = formato.unpack_from(datos, cabecera["terminos"] + i * formato.size)
+    (offset_cadena, longitud_cadena, term_id, df, offset_postings, longitud_postings,
+     offset_posiciones, longitud_posiciones, cota) = campos[:9]
+    idf = campos[9] if len(campos) > 9 else calcular_idf(cabecera["n_docs"], df)
+    inicio = cabecera["cadenas"] + offset_cadena
+    termino = bytes(datos[inicio:inicio + longitud_cadena]).decode("utf-8")
+    return termino, term_id, df, offset_postings, longitud_postings, offset_posiciones, longitud_posiciones, cota, idf
+
+
+def decodificar_postings(datos, cabecera: dict, entrada: tuple, documentos: list[str], con_posiciones: bool = True) -> list:
+    """
+    Decodifica los postings de una entrada del diccionario de términos.
+
+    Args:
+        datos (bytes | mmap): Contenido del fichero.
+        cabecera (dict): Cabecera leída con leer_cabecera.
+        entrada (tuple): Entrada leída con leer_entrada.
+        documentos (list[str]): Tabla de documentos.
+        con_posiciones (bool): Si es False, las posiciones se dejan vacías sin decodificarlas.
+
+    Returns:
+        list: Postings [docID, frecuencia, posiciones] ordenados por docID.
+    """
+    offset_postings, longitud_postings, offset_posiciones, longitud_posiciones = entrada[3:7]
+    inicio = cabecera["postings"] + offset_postings
+    numeros = decodificar_vbyte(datos, inicio, inicio + longitud_postings)
+
+    postings = []
+    ordinal = 0
+    for i in range(0, len(numeros), 3):
+        ordinal += numeros[i]
+        postings.append([documentos[ordinal], numeros[i + 1], []])
+
+    if not con_posiciones:
+        return postings
+
+    inicio = cabecera["posiciones"] + offset_posiciones
+    deltas = decodificar_vbyte(datos, inicio, inicio + longitud_posiciones)
+
+    if len(deltas) == sum(posting[1] for posting in postings):
+        # Cada posting tiene tantas posiciones como su frecuencia: se decodifica el flujo
+        # del término de una vez y se reparte entre sus postings
+        pos = 0
+        for posting in postings:
+            posting[2] = list(accumulate(deltas[pos:pos + posting[1]]))
+            pos += posting[1]
+    else:
+        pos = inicio
+        for posting, longitud in zip(postings, numeros[2::3]):
+            posting[2] = decodificar_posiciones(datos[pos:pos + longitud])
+            pos += longitud
+    return postings
+
+
+def decodificar_posiciones_documentos(datos, cabecera: dict, entrada: tuple, documentos: list[str], doc_ids) -> dict[str, list[int]]:
+    """
+    Decodifica solo las posiciones de los postings de unos documentos concretos. Cada posting
+    guarda cuántos bytes ocupan sus posiciones, así que las del resto de documentos se saltan
+    sin decodificarlas.
+
+    Args:
+        datos (bytes | mmap): Contenido del fichero.
+        cabecera (dict): Cabecera leída con leer_cabecera.
+        entrada (tuple): Entrada leída con leer_entrada.
+        documentos (list[str]): Tabla de documentos.
+        doc_ids (Iterable[str]): Documentos cuyas posiciones se quieren.
+
+    Returns:
+        dict[str, list[int]]: docID → posiciones, solo para los documentos que contienen el término.
+    """
+    buscados = set(doc_ids)
+    offset_postings, longitud_postings, offset_posiciones, _ = entrada[3:7]
+    inicio = cabecera["postings"] + offset_postings
+    numeros = decodificar_vbyte(datos, inicio, inicio + longitud_postings)
+
+    posiciones = {}
+    pos = cabecera["posiciones"] + offset_posiciones
+    ordinal = 0
+    for i in range(0, len(numeros), 3):
+        ordinal += numeros[i]
+        longitud = numeros[i + 2]
+        if documentos[ordinal] in buscados:
+            posiciones[documentos[ordinal]] = decodificar_posiciones(datos[pos:pos + longitud])
+            if len(posiciones) == len(buscados):
+                break
+        pos += longitud
+    return posiciones
+
+
+def leer_indice_binario(ruta: str) -> dict:
+    """
+    Carga un índice binario completo en el formato de InvertedIndexStructure.get_data.
+
+    Args:
+        ruta (str): Ruta del fichero .idx.
+
+    Returns:
+        dict: Diccionario con 'tipo', 'vocabulario', 'documentos', 'index', 'cotas' y 'estadisticas'.
+    """
+    with open(ruta, "rb") as f:
+        datos = f.read()
+
+    cabecera = leer_cabecera(datos)
+    documentos, _, longitudes, normas = leer_tabla_documentos(datos, cabecera)
+    meta = json.loads(datos[cabecera["meta"]:].decode("utf-8") or "{}")
+
+    entradas = [leer_entrada(datos, cabecera, i) for i in range(cabecera["n_terminos"])]
+    # El vocabulario se reconstruye en el orden de los IDs de término
+    entradas.sort(key=lambda entrada: entrada[1])
+
+    index = {}
+    cotas = {}
+    for entrada in entradas:
+        if entrada[2]:
+            index[entrada[0]] = decodificar_postings(datos, cabecera, entrada, documentos)
+            cotas[entrada[0]] = entrada[7]
+
+    if cabecera["version"] >= 3:
+        df = {entrada[0]: entrada[2] for entrada in entradas if entrada[2]}
+        estadisticas = {
+            "n_documentos": len(documentos),
+            "longitudes": longitudes,
+            "normas": normas,
+            "df": df,
+            "idf": {entrada[0]: entrada[8] for entrada in entradas if entrada[2]}
+        }
+    else:
+        estadisticas = calcular_estadisticas(index, documentos)
+
+    return {
+        "tipo": meta.get("tipo", "inverted_index"),
+        "vocabulario": [entrada[0] for entrada in entradas],
+        "documentos": documentos,
+        "index": index,
+        "cotas": cotas,
+        "estadisticas": estadisticas
+    }
+
+
+def es_indice_binario(ruta: str) -> bool:
+    """
+    Indica si una ruta corresponde a un índice guardado en el formato binario.
+
+    Args:
+        ruta (str): Ruta del fichero.
+
+    Returns:
+        bool: True si el fichero tiene la extensión del índice binario.
+    """
+    return os.path.splitext(ruta)[1] == EXTENSION
+
+
+def cargar_estructura_global(ruta: str) -> dict:
+    """
+    Carga una representación global guardada en disco, en formato binario (.idx) o JSON.
+
+    Args:
+        ruta (str): Ruta del fichero.
+
+    Returns:
+        dict: Estructura cargada.
+    """
+    if es_indice_binario(ruta):
+        return leer_indice_binario(ruta)
+    with open(ruta, "r", encoding="utf-8") as f:
+        return json.load(f)
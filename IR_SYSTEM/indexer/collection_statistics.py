@@ -0,0 +1,58 @@
+# indexer/collection_statistics.py
+# Estadísticas de colección que se calculan al indexar y se guardan junto a la
+# representación global: longitud y norma de cada documento, y df e idf de cada
+# término. Permiten puntuar a partir de los postings sin recorrer los vectores
+# documentales completos.
+
+import math
+
+
+def calcular_idf(n_documentos: int, df: int) -> float:
+    """
+    Calcula la frecuencia inversa de documento de un término: log(N / df).
+
+    Args:
+        n_documentos (int): Número de documentos de la colección.
+        df (int): Número de documentos que contienen el término.
+
+    Returns:
+        float: IDF del término (0.0 si no aparece en ningún documento).
+    """
+    if not df or not n_documentos:
+        return 0.0
+    return math.log(n_documentos / df)
+
+
+def calcular_estadisticas(index: dict[str, list], documentos: list[str] = None) -> dict:
+    """
+    Calcula las estadísticas de colección de un índice invertido.
+
+    La norma de cada documento es la norma L2 de su vector booleano, es decir, la raíz del
+    número de términos distintos que contiene. Los documentos sin términos no aparecen en
+    'longitudes' ni en 'normas' (su longitud y su norma son 0).
+
+    Args:
+        index (dict[str, list]): Índice término → postings [docID, frecuencia, posiciones].
+        documentos (list[str], opcional): Documentos indexados, incluidos los que no tienen términos.
+
+    Returns:
+        dict: {'n_documentos', 'longitudes' (docID → nº de tokens), 'normas' (docID → norma),
+               'df' (término → df), 'idf' (término → idf)}.
+    """
+    longitudes = {}
+    cuentas = {}
+    for postings in index.values():
+        for posting in postings:
+            longitudes[posting[0]] = longitudes.get(posting[0], 0) + posting[1]
+            cuentas[posting[0]] = cuentas.get(posting[0], 0) + 1
+
+    n_documentos = len(set(documentos or ()) | cuentas.keys())
+    df = {term: len(postings) for term, postings in index.items() if postings}
+
+    return {
+        "n_documentos": n_documentos,
+        "longitudes": longitudes,
+        "normas": {doc_id: math.sqrt(cuenta) for doc_id, cuenta in cuentas.items()},
+        "df": df,
+        "idf": {term: calcular_idf(n_documentos, n) for term, n in df.items()}
+    }
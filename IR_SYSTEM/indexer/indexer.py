@@ -36,4 +36,40 @@ class Indexer:
         self.estructura.build(coleccion) 
         data = self.estructura.get_data()  
         print("Estructura global construida correctamente")  
-        return data  
\ No newline at end of file
+        return data
+
+    def iniciar_indexado(self) -> None:
+        """
+        Inicia la construcción de la estructura documento a documento, para no tener
+        que reunir antes toda la colección en memoria.
+        """
+        self.estructura.start_build()
+
+    def indexar_documento(self, doc_id: str, tokens: list[str]) -> None:
+        """
+        Añade un documento a la estructura en construcción.
+
+        Args:
+            doc_id (str): ID del documento.
+            tokens (list[str]): Tokens del documento.
+        """
+        self.estructura.add_to_build(doc_id, tokens)
+
+    def finalizar_indexado(self) -> dict:
+        """
+        Termina la construcción iniciada con iniciar_indexado.
+
+        Returns:
+            dict: Representación interna de la estructura generada.
+        """
+        self.estructura.finish_build()
+        data = self.estructura.get_data()
+        print("Estructura global construida correctamente")
+        return data
+
+    def cancelar_indexado(self) -> None:
+        """
+        Abandona la construcción iniciada con iniciar_indexado sin terminarla,
+        liberando los recursos que tenga abiertos.
+        """
+        self.estructura.cancel_build()
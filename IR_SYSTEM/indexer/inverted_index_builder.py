@@ -0,0 +1,64 @@
+# indexer/inverted_index_builder.py
+# Constructor incremental de índices invertidos: acumula los postings de cada documento
+# con coste constante por posting y los congela al final en el formato de InvertedIndexStructure.
+
+
+class InvertedIndexBuilder:
+    """
+    Acumula postings documento a documento y produce el índice invertido final.
+
+    Para cada término se guarda un diccionario docID → posting, de modo que añadir un
+    posting (o ampliar uno existente del mismo documento) cuesta O(1) en lugar de recorrer
+    la lista de postings del término. El orden por docID se impone una sola vez en freeze().
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._terminos_por_documento = {}
+
+    def add_document(self, docID: str, terms: list[str]):
+        """
+        Añade los términos de un documento al índice en construcción. Si el documento
+        ya se había añadido, sus frecuencias y posiciones se acumulan a las anteriores.
+
+        Args:
+            docID (str): Identificador del documento.
+            terms (list[str]): Lista de términos del documento.
+        """
+        term_positions = {}
+        for position, term in enumerate(terms):
+            term_positions.setdefault(term, []).append(position)
+
+        self._terminos_por_documento.setdefault(docID, 0)
+
+        for term, positions in term_positions.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+
+            posting = postings.get(docID)
+            if posting is None:
+                postings[docID] = [docID, len(positions), positions]
+                self._terminos_por_documento[docID] += 1
+            else:
+                posting[1] += len(positions)
+                posting[2].extend(positions)
+
+    def freeze(self) -> tuple[dict[str, list], list[str], dict[str, int]]:
+        """
+        Cierra la construcción y devuelve el índice con los postings ordenados por docID.
+        Los términos conservan el orden de primera aparición, que es el del vocabulario.
+
+        Returns:
+            tuple: (índice término → postings, vocabulario, docID → número de términos distintos).
+        """
+        index = {}
+        for term, postings in self._postings.items():
+            lista = list(postings.values())
+            lista.sort(key=lambda posting: posting[0])
+            index[term] = lista
+
+        cuentas = {docID: n for docID, n in self._terminos_por_documento.items() if n}
+        self._postings = {}
+        self._terminos_por_documento = {}
+        return index, list(index.keys()), cuentas
@@ -0,0 +1,182 @@
+# indexer/sharded_index_builder.py
+# Constructor particionado de índices invertidos: los documentos se reparten en particiones
+# consecutivas que se indexan en paralelo en un pool de procesos. Cada partición se vuelca a
+# disco como un índice parcial ordenado por término y al final se fusionan todos con una
+# mezcla k-vías, de modo que los postings de cada término quedan ordenados por docID.
+
+import os
+import json
+import heapq
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from indexer.inverted_index_builder import InvertedIndexBuilder
+
+
+def _indexar_particion(documentos: list[tuple[str, list[str]]], ruta: str) -> tuple[list[str], dict[str, int]]:
+    """
+    Indexa una partición de documentos y guarda su índice parcial en disco.
+
+    El fichero tiene una línea JSON [término, postings] por término, ordenadas por término,
+    que es el orden que necesita la mezcla k-vías.
+
+    Args:
+        documentos (list[tuple[str, list[str]]]): Pares (docID, tokens) de la partición.
+        ruta (str): Ruta del fichero del índice parcial.
+
+    Returns:
+        tuple: (vocabulario de la partición en orden de primera aparición,
+                docID → número de términos distintos).
+    """
+    builder = InvertedIndexBuilder()
+    for doc_id, tokens in documentos:
+        builder.add_document(doc_id, tokens)
+    index, vocabulario, cuentas = builder.freeze()
+
+    with open(ruta, "w", encoding="utf-8") as f:
+        for term in sorted(index):
+            f.write(json.dumps([term, index[term]]) + "\n")
+    return vocabulario, cuentas
+
+
+def _leer_particion(ruta: str):
+    """
+    Recorre un índice parcial guardado por _indexar_particion.
+
+    Args:
+        ruta (str): Ruta del fichero del índice parcial.
+
+    Yields:
+        tuple[str, list]: Pares (término, postings) ordenados por término.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        for linea in f:
+            term, postings = json.loads(linea)
+            yield term, postings
+
+
+class ShardedIndexBuilder:
+    """
+    Alternativa a InvertedIndexBuilder que reparte la construcción entre varios procesos.
+
+    Los documentos se agrupan en particiones de 'documentos_por_particion' documentos
+    consecutivos. Si se añaden en orden de docID (como hace el pipeline), cada partición
+    cubre un rango de docIDs, y basta con concatenar en orden de partición los postings
+    de un término para que queden ordenados. En memoria solo están los tokens de las
+    particiones pendientes y, al final, el resultado de la fusión. Cada documento debe
+    añadirse una sola vez.
+    """
+
+    def __init__(self, workers: int = 2, documentos_por_particion: int = 10000, directorio: str = None):
+        """
+        Inicializa el constructor.
+
+        Args:
+            workers (int): Número de procesos que indexan particiones.
+            documentos_por_particion (int): Documentos por partición.
+            directorio (str, opcional): Carpeta donde crear los índices parciales
+                                        (por defecto, la carpeta temporal del sistema).
+        """
+        self.workers = max(1, workers)
+        self.documentos_por_particion = max(1, documentos_por_particion)
+        self._directorio = tempfile.mkdtemp(prefix="indice_parcial_", dir=directorio)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pendiente = []
+        self._en_vuelo = deque()
+        self._particiones = []
+        self._ultimo_doc = None
+        self._ordenado = True
+
+    def add_document(self, docID: str, terms: list[str]):
+        """
+        Añade los términos de un documento a la partición en curso y la envía
+        al pool cuando está completa.
+
+        Args:
+            docID (str): Identificador del documento.
+            terms (list[str]): Lista de términos del documento.
+        """
+        if self._ultimo_doc is not None and docID < self._ultimo_doc:
+            self._ordenado = False
+        self._ultimo_doc = docID
+
+        self._pendiente.append((docID, terms))
+        if len(self._pendiente) >= self.documentos_por_particion:
+            self._enviar_particion()
+
+    def iterar_fusion(self):
+        """
+        Termina de indexar las particiones y las fusiona con una mezcla k-vías sin
+        cargarlas enteras en memoria. Los índices parciales se borran al terminar.
+
+        Yields:
+            tuple[str, list]: Pares (término, postings ordenados por docID), por orden de término.
+        """
+        try:
+            if self._pendiente:
+                self._enviar_particion()
+            while self._en_vuelo:
+                self._recoger_particion()
+            self._pool.shutdown()
+
+            # Con el mismo término, heapq.merge respeta el orden de las particiones
+            flujos = [_leer_particion(ruta) for ruta, _, _ in self._particiones]
+            for term, grupo in groupby(heapq.merge(*flujos, key=lambda par: par[0]), key=lambda par: par[0]):
+                postings = [posting for _, parciales in grupo for posting in parciales]
+                if not self._ordenado:
+                    postings.sort(key=lambda posting: posting[0])
+                yield term, postings
+        finally:
+            self.cerrar()
+
+    def freeze(self) -> tuple[dict[str, list], list[str], dict[str, int]]:
+        """
+        Cierra la construcción y devuelve el índice en el mismo formato que InvertedIndexBuilder.freeze.
+        El vocabulario sigue el orden de primera aparición recorriendo las particiones en orden.
+
+        Returns:
+            tuple: (índice término → postings, vocabulario, docID → número de términos distintos).
+        """
+        fusion = dict(self.iterar_fusion())
+
+        vocabulario = []
+        vistos = set()
+        cuentas = {}
+        for _, vocabulario_particion, cuentas_particion in self._particiones:
+            for term in vocabulario_particion:
+                if term not in vistos:
+                    vistos.add(term)
+                    vocabulario.append(term)
+            cuentas.update(cuentas_particion)
+
+        index = {term: fusion[term] for term in vocabulario}
+        return index, vocabulario, cuentas
+
+    def cerrar(self):
+        """
+        Detiene el pool y borra los índices parciales.
+        """
+        self._pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self._directorio, ignore_errors=True)
+
+    def _enviar_particion(self):
+        """
+        Envía la partición en curso al pool, esperando antes a la más antigua si ya hay
+        demasiadas en vuelo (así la memoria de tokens pendientes sigue acotada).
+        """
+        while len(self._en_vuelo) >= 2 * self.workers:
+            self._recoger_particion()
+
+        ruta = os.path.join(self._directorio, f"particion_{len(self._particiones) + len(self._en_vuelo):06d}.jsonl")
+        self._en_vuelo.append((ruta, self._pool.submit(_indexar_particion, self._pendiente, ruta)))
+        self._pendiente = []
+
+    def _recoger_particion(self):
+        """
+        Espera a la partición más antigua en vuelo y guarda su resultado, en orden de envío.
+        """
+        ruta, futuro = self._en_vuelo.popleft()
+        vocabulario, cuentas = futuro.result()
+        self._particiones.append((ruta, vocabulario, cuentas))
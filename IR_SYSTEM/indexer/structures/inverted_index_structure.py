@@ -1,15 +1,47 @@
 #Índice invertido implementado siguiendo la implementación de https://github.com/JaishreeJanu/information-retrieval-system
 
+import os
+import math
+from bisect import bisect_left
 from indexer.base_structure import BaseStructure
+from indexer.inverted_index_builder import InvertedIndexBuilder
+from indexer.sharded_index_builder import ShardedIndexBuilder
+from indexer.collection_statistics import calcular_estadisticas, calcular_idf
+from indexer.binary_index import cargar_estructura_global
 
 class InvertedIndexStructure(BaseStructure):
     """
     Implementación de una estructura de índice invertido que asocia términos a los documentos
     en los que aparecen, junto con la frecuencia y las posiciones dentro del texto.
+
+    Los postings de cada término se mantienen ordenados por docID y, junto al índice,
+    se guarda para cada término una cota superior de 1/||d|| (norma del vector booleano
+    del documento) que permite podar documentos en la búsqueda top-k por coseno.
+
+    Admite actualizaciones incrementales (add_documents / remove_documents). Los términos que
+    se quedan sin postings se conservan en el vocabulario para que los IDs de término (su
+    posición en el vocabulario) sigan siendo estables para las representaciones dispersas.
+
+    Con más de un worker (IR_INDEX_WORKERS), la construcción se reparte en particiones que
+    se indexan en paralelo y se fusionan al final (ver ShardedIndexBuilder).
     """
 
-    def __init__(self):
+    def __init__(self, workers: int = None, documentos_por_particion: int = None):
+        """
+        Args:
+            workers (int, opcional): Procesos de construcción (por defecto, IR_INDEX_WORKERS o 1).
+            documentos_por_particion (int, opcional): Documentos por partición en la construcción
+                                                      paralela (por defecto, IR_INDEX_PARTITION_DOCS o 10000).
+        """
+        self.workers = workers or int(os.environ.get("IR_INDEX_WORKERS", 1))
+        self.documentos_por_particion = documentos_por_particion or int(os.environ.get("IR_INDEX_PARTITION_DOCS", 10000))
         self.index = {}
+        self.vocabulario = []
+        self.documentos = []
+        self.cotas = None
+        self.estadisticas = None
+        self._terminos_por_documento = None
+        self._vocabulario_documento = None
 
     def build(self, coleccion: dict[str, list[str]]):
         """
@@ -18,64 +50,275 @@ class InvertedIndexStructure(BaseStructure):
         Args:
             coleccion (dict): Diccionario con IDs de documento como claves y listas de tokens como valores.
         """
-        
-        if not isinstance(coleccion, dict):
-            raise ValueError("La colección debe ser un diccionario.")
 
-        for doc_id, contenido in coleccion.items():
-            if not isinstance(contenido, list) or not all(isinstance(t, str) for t in contenido):
-                raise TypeError(
-                    f"InvertedIndexStructure espera listas de tokens por documento, "
-                    f"pero '{doc_id}' tiene {type(contenido).__name__}"
-                )
+        self._validar_coleccion(coleccion)
 
-        self.index = {}
+        # Se recorren los documentos en orden de docID para que el vocabulario siga el orden
+        # de primera aparición; el builder ordena los postings al congelarse
+        self.start_build()
+        for docID in sorted(coleccion):
+            self.add_to_build(docID, coleccion[docID])
+        self.finish_build()
+
+    def start_build(self):
+        """
+        Inicia una construcción documento a documento sobre un InvertedIndexBuilder
+        (o un ShardedIndexBuilder si hay más de un worker). Solo se acumulan los
+        postings, no los tokens de los documentos.
+        """
+        if self.workers > 1:
+            self._builder = ShardedIndexBuilder(self.workers, self.documentos_por_particion)
+        else:
+            self._builder = InvertedIndexBuilder()
+        self._documentos_construccion = []
+
+    def add_to_build(self, docID: str, tokens: list[str]):
+        """
+        Añade un documento a la construcción en curso. Para obtener el mismo vocabulario
+        que build, los documentos deben añadirse en orden de docID.
+
+        Args:
+            docID (str): ID del documento.
+            tokens (list[str]): Tokens del documento.
+
+        Raises:
+            TypeError: Si el documento no es una lista de strings.
+        """
+        self._validar_documento(docID, tokens)
+        self._builder.add_document(docID, tokens)
+        self._documentos_construccion.append(docID)
+
+    def finish_build(self):
+        """
+        Congela el builder y calcula las cotas superiores.
+        """
+        self.index, self.vocabulario, self._terminos_por_documento = self._builder.freeze()
+        self.documentos = sorted(set(self._documentos_construccion))
+        self.cotas = self._calcular_cotas()
+        self.estadisticas = calcular_estadisticas(self.index, self.documentos)
+        self._vocabulario_documento = None
+        self._builder = None
+        self._documentos_construccion = None
+
+    def cancel_build(self):
+        """
+        Abandona la construcción en curso. Con un ShardedIndexBuilder se detiene su pool
+        de procesos y se borran los índices parciales.
+        """
+        builder, self._builder = getattr(self, "_builder", None), None
+        self._documentos_construccion = None
+        if isinstance(builder, ShardedIndexBuilder):
+            builder.cerrar()
+
+    def add_documents(self, coleccion: dict[str, list[str]]):
+        """
+        Añade documentos a un índice ya construido sin reconstruirlo. Si alguno de los
+        documentos ya estaba indexado, se sustituye su versión anterior. Solo se modifican
+        los postings, cotas y estadísticas de los términos de esos documentos.
+
+        Args:
+            coleccion (dict): Diccionario con IDs de documento como claves y listas de tokens como valores.
+        """
+
+        self._validar_coleccion(coleccion)
+
+        afectados = self._quitar_documentos(coleccion)
+
+        conocidos = set(self.vocabulario)
+        cuentas = self.get_doc_term_counts()
+        vocabulario_documento = self._get_vocabulario_documento()
+        longitudes = {}
+
+        for docID in sorted(coleccion):
+            term_positions = {}
+            for position, term in enumerate(coleccion[docID]):
+                term_positions.setdefault(term, []).append(position)
+
+            for term, positions in term_positions.items():
+                postings = self.index.setdefault(term, [])
+                # Inserción manteniendo los postings ordenados por docID
+                postings.insert(bisect_left(postings, docID, key=lambda posting: posting[0]), [docID, len(positions), positions])
+                if term not in conocidos:
+                    self.vocabulario.append(term)
+                    conocidos.add(term)
+
+                # Un documento nuevo solo puede subir la cota del término
+                if self.cotas.get(term) is not None:
+                    self.cotas[term] = max(self.cotas[term], 1 / math.sqrt(len(term_positions)))
 
-        for docID, terms in coleccion.items():
-            self._update_inverted_index(terms, docID)
+            if term_positions:
+                cuentas[docID] = len(term_positions)
+                vocabulario_documento[docID] = list(term_positions)
+                longitudes[docID] = len(coleccion[docID])
+            afectados.update(term_positions)
 
-        self.vocabulario = list(self.index.keys())
+            posicion = bisect_left(self.documentos, docID)
+            self.documentos.insert(posicion, docID)
 
-    def _update_inverted_index(self, terms, docID):
+        self._actualizar_cotas(term for term in afectados if term not in self.cotas)
+        self._actualizar_estadisticas(set(coleccion), longitudes, afectados)
+
+    def remove_documents(self, doc_ids):
+        """
+        Elimina documentos del índice. Los términos que se quedan sin postings salen
+        del índice pero se mantienen en el vocabulario. Solo se recorren los postings de
+        los términos de los documentos eliminados.
+
+        Args:
+            doc_ids (Iterable[str]): IDs de los documentos a eliminar.
+        """
+        eliminar = set(doc_ids)
+        if not eliminar:
+            return
+
+        afectados = self._quitar_documentos(eliminar)
+        self._actualizar_estadisticas(eliminar, {}, afectados)
+
+    def _quitar_documentos(self, doc_ids) -> set[str]:
         """
-        Actualiza el índice invertido con los términos de un documento.
+        Quita del índice los postings de unos documentos localizándolos con la lista de
+        términos de cada documento y actualiza las cotas de esos términos. Los documentos
+        que no están indexados se ignoran.
 
         Args:
-            terms (list[str]): Lista de términos del documento.
-            docID (str): Identificador del documento.
+            doc_ids (Iterable[str]): IDs de los documentos a quitar.
+
+        Returns:
+            set[str]: Términos cuyos postings han cambiado.
+        """
+        cuentas = self.get_doc_term_counts()
+        vocabulario_documento = self._get_vocabulario_documento()
+        afectados = set()
+        recalcular = set()
+
+        for doc_id in doc_ids:
+            posicion = bisect_left(self.documentos, doc_id)
+            if posicion == len(self.documentos) or self.documentos[posicion] != doc_id:
+                continue
+            del self.documentos[posicion]
+
+            cuenta = cuentas.pop(doc_id, None)
+            for term in vocabulario_documento.pop(doc_id, ()):
+                postings = self.index[term]
+                del postings[bisect_left(postings, doc_id, key=lambda posting: posting[0])]
+                if not postings:
+                    del self.index[term]
+                afectados.add(term)
+                # La cota solo cambia si este documento era el que la fijaba
+                if 1 / math.sqrt(cuenta) >= self.cotas.get(term, math.inf):
+                    recalcular.add(term)
+
+        self._actualizar_cotas(recalcular | {term for term in afectados if term not in self.index})
+        return afectados
+
+    def _get_vocabulario_documento(self) -> dict[str, list[str]]:
+        """
+        Devuelve, para cada documento, la lista de términos distintos que contiene. Se construye
+        una sola vez recorriendo los postings y después add_documents y remove_documents la
+        mantienen, de modo que una actualización solo toca los postings de sus documentos.
+
+        Returns:
+            dict[str, list[str]]: Diccionario docID → términos.
+        """
+        if self._vocabulario_documento is None:
+            vocabulario_documento = {}
+            for term, postings in self.index.items():
+                for posting in postings:
+                    vocabulario_documento.setdefault(posting[0], []).append(term)
+            self._vocabulario_documento = vocabulario_documento
+        return self._vocabulario_documento
+
+    def _actualizar_estadisticas(self, documentos: set[str], longitudes: dict[str, int], terminos: set[str]):
         """
-    
-        term_positions = {}
-        for position, term in enumerate(terms):
-            term_positions.setdefault(term, []).append(position)
+        Actualiza las estadísticas de colección tras añadir o quitar documentos: longitud
+        y norma de esos documentos y df e idf de los términos afectados. Si cambia el número
+        de documentos, el idf de todos los términos se recalcula a partir de su df (sin
+        recorrer postings).
 
-        for term, positions in term_positions.items():
-            if term in self.index:   
-                doc_ids = [posting[0] for posting in self.index[term]]
-                if docID in doc_ids:
-                    for posting in self.index[term]:
-                        if posting[0] == docID:
-                            posting[1] += len(positions)          # Aumenta la frecuencia
-                            posting[2].extend(positions)          # Añade las nuevas posiciones
-                            break
-                else:
-                    # Si el documento no está, lo añadimos al listado de postings
-                    self.index[term].append([docID, len(positions), positions])
+        Args:
+            documentos (set[str]): Documentos añadidos o eliminados.
+            longitudes (dict[str, int]): Número de tokens de los documentos añadidos con términos.
+            terminos (set[str]): Términos cuyos postings han cambiado.
+        """
+        if self.estadisticas is None:
+            self.estadisticas = calcular_estadisticas(self.index, self.documentos)
+            return
+
+        cuentas = self.get_doc_term_counts()
+        estadisticas = self.estadisticas
+        for doc_id in documentos:
+            if doc_id in longitudes:
+                estadisticas["longitudes"][doc_id] = longitudes[doc_id]
+                estadisticas["normas"][doc_id] = math.sqrt(cuentas[doc_id])
+            else:
+                estadisticas["longitudes"].pop(doc_id, None)
+                estadisticas["normas"].pop(doc_id, None)
+
+        for term in terminos:
+            if term in self.index:
+                estadisticas["df"][term] = len(self.index[term])
             else:
-                # Si el término no existe en el índice, se crea su entrada
-                self.index[term] = [[docID, len(positions), positions]]
+                estadisticas["df"].pop(term, None)
+                estadisticas["idf"].pop(term, None)
+
+        n_documentos = len(self.documentos)
+        recalcular = estadisticas["df"] if n_documentos != estadisticas["n_documentos"] else terminos
+        for term in recalcular:
+            if term in self.index:
+                estadisticas["idf"][term] = calcular_idf(n_documentos, estadisticas["df"][term])
+        estadisticas["n_documentos"] = n_documentos
+
+    @staticmethod
+    def _validar_coleccion(coleccion: dict[str, list[str]]):
+        """
+        Comprueba que la colección sea un diccionario de listas de tokens.
+
+        Args:
+            coleccion (dict): Colección a validar.
+
+        Raises:
+            ValueError: Si la colección no es un diccionario.
+            TypeError: Si algún documento no es una lista de strings.
+        """
+        if not isinstance(coleccion, dict):
+            raise ValueError("La colección debe ser un diccionario.")
+
+        for doc_id, contenido in coleccion.items():
+            InvertedIndexStructure._validar_documento(doc_id, contenido)
+
+    @staticmethod
+    def _validar_documento(doc_id: str, contenido: list[str]):
+        """
+        Comprueba que un documento sea una lista de tokens.
+
+        Args:
+            doc_id (str): ID del documento.
+            contenido (list[str]): Contenido a validar.
+
+        Raises:
+            TypeError: Si el documento no es una lista de strings.
+        """
+        if not isinstance(contenido, list) or not all(isinstance(t, str) for t in contenido):
+            raise TypeError(
+                f"InvertedIndexStructure espera listas de tokens por documento, "
+                f"pero '{doc_id}' tiene {type(contenido).__name__}"
+            )
 
     def get_data(self) -> dict:
         """
         Devuelve la estructura del índice invertido.
 
         Returns:
-            dict: Diccionario con el tipo de estructura, vocabulario e índice invertido.
+            dict: Diccionario con el tipo de estructura, vocabulario, documentos indexados,
+                  índice invertido, cotas superiores por término y estadísticas de colección.
         """
         return {
             "tipo": "inverted_index",
             "vocabulario": self.vocabulario,
-            "index": self.index
+            "documentos": self.documentos,
+            "index": self.index,
+            "cotas": self.cotas,
+            "estadisticas": self.estadisticas
         }
 
     def load_from_dict(self, estructura: dict) -> None:
@@ -83,7 +326,166 @@ class InvertedIndexStructure(BaseStructure):
         Carga una estructura de índice invertido previamente guardada en un diccionario.
 
         Args:
-            estructura (dict): Diccionario que contiene las claves 'index' y 'vocabulario'.
+            estructura (dict): Diccionario que contiene las claves 'index' y 'vocabulario'
+                               (y opcionalmente 'documentos', 'cotas' y 'estadisticas').
         """
         self.index = estructura.get("index", {})
         self.vocabulario = estructura.get("vocabulario", [])
+        self._terminos_por_documento = None
+        self._vocabulario_documento = None
+
+        # Los índices guardados antes de ordenar los postings se ordenan al cargarlos
+        for postings in self.index.values():
+            postings.sort(key=lambda posting: posting[0])
+
+        self.cotas = estructura.get("cotas") or self._calcular_cotas()
+        self.documentos = estructura.get("documentos") or sorted(self.get_doc_term_counts())
+        # Los índices guardados antes de persistir las estadísticas las calculan al cargarse
+        self.estadisticas = estructura.get("estadisticas") or calcular_estadisticas(self.index, self.documentos)
+
+    def load_from_file(self, ruta: str) -> None:
+        """
+        Carga el índice desde disco, tanto en el formato binario comprimido (.idx)
+        como en el JSON de versiones anteriores.
+
+        Args:
+            ruta (str): Ruta del fichero guardado.
+        """
+        self.load_from_dict(cargar_estructura_global(ruta))
+
+    def get_postings(self, term: str, con_posiciones: bool = True) -> list:
+        """
+        Devuelve la lista de postings de un término.
+
+        Args:
+            term (str): Término a consultar.
+            con_posiciones (bool): Se acepta por compatibilidad con MmapInvertedIndex; en memoria
+                                   las posiciones ya están cargadas y siempre se devuelven.
+
+        Returns:
+            list: Lista de postings [docID, frecuencia, posiciones] (vacía si el término no existe).
+        """
+        return self.index.get(term, [])
+
+    def get_positions(self, term: str, doc_ids) -> dict[str, list[int]]:
+        """
+        Devuelve las posiciones de un término en unos documentos concretos, localizando
+        cada documento en los postings con búsqueda binaria.
+
+        Args:
+            term (str): Término a consultar.
+            doc_ids (Iterable[str]): Documentos cuyas posiciones se quieren.
+
+        Returns:
+            dict[str, list[int]]: docID → posiciones, solo para los documentos que contienen el término.
+        """
+        postings = self.get_postings(term)
+        posiciones = {}
+        inicio = 0
+        for doc_id in sorted(doc_ids):
+            inicio = bisect_left(postings, doc_id, lo=inicio, key=lambda posting: posting[0])
+            if inicio == len(postings):
+                break
+            if postings[inicio][0] == doc_id:
+                posiciones[doc_id] = postings[inicio][2]
+        return posiciones
+
+    def get_doc_term_counts(self) -> dict[str, int]:
+        """
+        Devuelve, para cada documento, el número de términos distintos que contiene.
+        Equivale al número de unos de su vector booleano y se calcula una sola vez
+        recorriendo los postings.
+
+        Returns:
+            dict[str, int]: Diccionario docID → número de términos distintos.
+        """
+        if self._terminos_por_documento is None:
+            cuentas = {}
+            for postings in self.index.values():
+                for posting in postings:
+                    cuentas[posting[0]] = cuentas.get(posting[0], 0) + 1
+            self._terminos_por_documento = cuentas
+        return self._terminos_por_documento
+
+    def get_upper_bound(self, term: str) -> float:
+        """
+        Devuelve la cota superior de 1/||d|| entre los documentos que contienen el término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            float: Cota superior (0.0 si el término no existe).
+        """
+        return self.cotas.get(term, 0.0)
+
+    def get_doc_norms(self) -> dict[str, float]:
+        """
+        Devuelve la norma precalculada del vector de cada documento.
+
+        Returns:
+            dict[str, float]: Diccionario docID → norma (los documentos sin términos no aparecen).
+        """
+        return self.estadisticas["normas"]
+
+    def get_doc_lengths(self) -> dict[str, int]:
+        """
+        Devuelve la longitud (número de tokens) de cada documento.
+
+        Returns:
+            dict[str, int]: Diccionario docID → longitud (los documentos sin términos no aparecen).
+        """
+        return self.estadisticas["longitudes"]
+
+    def get_df(self, term: str) -> int:
+        """
+        Devuelve el número de documentos que contienen un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            int: df del término (0 si no existe).
+        """
+        return self.estadisticas["df"].get(term, 0)
+
+    def get_idf(self, term: str) -> float:
+        """
+        Devuelve la frecuencia inversa de documento de un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            float: idf del término (0.0 si no existe).
+        """
+        return self.estadisticas["idf"].get(term, 0.0)
+
+    def _actualizar_cotas(self, terminos):
+        """
+        Recalcula las cotas superiores solo de los términos cuyos postings han cambiado.
+
+        Args:
+            terminos (Iterable[str]): Términos afectados por una actualización.
+        """
+        cuentas = self.get_doc_term_counts()
+        for term in terminos:
+            postings = self.index.get(term)
+            if postings:
+                self.cotas[term] = 1 / math.sqrt(min(cuentas[posting[0]] for posting in postings))
+            else:
+                self.cotas.pop(term, None)
+
+    def _calcular_cotas(self) -> dict[str, float]:
+        """
+        Calcula, para cada término, el máximo de 1/||d|| entre los documentos de sus postings,
+        donde ||d|| es la raíz del número de términos distintos del documento.
+
+        Returns:
+            dict[str, float]: Diccionario término → cota superior.
+        """
+        cuentas = self.get_doc_term_counts()
+        return {
+            term: 1 / math.sqrt(min(cuentas[posting[0]] for posting in postings))
+            for term, postings in self.index.items() if postings
+        }
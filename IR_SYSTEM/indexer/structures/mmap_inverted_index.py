@@ -0,0 +1,326 @@
+# indexer/structures/mmap_inverted_index.py
+# Lector de solo lectura de un índice invertido binario (.idx) mapeado en memoria.
+# Ofrece la misma interfaz de consulta que InvertedIndexStructure sin deserializar
+# el índice completo: cada término se localiza con una búsqueda binaria sobre el
+# diccionario de términos del fichero y solo se decodifican sus postings.
+
+import mmap
+import math
+import threading
+from collections import OrderedDict
+from indexer.binary_index import (
+    leer_cabecera, leer_tabla_documentos, leer_entrada, decodificar_postings, decodificar_posiciones_documentos
+)
+
+
+class MmapInvertedIndex:
+    """
+    Índice invertido respaldado por un fichero binario mapeado en memoria.
+
+    Al abrirlo solo se lee la cabecera; la tabla de documentos se decodifica la primera
+    vez que se necesita y los postings de cada término bajo demanda. Los postings de los
+    últimos términos consultados se guardan en una caché LRU acotada.
+
+    Una misma instancia se comparte entre los hilos que atienden consultas: la caché y la
+    carga de la tabla de documentos se protegen con un cerrojo propio, y los postings se
+    decodifican fuera de él.
+    """
+
+    def __init__(self, ruta: str, max_terminos_cache: int = 1024):
+        """
+        Abre y mapea en memoria el fichero del índice.
+
+        Args:
+            ruta (str): Ruta del fichero .idx.
+            max_terminos_cache (int): Número máximo de listas de postings decodificadas en caché.
+
+        Raises:
+            ValueError: Si el fichero no es un índice binario válido.
+        """
+        self.ruta = ruta
+        with open(ruta, "rb") as f:
+            self._datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._cabecera = leer_cabecera(self._datos)
+        self._documentos = None
+        self._terminos_por_documento = None
+        self._longitudes = None
+        self._normas = None
+        self._vocabulario = None
+        self._cache = OrderedDict()
+        self._max_terminos_cache = max_terminos_cache
+        # Bytes estimados de los postings en caché, actualizados al insertar y descartar
+        self._memoria_cache = 0
+        self._cerrojo = threading.Lock()
+
+    @property
+    def documentos(self) -> list[str]:
+        """
+        docIDs indexados, ordenados (incluye los documentos sin términos).
+        """
+        self._cargar_documentos()
+        return self._documentos
+
+    @property
+    def vocabulario(self) -> list[str]:
+        """
+        Vocabulario completo en orden de ID de término. Se decodifica solo si se pide.
+        """
+        if self._vocabulario is None:
+            entradas = [self._entrada(i) for i in range(self._cabecera["n_terminos"])]
+            vocabulario = [None] * len(entradas)
+            for entrada in entradas:
+                vocabulario[entrada[1]] = entrada[0]
+            self._vocabulario = vocabulario
+        return self._vocabulario
+
+    def get_term_id(self, term: str) -> int | None:
+        """
+        Devuelve el ID (posición en el vocabulario) de un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            int | None: ID del término o None si no está en el vocabulario.
+        """
+        entrada = self._buscar(term)
+        return entrada[1] if entrada else None
+
+    def get_postings(self, term: str, con_posiciones: bool = True) -> list:
+        """
+        Devuelve la lista de postings de un término.
+
+        Args:
+            term (str): Término a consultar.
+            con_posiciones (bool): Si es False, no se decodifican las posiciones (quedan vacías).
+
+        Returns:
+            list: Lista de postings [docID, frecuencia, posiciones] (vacía si el término no existe).
+        """
+        clave = (term, con_posiciones)
+        with self._cerrojo:
+            postings = self._cache.get(clave)
+            if postings is not None:
+                self._cache.move_to_end(clave)
+                return postings
+
+            # Unas postings con posiciones también sirven cuando no se piden
+            if not con_posiciones:
+                postings = self._cache.get((term, True))
+                if postings is not None:
+                    return postings
+
+        entrada = self._buscar(term)
+        postings = []
+        if entrada and entrada[2]:
+            postings = decodificar_postings(self._datos, self._cabecera, entrada, self.documentos, con_posiciones)
+
+        with self._cerrojo:
+            # Si otro hilo lo decodificó mientras tanto, se conserva el suyo
+            if clave in self._cache:
+                return self._cache[clave]
+            self._cache[clave] = postings
+            self._memoria_cache += self._estimar_postings(postings)
+            if len(self._cache) > self._max_terminos_cache:
+                _, descartados = self._cache.popitem(last=False)
+                self._memoria_cache -= self._estimar_postings(descartados)
+        return postings
+
+    def get_positions(self, term: str, doc_ids) -> dict[str, list[int]]:
+        """
+        Devuelve las posiciones de un término en unos documentos concretos, decodificando
+        solo las de esos documentos (salvo que sus postings completos ya estén en caché).
+
+        Args:
+            term (str): Término a consultar.
+            doc_ids (Iterable[str]): Documentos cuyas posiciones se quieren.
+
+        Returns:
+            dict[str, list[int]]: docID → posiciones, solo para los documentos que contienen el término.
+        """
+        postings = self._cache.get((term, True))
+        if postings is not None:
+            buscados = set(doc_ids)
+            return {posting[0]: posting[2] for posting in postings if posting[0] in buscados}
+
+        entrada = self._buscar(term)
+        if not entrada or not entrada[2]:
+            return {}
+        return decodificar_posiciones_documentos(self._datos, self._cabecera, entrada, self.documentos, doc_ids)
+
+    def get_doc_term_counts(self) -> dict[str, int]:
+        """
+        Devuelve, para cada documento, el número de términos distintos que contiene.
+
+        Returns:
+            dict[str, int]: Diccionario docID → número de términos distintos.
+        """
+        self._cargar_documentos()
+        if self._terminos_por_documento is None:
+            self._recorrer_postings()
+        return self._terminos_por_documento
+
+    def get_doc_norms(self) -> dict[str, float]:
+        """
+        Devuelve la norma precalculada del vector de cada documento.
+
+        Returns:
+            dict[str, float]: Diccionario docID → norma (los documentos sin términos no aparecen).
+        """
+        self._cargar_documentos()
+        if self._normas is None:
+            # Antes de la versión 3 la norma no se guardaba: es la raíz del número de términos distintos
+            self._normas = {doc_id: math.sqrt(cuenta) for doc_id, cuenta in self.get_doc_term_counts().items()}
+        return self._normas
+
+    def get_doc_lengths(self) -> dict[str, int]:
+        """
+        Devuelve la longitud (número de tokens) de cada documento.
+
+        Returns:
+            dict[str, int]: Diccionario docID → longitud (los documentos sin términos no aparecen).
+        """
+        self._cargar_documentos()
+        if self._longitudes is None:
+            self._recorrer_postings()
+        return self._longitudes
+
+    def get_df(self, term: str) -> int:
+        """
+        Devuelve el número de documentos que contienen un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            int: df del término (0 si no existe).
+        """
+        entrada = self._buscar(term)
+        return entrada[2] if entrada else 0
+
+    def get_idf(self, term: str) -> float:
+        """
+        Devuelve la frecuencia inversa de documento de un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            float: idf del término (0.0 si no existe).
+        """
+        entrada = self._buscar(term)
+        return entrada[8] if entrada and entrada[2] else 0.0
+
+    def get_upper_bound(self, term: str) -> float:
+        """
+        Devuelve la cota superior de 1/||d|| entre los documentos que contienen el término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            float: Cota superior (0.0 si el término no existe).
+        """
+        entrada = self._buscar(term)
+        return entrada[7] if entrada and entrada[2] else 0.0
+
+    def estimar_memoria(self) -> int:
+        """
+        Estima (de forma aproximada) los bytes residentes en Python: tabla de documentos,
+        vocabulario si se ha decodificado y postings en caché. El fichero mapeado no cuenta,
+        ya que sus páginas las gestiona el sistema operativo.
+
+        Returns:
+            int: Estimación en bytes.
+        """
+        total = self._memoria_cache
+        if self._documentos is not None:
+            total += 150 * len(self._documentos)
+        if self._vocabulario is not None:
+            total += 100 * len(self._vocabulario)
+        return total
+
+    @staticmethod
+    def _estimar_postings(postings: list) -> int:
+        """
+        Estima los bytes de una lista de postings decodificada.
+        """
+        return 100 + sum(200 + 36 * len(posting[2]) for posting in postings)
+
+    def close(self):
+        """
+        Libera el mapeo en memoria del fichero.
+        """
+        with self._cerrojo:
+            self._cache.clear()
+            self._memoria_cache = 0
+        self._datos.close()
+
+    def _cargar_documentos(self):
+        """
+        Decodifica la tabla de documentos la primera vez que se necesita.
+        """
+        if self._documentos is not None:
+            return
+        with self._cerrojo:
+            if self._documentos is None:
+                documentos, self._terminos_por_documento, self._longitudes, self._normas = \
+                    leer_tabla_documentos(self._datos, self._cabecera)
+                # Se publica al final para que otro hilo no vea la tabla a medio cargar
+                self._documentos = documentos
+
+    def _recorrer_postings(self):
+        """
+        Calcula recorriendo todos los postings las tablas por documento que los ficheros
+        antiguos no guardan: términos distintos (versión 1) y longitud (versiones 1 y 2).
+        """
+        cuentas = {}
+        longitudes = {}
+        for i in range(self._cabecera["n_terminos"]):
+            entrada = self._entrada(i)
+            if entrada[2]:
+                for posting in decodificar_postings(self._datos, self._cabecera, entrada, self._documentos, False):
+                    cuentas[posting[0]] = cuentas.get(posting[0], 0) + 1
+                    longitudes[posting[0]] = longitudes.get(posting[0], 0) + posting[1]
+        if self._terminos_por_documento is None:
+            self._terminos_por_documento = cuentas
+        if self._longitudes is None:
+            self._longitudes = longitudes
+
+    def _entrada(self, i: int) -> tuple:
+        """
+        Lee la i-ésima entrada del diccionario de términos.
+        """
+        return leer_entrada(self._datos, self._cabecera, i)
+
+    def _buscar(self, term: str) -> tuple | None:
+        """
+        Busca un término en el diccionario (ordenado por los bytes UTF-8 del término)
+        mediante búsqueda binaria, leyendo solo las entradas que visita.
+
+        Args:
+            term (str): Término a buscar.
+
+        Returns:
+            tuple | None: Entrada del término (ver leer_entrada) o None si no existe.
+        """
+        clave = term.encode("utf-8")
+        datos = self._datos
+        base = self._cabecera["terminos"]
+        cadenas = self._cabecera["cadenas"]
+        formato = self._cabecera["entrada"]
+
+        bajo, alto = 0, self._cabecera["n_terminos"]
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            offset, longitud = formato.unpack_from(datos, base + medio * formato.size)[:2]
+            inicio = cadenas + offset
+            actual = datos[inicio:inicio + longitud]
+            if actual < clave:
+                bajo = medio + 1
+            elif actual > clave:
+                alto = medio
+            else:
+                return self._entrada(medio)
+        return None
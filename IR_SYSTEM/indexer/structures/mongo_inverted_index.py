@@ -0,0 +1,295 @@
+# indexer/structures/mongo_inverted_index.py
+# Lector de solo lectura de un índice invertido guardado troceado en MongoDB.
+# Ofrece la misma interfaz de consulta que InvertedIndexStructure, pero solo
+# descarga de la base de datos los bloques de los términos que se consultan.
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from db.collection_representation_model import CollectionRepresentationModel
+from indexer.collection_statistics import calcular_idf
+
+
+class MongoInvertedIndex:
+    """
+    Índice invertido respaldado por los bloques de 'collection_representation_blocks'.
+
+    La tabla de documentos se descarga la primera vez que se necesita y los postings
+    de cada término bajo demanda (en una sola consulta para todos los términos de una
+    consulta con precargar). Los últimos términos consultados se guardan en una caché LRU.
+
+    Una misma instancia se comparte entre los hilos que atienden consultas: la caché y la
+    carga de la tabla de documentos se protegen con un cerrojo propio, y las consultas a
+    la base de datos se hacen fuera de él.
+
+    Todos los bloques se leen de la cabecera vigente la primera vez que se consulta, aunque
+    después se reescriba la representación: así nunca se mezclan términos de dos versiones.
+    """
+
+    def __init__(self, processed_collection_id: str, representation_type: str = "inverted_index", max_terminos_cache: int = 1024):
+        """
+        Inicializa el lector.
+
+        Args:
+            processed_collection_id (str): ID de la colección procesada.
+            representation_type (str): Tipo de la representación global.
+            max_terminos_cache (int): Número máximo de términos en caché.
+        """
+        self.processed_collection_id = processed_collection_id
+        self.representation_type = representation_type
+        self.modelo = CollectionRepresentationModel()
+        self._documentos = None
+        self._terminos_por_documento = None
+        self._longitudes = None
+        self._normas = None
+        self._cache = OrderedDict()
+        self._max_terminos_cache = max_terminos_cache
+        # Bytes estimados de los términos en caché, actualizados al insertar y descartar
+        self._memoria_cache = 0
+        self._cerrojo = threading.Lock()
+        self._cabecera = None
+
+    @property
+    def documentos(self) -> list[str]:
+        """
+        docIDs indexados, ordenados (incluye los documentos sin términos).
+        """
+        self._cargar_documentos()
+        return self._documentos
+
+    def precargar(self, terms):
+        """
+        Descarga en una sola consulta los términos que todavía no están en caché.
+
+        Args:
+            terms (Iterable[str]): Términos que se van a consultar.
+        """
+        self._descargar(terms)
+
+    def _descargar(self, terms) -> dict[str, dict | None]:
+        """
+        Descarga en una sola consulta los términos que no están en caché y los guarda en ella.
+
+        Args:
+            terms (Iterable[str]): Términos que se van a consultar.
+
+        Returns:
+            dict[str, dict | None]: Entradas de los términos descargados (None si no existen).
+        """
+        with self._cerrojo:
+            pendientes = [t for t in dict.fromkeys(terms) if t not in self._cache]
+        if not pendientes:
+            return {}
+
+        encontrados = self.modelo.get_terms(
+            self.processed_collection_id, self.representation_type, pendientes, cabecera=self._obtener_cabecera()
+        )
+        entradas = {term: encontrados.get(term) for term in pendientes}
+        with self._cerrojo:
+            for term, entrada in entradas.items():
+                self._guardar(term, entrada)
+        return entradas
+
+    def get_term_id(self, term: str) -> int | None:
+        """
+        Devuelve el ID (posición en el vocabulario) de un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            int | None: ID del término o None si no está en el vocabulario.
+        """
+        entrada = self._entrada(term)
+        return entrada["term_id"] if entrada else None
+
+    def get_postings(self, term: str, con_posiciones: bool = True) -> list:
+        """
+        Devuelve la lista de postings de un término.
+
+        Args:
+            term (str): Término a consultar.
+            con_posiciones (bool): Se acepta por compatibilidad; las posiciones vienen en los bloques.
+
+        Returns:
+            list: Lista de postings [docID, frecuencia, posiciones] (vacía si el término no existe).
+        """
+        entrada = self._entrada(term)
+        return entrada["postings"] if entrada else []
+
+    def get_positions(self, term: str, doc_ids) -> dict[str, list[int]]:
+        """
+        Devuelve las posiciones de un término en unos documentos concretos, localizando
+        cada documento en los postings con búsqueda binaria.
+
+        Args:
+            term (str): Término a consultar.
+            doc_ids (Iterable[str]): Documentos cuyas posiciones se quieren.
+
+        Returns:
+            dict[str, list[int]]: docID → posiciones, solo para los documentos que contienen el término.
+        """
+        postings = self.get_postings(term)
+        posiciones = {}
+        inicio = 0
+        for doc_id in sorted(doc_ids):
+            inicio = bisect_left(postings, doc_id, lo=inicio, key=lambda posting: posting[0])
+            if inicio == len(postings):
+                break
+            if postings[inicio][0] == doc_id:
+                posiciones[doc_id] = postings[inicio][2]
+        return posiciones
+
+    def get_doc_term_counts(self) -> dict[str, int]:
+        """
+        Devuelve, para cada documento, el número de términos distintos que contiene.
+
+        Returns:
+            dict[str, int]: Diccionario docID → número de términos distintos.
+        """
+        self._cargar_documentos()
+        return self._terminos_por_documento
+
+    def get_upper_bound(self, term: str) -> float:
+        """
+        Devuelve la cota superior de 1/||d|| entre los documentos que contienen el término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            float: Cota superior (0.0 si el término no existe).
+        """
+        entrada = self._entrada(term)
+        return entrada["cota"] if entrada and entrada["postings"] else 0.0
+
+    def get_doc_norms(self) -> dict[str, float]:
+        """
+        Devuelve la norma precalculada del vector de cada documento.
+
+        Returns:
+            dict[str, float]: Diccionario docID → norma (los documentos sin términos no aparecen).
+        """
+        self._cargar_documentos()
+        return self._normas
+
+    def get_doc_lengths(self) -> dict[str, int]:
+        """
+        Devuelve la longitud (número de tokens) de cada documento.
+
+        Returns:
+            dict[str, int]: Diccionario docID → longitud (los documentos sin términos no aparecen).
+        """
+        self._cargar_documentos()
+        if self._longitudes is None:
+            # Índice guardado antes de persistir las estadísticas: se recorren sus postings
+            self._longitudes = self.modelo.get_document_lengths(
+                self.processed_collection_id, self.representation_type, cabecera=self._obtener_cabecera()
+            )
+        return self._longitudes
+
+    def get_df(self, term: str) -> int:
+        """
+        Devuelve el número de documentos que contienen un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            int: df del término (0 si no existe).
+        """
+        entrada = self._entrada(term)
+        return len(entrada["postings"]) if entrada else 0
+
+    def get_idf(self, term: str) -> float:
+        """
+        Devuelve la frecuencia inversa de documento de un término.
+
+        Args:
+            term (str): Término a consultar.
+
+        Returns:
+            float: idf del término (0.0 si no existe).
+        """
+        entrada = self._entrada(term)
+        if not entrada or not entrada["postings"]:
+            return 0.0
+        if entrada.get("idf") is None:
+            return calcular_idf(len(self.documentos), len(entrada["postings"]))
+        return entrada["idf"]
+
+    def estimar_memoria(self) -> int:
+        """
+        Estima (de forma aproximada) los bytes de la tabla de documentos y los términos en caché.
+
+        Returns:
+            int: Estimación en bytes.
+        """
+        total = self._memoria_cache
+        if self._documentos is not None:
+            total += 150 * len(self._documentos)
+        return total
+
+    @staticmethod
+    def _estimar_entrada(entrada: dict | None) -> int:
+        """
+        Estima los bytes de la entrada de un término en caché.
+        """
+        if not entrada:
+            return 0
+        return 100 + sum(200 + 36 * len(posting[2]) for posting in entrada["postings"])
+
+    def _cargar_documentos(self):
+        """
+        Descarga la tabla de documentos la primera vez que se necesita.
+        """
+        if self._documentos is not None:
+            return
+        cabecera = self._obtener_cabecera()
+        with self._cerrojo:
+            if self._documentos is None:
+                tabla = self.modelo.get_documents(self.processed_collection_id, self.representation_type, cabecera=cabecera)
+                self._terminos_por_documento = {doc_id: cuenta for doc_id, cuenta, _, _ in tabla if cuenta}
+                self._normas = {doc_id: norma for doc_id, cuenta, _, norma in tabla if cuenta}
+                if all(fila[2] is not None for fila in tabla):
+                    self._longitudes = {doc_id: longitud for doc_id, cuenta, longitud, _ in tabla if cuenta}
+                # Se publica al final para que otro hilo no vea la tabla a medio cargar
+                self._documentos = [fila[0] for fila in tabla]
+
+    def _obtener_cabecera(self) -> dict | None:
+        """
+        Devuelve la cabecera de la que se leen los bloques, fijándola la primera vez.
+        """
+        if self._cabecera is None:
+            with self._cerrojo:
+                if self._cabecera is None:
+                    self._cabecera = self.modelo.get_header(self.processed_collection_id, self.representation_type) or {}
+        return self._cabecera or None
+
+    def _entrada(self, term: str) -> dict | None:
+        """
+        Devuelve la entrada en caché de un término, descargándola si no estaba.
+        """
+        while True:
+            with self._cerrojo:
+                if term in self._cache:
+                    self._cache.move_to_end(term)
+                    return self._cache[term]
+            # Se devuelve lo descargado y no lo que quede en caché, que otro hilo puede haber
+            # descartado; si otro hilo lo descargó antes, se vuelve a mirar la caché
+            entradas = self._descargar([term])
+            if term in entradas:
+                return entradas[term]
+
+    def _guardar(self, term: str, entrada: dict | None):
+        """
+        Guarda un término en la caché LRU (también los que no existen, para no repetir la consulta).
+        Se llama con el cerrojo tomado.
+        """
+        if term in self._cache:
+            self._memoria_cache -= self._estimar_entrada(self._cache[term])
+        self._cache[term] = entrada
+        self._memoria_cache += self._estimar_entrada(entrada)
+        if len(self._cache) > self._max_terminos_cache:
+            _, descartada = self._cache.popitem(last=False)
+            self._memoria_cache -= self._estimar_entrada(descartada)
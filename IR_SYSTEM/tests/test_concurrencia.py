@@ -0,0 +1,189 @@
+# tests/test_concurrencia.py
+# Comprueba que un mismo buscador residente y sus índices con caché LRU se pueden
+# usar desde varios hilos a la vez (como los atiende Flask): sin excepciones, con
+# los mismos resultados que en un solo hilo y cargando cada estructura una vez.
+#
+# Uso (desde IR_SYSTEM):
+#   python -m pytest -q tests
+
+import sys
+import threading
+import time
+import pytest
+from controllers.searcher import Searcher
+from indexer.binary_index import escribir_indice_binario
+from indexer.structures.inverted_index_structure import InvertedIndexStructure
+from indexer.structures.mmap_inverted_index import MmapInvertedIndex
+from indexer.structures.mongo_inverted_index import MongoInvertedIndex
+
+HILOS = 8
+VUELTAS = 200
+
+
+@pytest.fixture(autouse=True)
+def cambios_de_hilo_frecuentes():
+    """
+    Reduce el intervalo de cambio de hilo para que las carreras aparezcan en pocas vueltas.
+    """
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+
+
+def en_paralelo(funcion, hilos: int = HILOS) -> list:
+    """
+    Ejecuta una función a la vez en varios hilos y devuelve sus resultados.
+    Si algún hilo lanza una excepción, se relanza en el hilo principal.
+    """
+    barrera = threading.Barrier(hilos)
+    resultados = [None] * hilos
+    errores = []
+
+    def ejecutar(i):
+        barrera.wait()
+        try:
+            resultados[i] = funcion(i)
+        except BaseException as e:
+            errores.append(e)
+
+    trabajadores = [threading.Thread(target=ejecutar, args=(i,)) for i in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    if errores:
+        raise errores[0]
+    return resultados
+
+
+def coleccion() -> dict[str, list[str]]:
+    """
+    Colección pequeña con más términos que entradas en las cachés de las pruebas.
+    """
+    return {f"d{i:03d}": [f"t{(i * j) % 40}" for j in range(1, 12)] for i in range(60)}
+
+
+def indice_en_memoria() -> InvertedIndexStructure:
+    estructura = InvertedIndexStructure(workers=1)
+    estructura.build(coleccion())
+    return estructura
+
+
+def consultar(indice, terminos: list[str]) -> list:
+    """
+    Recorre varias veces los términos (en distinto orden en cada hilo) y devuelve sus postings.
+    """
+    return [indice.get_postings(term) for _ in range(VUELTAS // 20) for term in terminos]
+
+
+def test_mmap_inverted_index_compartido(tmp_path):
+    referencia = indice_en_memoria()
+    ruta = str(tmp_path / "indice.idx")
+    escribir_indice_binario(referencia.get_data(), ruta)
+
+    indice = MmapInvertedIndex(ruta, max_terminos_cache=4)
+    terminos = [f"t{i}" for i in range(40)]
+    try:
+        resultados = en_paralelo(lambda i: consultar(indice, terminos[i:] + terminos[:i]))
+    finally:
+        indice.close()
+
+    for i, postings in enumerate(resultados):
+        esperados = [referencia.get_postings(term) for _ in range(VUELTAS // 20) for term in terminos[i:] + terminos[:i]]
+        assert postings == esperados
+
+
+class ModeloBloques:
+    """
+    Sustituye a CollectionRepresentationModel sirviendo los términos de un índice en memoria,
+    con una pequeña espera para que las descargas de varios hilos se solapen.
+    """
+
+    def __init__(self, estructura: InvertedIndexStructure):
+        self.estructura = estructura
+        self.descargas_documentos = 0
+
+    def get_header(self, processed_collection_id, representation_type):
+        return {"_id": 1, "Layout": "sharded", "Complete": True}
+
+    def get_terms(self, processed_collection_id, representation_type, terms, cabecera=None):
+        time.sleep(0.0005)
+        return {
+            term: {"term_id": self.estructura.vocabulario.index(term), "cota": self.estructura.get_upper_bound(term),
+                   "df": self.estructura.get_df(term), "idf": self.estructura.get_idf(term),
+                   "postings": self.estructura.get_postings(term)}
+            for term in terms if self.estructura.get_postings(term)
+        }
+
+    def get_documents(self, processed_collection_id, representation_type, cabecera=None):
+        self.descargas_documentos += 1
+        time.sleep(0.01)
+        normas = self.estructura.get_doc_norms()
+        longitudes = self.estructura.get_doc_lengths()
+        cuentas = self.estructura.get_doc_term_counts()
+        return [(doc_id, cuentas.get(doc_id, 0), longitudes.get(doc_id, 0), normas.get(doc_id, 0.0))
+                for doc_id in self.estructura.documentos]
+
+
+def test_mongo_inverted_index_compartido():
+    referencia = indice_en_memoria()
+    indice = MongoInvertedIndex("pc", max_terminos_cache=4)
+    indice.modelo = ModeloBloques(referencia)
+    terminos = [f"t{i}" for i in range(40)] + ["inexistente"]
+
+    resultados = en_paralelo(lambda i: (indice.documentos, consultar(indice, terminos[i:] + terminos[:i])))
+
+    assert indice.modelo.descargas_documentos == 1
+    for i, (documentos, postings) in enumerate(resultados):
+        assert documentos == referencia.documentos
+        assert postings == [referencia.get_postings(term) for _ in range(VUELTAS // 20) for term in terminos[i:] + terminos[:i]]
+
+
+class ModeloDocumentos:
+    """
+    Sustituye a DocumentModel devolviendo una ruta por documento.
+    """
+
+    def get_metadata(self, collection_id, document_ids):
+        time.sleep(0.0005)
+        return {doc_id: {"Name": doc_id, "Path": f"/{doc_id}.txt"} for doc_id in document_ids}
+
+
+def buscador_sin_bd(indice) -> tuple[Searcher, list]:
+    """
+    Crea un Searcher cuyo índice y metadatos no salen de la BD. Devuelve también la lista
+    en la que se anota cada carga del índice.
+    """
+    cargas = []
+
+    class SearcherSinBD(Searcher):
+        def _cargar_indice(self):
+            cargas.append(threading.get_ident())
+            time.sleep(0.01)
+            return indice
+
+    buscador = SearcherSinBD("pc")
+    buscador.collection_id = "c"
+    buscador.document_model = ModeloDocumentos()
+    buscador._max_metadatos = 8
+    return buscador, cargas
+
+
+def test_searcher_compartido_carga_una_vez_y_no_corrompe_la_cache():
+    indice = indice_en_memoria()
+    buscador, cargas = buscador_sin_bd(indice)
+    documentos = indice.documentos
+
+    def trabajar(i):
+        assert buscador._obtener_indice() is indice
+        vistos = []
+        for vuelta in range(VUELTAS):
+            lote = [documentos[(i * 7 + vuelta + k) % len(documentos)] for k in range(5)]
+            metadatos = buscador._obtener_metadatos(lote)
+            vistos.append(all(metadatos[doc_id]["Path"] == f"/{doc_id}.txt" for doc_id in lote))
+        return all(vistos)
+
+    assert all(en_paralelo(trabajar))
+    assert len(cargas) == 1
+    assert len(buscador._metadatos) <= buscador._max_metadatos